@@ -0,0 +1,40 @@
+"""correct options mask
+
+Revision ID: aa2b8d6a78b7
+Revises: 2895c3c596cc
+Create Date: 2026-10-19 18:32:10.774519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'aa2b8d6a78b7'
+down_revision = '2895c3c596cc'
+branch_labels = None
+depends_on = None
+
+
+# Bitmask of a JSON array of option indexes, bit i set for option i
+OPTIONS_MASK = """
+CREATE FUNCTION options_mask(options json) RETURNS bigint
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+RETURN (
+    SELECT coalesce(bit_or(1::bigint << opt::int), 0)
+    FROM json_array_elements_text(
+        CASE WHEN json_typeof(options) = 'array' THEN options END
+    ) AS opt
+)
+"""
+
+
+def upgrade():
+    op.execute(OPTIONS_MASK)
+    # Stored generated column: computed for every existing row when added
+    op.add_column('question', sa.Column('correct_options_mask', sa.BigInteger(), sa.Computed('options_mask(correct_options)', persisted=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('question', 'correct_options_mask')
+    op.execute('DROP FUNCTION options_mask(json)')
@@ -0,0 +1,38 @@
+"""deferrable order constraints
+
+Revision ID: 3c8d5f1a9e47
+Revises: 5e2702b2a158
+Create Date: 2026-10-20 09:12:31.604218
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8d5f1a9e47'
+down_revision = '5e2702b2a158'
+branch_labels = None
+depends_on = None
+
+
+# Checked at the end of each statement instead of per row, so that a single
+# UPDATE can reorder all the items of a container
+ORDER_CONSTRAINTS = [
+    ('uq_phase_program_order', 'phase', ['program_id', 'order']),
+    ('uq_phase_book_phase_order', 'phase_book', ['phase_id', 'order']),
+    ('uq_lesson_book_order', 'lesson', ['book_id', 'order']),
+]
+
+
+def upgrade():
+    for name, table, columns in ORDER_CONSTRAINTS:
+        op.drop_constraint(name, table, type_='unique')
+        op.create_unique_constraint(
+            name, table, columns, deferrable=True, initially='IMMEDIATE'
+        )
+
+
+def downgrade():
+    for name, table, columns in ORDER_CONSTRAINTS:
+        op.drop_constraint(name, table, type_='unique')
+        op.create_unique_constraint(name, table, columns)
@@ -0,0 +1,63 @@
+"""full text search
+
+Revision ID: 4286e1ba4bf8
+Revises: 3f9c2d7a41be
+Create Date: 2026-10-19 14:03:27.861442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4286e1ba4bf8'
+down_revision = '3f9c2d7a41be'
+branch_labels = None
+depends_on = None
+
+
+# Strip tashkeel (harakat, superscript alef) and tatweel, then unify
+# alef (أ إ آ ٱ -> ا), ya (ى -> ي) and ta marbuta (ة -> ه) forms.
+# Applied to both indexed documents and search queries. SQL-standard bodies
+# (RETURN ...) are parsed once, so they don't depend on the search_path.
+ARABIC_NORMALIZE = r"""
+CREATE FUNCTION arabic_normalize(value text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+RETURN translate(
+    regexp_replace(value, '[\u064B-\u065F\u0670\u0640]', '', 'g'),
+    U&'\0623\0625\0622\0671\0649\0629',
+    U&'\0627\0627\0627\0627\064A\0647'
+)
+"""
+
+QUESTION_SEARCH_VECTOR = """
+CREATE FUNCTION question_search_vector(question text, options json, explanation text)
+RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+RETURN
+    setweight(to_tsvector('arabic', arabic_normalize(coalesce(question, ''))), 'A')
+    || setweight(to_tsvector('arabic', arabic_normalize(coalesce(
+        (SELECT string_agg(opt, ' ') FROM json_array_elements_text(options) AS opt),
+        ''
+    ))), 'B')
+    || setweight(to_tsvector('arabic', arabic_normalize(coalesce(explanation, ''))), 'C')
+"""
+
+
+def upgrade():
+    op.execute(ARABIC_NORMALIZE)
+    op.execute(QUESTION_SEARCH_VECTOR)
+    op.add_column('question', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed('question_search_vector(question, options, explanation)', persisted=True), nullable=True))
+    op.create_index('ix_question_search_vector', 'question', ['search_vector'], unique=False, postgresql_using='gin')
+    op.add_column('lesson', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('arabic', arabic_normalize(explanation_notes))", persisted=True), nullable=True))
+    op.create_index('ix_lesson_search_vector', 'lesson', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_lesson_search_vector', table_name='lesson', postgresql_using='gin')
+    op.drop_column('lesson', 'search_vector')
+    op.drop_index('ix_question_search_vector', table_name='question', postgresql_using='gin')
+    op.drop_column('question', 'search_vector')
+    op.execute('DROP FUNCTION question_search_vector(text, json, text)')
+    op.execute('DROP FUNCTION arabic_normalize(text)')
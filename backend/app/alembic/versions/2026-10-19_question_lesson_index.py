@@ -0,0 +1,24 @@
+"""question lesson index
+
+Revision ID: 9009234e4ccc
+Revises: 37c677ac503c
+Create Date: 2026-10-19 16:21:08.413977
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9009234e4ccc'
+down_revision = '37c677ac503c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_question_lesson_id'), 'question', ['lesson_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_question_lesson_id'), table_name='question')
@@ -0,0 +1,79 @@
+"""question stats
+
+Revision ID: 6160d51b972f
+Revises: aa2b8d6a78b7
+Create Date: 2026-10-19 20:14:36.092187
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '6160d51b972f'
+down_revision = 'aa2b8d6a78b7'
+branch_labels = None
+depends_on = None
+
+
+# Element-wise sum of two integer arrays, the shorter one padded with zeros
+INT_ARRAY_ADD = """
+CREATE FUNCTION int_array_add(a integer[], b integer[]) RETURNS integer[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+RETURN ARRAY(
+    SELECT coalesce(x, 0) + coalesce(y, 0)
+    FROM unnest(a, b) WITH ORDINALITY AS t(x, y, i)
+    ORDER BY i
+)
+"""
+
+# Stats of the answers recorded so far, maintained incrementally from now on
+BACKFILL_QUESTION_STATS = """
+INSERT INTO question_stats (
+    question_id, attempts, correct, option_picks,
+    score_sum, score_squares_sum, correct_score_sum
+)
+SELECT
+    qa.question_id,
+    count(*),
+    count(*) FILTER (WHERE qa.is_correct),
+    coalesce((
+        SELECT array_agg(picks ORDER BY opt)
+        FROM (
+            SELECT opt, count(*) FILTER (WHERE a.selected >> opt & 1 = 1)::int AS picks
+            FROM question_answer AS a,
+                generate_series(0, json_array_length(q.options) - 1) AS opt
+            WHERE a.question_id = qa.question_id
+            GROUP BY opt
+        ) AS option_picks
+    ), '{}'),
+    sum(s.score::float / s.total),
+    sum((s.score::float / s.total) ^ 2),
+    coalesce(sum(s.score::float / s.total) FILTER (WHERE qa.is_correct), 0)
+FROM question_answer AS qa
+JOIN answer_submission AS s ON s.id = qa.submission_id
+JOIN question AS q ON q.id = qa.question_id
+GROUP BY qa.question_id, q.id
+"""
+
+
+def upgrade():
+    op.execute(INT_ARRAY_ADD)
+    op.create_table('question_stats',
+    sa.Column('question_id', sa.Uuid(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('correct', sa.Integer(), nullable=False),
+    sa.Column('option_picks', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_squares_sum', sa.Float(), nullable=False),
+    sa.Column('correct_score_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['question.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.execute(BACKFILL_QUESTION_STATS)
+
+
+def downgrade():
+    op.drop_table('question_stats')
+    op.execute('DROP FUNCTION int_array_add(integer[], integer[])')
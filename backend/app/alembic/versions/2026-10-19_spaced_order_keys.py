@@ -0,0 +1,52 @@
+"""spaced order keys
+
+Revision ID: a41f7c2e93d6
+Revises: 3c8d5f1a9e47
+Create Date: 2026-10-20 11:37:05.218694
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f7c2e93d6'
+down_revision = '3c8d5f1a9e47'
+branch_labels = None
+depends_on = None
+
+
+# ORDER_GAP of app/crud/ordering.py, as of this revision
+ORDER_GAP = 1024
+
+ORDERED_TABLES = [
+    ('phase', 'program_id', 'id'),
+    ('phase_book', 'phase_id', 'book_id'),
+    ('lesson', 'book_id', 'id'),
+]
+
+
+def respace(table, parent, key, order):
+    # One statement per table: the order constraints are deferrable
+    op.execute(
+        f'''
+        UPDATE {table} SET "order" = {order}
+        FROM (
+            SELECT {parent}, {key}, row_number() OVER (
+                PARTITION BY {parent} ORDER BY "order"
+            ) AS rank
+            FROM {table}
+        ) AS ranked
+        WHERE {table}.{parent} = ranked.{parent} AND {table}.{key} = ranked.{key}
+        '''
+    )
+
+
+def upgrade():
+    # Keys spaced out, so an item can be moved between two others alone
+    for table, parent, key in ORDERED_TABLES:
+        respace(table, parent, key, f'ranked.rank * {ORDER_GAP}')
+
+
+def downgrade():
+    for table, parent, key in ORDERED_TABLES:
+        respace(table, parent, key, 'ranked.rank - 1')
@@ -0,0 +1,33 @@
+"""sticky lesson completion
+
+Revision ID: 6d93b0e4a7c2
+Revises: b7e40d92c1f5
+Create Date: 2026-10-20 11:37:05.614280
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d93b0e4a7c2'
+down_revision = 'b7e40d92c1f5'
+branch_labels = None
+depends_on = None
+
+COMPLETED = 'coalesce(max_position_seconds >= 0.9 * duration_seconds, false)'
+
+
+def upgrade():
+    # No longer generated: set by the progress upsert, and kept once true.
+    # The values computed so far are kept.
+    op.execute('ALTER TABLE lesson_progress ALTER COLUMN completed DROP EXPRESSION')
+    op.execute('UPDATE lesson_progress SET completed = false WHERE completed IS NULL')
+    op.alter_column('lesson_progress', 'completed',
+               existing_type=sa.Boolean(),
+               nullable=False)
+
+
+def downgrade():
+    op.drop_column('lesson_progress', 'completed')
+    op.add_column('lesson_progress', sa.Column('completed', sa.Boolean(), sa.Computed(COMPLETED, persisted=True), nullable=True))
@@ -0,0 +1,43 @@
+"""user name search
+
+Revision ID: 37c677ac503c
+Revises: 4286e1ba4bf8
+Create Date: 2026-10-19 15:21:08.334917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '37c677ac503c'
+down_revision = '4286e1ba4bf8'
+branch_labels = None
+depends_on = None
+
+
+# arabic_normalize (see the full text search revision) on the lowercased name,
+# also unifying hamza on waw (ؤ -> و) and ya (ئ -> ي) and collapsing spaces.
+ARABIC_NORMALIZE_NAME = r"""
+CREATE FUNCTION arabic_normalize_name(value text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+RETURN btrim(regexp_replace(
+    translate(arabic_normalize(lower(value)), U&'\0624\0626', U&'\0648\064A'),
+    '\s+', ' ', 'g'
+))
+"""
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(ARABIC_NORMALIZE_NAME)
+    op.add_column('user', sa.Column('search_name', sa.Text(), sa.Computed("arabic_normalize_name(first_name || ' ' || father_name || ' ' || family_name)", persisted=True), nullable=True))
+    op.create_index('ix_user_search_name_trgm', 'user', ['search_name'], unique=False, postgresql_using='gin', postgresql_ops={'search_name': 'gin_trgm_ops'})
+    op.create_index('ix_user_email_trgm', 'user', ['email'], unique=False, postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_user_email_trgm', table_name='user', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+    op.drop_index('ix_user_search_name_trgm', table_name='user', postgresql_using='gin', postgresql_ops={'search_name': 'gin_trgm_ops'})
+    op.drop_column('user', 'search_name')
+    op.execute('DROP FUNCTION arabic_normalize_name(text)')
@@ -18,6 +18,9 @@ from app.models.exam import Exam, ExamAttempt
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token", auto_error=False
+)
 
 
 def get_db() -> Generator[Session]:
@@ -51,6 +54,18 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+def get_optional_current_user(
+    session: SessionDep, token: Annotated[str | None, Depends(optional_oauth2)]
+) -> User | None:
+    """The current user for endpoints open to guests, None for guests"""
+    if token is None:
+        return None
+    return get_current_user(session, token)
+
+
+OptionalCurrentUser = Annotated[User | None, Depends(get_optional_current_user)]
+
+
 def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
@@ -101,6 +116,23 @@ def get_session_for_current_user(
 SessionIDCurrentUser = Annotated[uuid.UUID, Depends(get_session_for_current_user)]
 
 
+def get_session_for_current_teacher(
+    session: SessionDep, session_id: uuid.UUID, current_user: CurrentUser
+) -> uuid.UUID:
+    if current_user.is_admin or current_user.is_superuser:
+        return session_id
+    current_session = session.get(ProgramSession, session_id)
+    if not current_session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if current_session not in current_user.teacher_sessions:
+        raise HTTPException(status_code=403, detail="You are not teaching this session")
+    return session_id
+
+
+SessionIDCurrentTeacher = Annotated[uuid.UUID, Depends(get_session_for_current_teacher)]
+
+
 def get_exam_for_current_user(
     session: SessionDep, exam_id: uuid.UUID, current_user: CurrentUser
 ) -> uuid.UUID:
@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
 from app.api.routes import (
+    answers,
     books,
     exams,
     lessons,
     login,
+    media,
     phases,
     private,
     programs,
@@ -24,6 +26,8 @@ api_router.include_router(phases.router)
 api_router.include_router(books.router)
 api_router.include_router(lessons.router)
 api_router.include_router(questions.router)
+api_router.include_router(answers.router)
+api_router.include_router(media.router)
 api_router.include_router(sessions.router)
 api_router.include_router(exams.router)
 
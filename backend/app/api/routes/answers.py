@@ -0,0 +1,66 @@
+import uuid
+
+from fastapi import APIRouter, HTTPException
+
+from app import crud
+from app.api.deps import CurrentUser, SessionDep
+from app.models import AnswerSubmissionCreate, AnswerSubmissionPublic
+
+router = APIRouter(prefix="/answers", tags=["answers"])
+
+
+@router.post("/", response_model=AnswerSubmissionPublic)
+def submit_answers(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,
+    submission_in: AnswerSubmissionCreate,
+) -> AnswerSubmissionPublic:
+    """
+    Submit answers to a batch of questions (a quiz or a lesson's questions).
+
+    The whole batch is graded at once, and the score and correct options are
+    returned immediately.
+    """
+    answer_keys = crud.get_answer_keys(
+        session=session,
+        question_ids=[answer.question_id for answer in submission_in.answers],
+    )
+    for answer in submission_in.answers:
+        answer_key = answer_keys.get(answer.question_id)
+        if not answer_key:
+            raise HTTPException(
+                status_code=404, detail=f"Question {answer.question_id} not found"
+            )
+        if any(option >= answer_key.num_options for option in answer.selected_options):
+            raise HTTPException(
+                status_code=422,
+                detail=f"Selected option is out of range for question {answer.question_id}",
+            )
+
+    return crud.create_answer_submission(
+        session=session,
+        student_id=current_user.id,
+        submission_in=submission_in,
+        answer_keys=answer_keys,
+    )
+
+
+@router.get("/{submission_id}", response_model=AnswerSubmissionPublic)
+def read_answer_submission(
+    session: SessionDep, current_user: CurrentUser, submission_id: uuid.UUID
+) -> AnswerSubmissionPublic:
+    """
+    Get a graded answer submission by ID.
+
+    Students can only see their own submissions.
+    """
+    submission = crud.get_answer_submission(
+        session=session, submission_id=submission_id
+    )
+    if not submission or (
+        submission.student_id != current_user.id
+        and not (current_user.is_admin or current_user.is_superuser)
+    ):
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return crud.get_answer_submission_results(session=session, submission=submission)
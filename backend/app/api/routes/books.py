@@ -1,3 +1,4 @@
+import secrets
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -13,6 +14,7 @@ from app.models import (
     BooksPublic,
     BookUpdate,
     Message,
+    QuizPublic,
 )
 
 router = APIRouter(prefix="/books", tags=["books"])
@@ -44,6 +46,28 @@ def read_book(session: SessionDep, book_id: uuid.UUID) -> Book:
     return book
 
 
+# For guest users as well
+@router.get("/{book_id}/quiz", response_model=QuizPublic)
+def read_book_quiz(
+    session: SessionDep,
+    book_id: uuid.UUID,
+    n: int = Query(default=20, ge=1, le=100),
+    seed: int | None = Query(default=None, ge=0),
+) -> QuizPublic:
+    """
+    Get n random questions across all lessons of the book.
+
+    The same seed always returns the same questions in the same order.
+    """
+    book = crud.get_book(session=session, book_id=book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    if seed is None:
+        seed = secrets.randbelow(2**31)
+    questions = crud.get_book_quiz(session=session, book_id=book_id, n=n, seed=seed)
+    return QuizPublic(seed=seed, data=questions, count=len(questions))
+
+
 @router.post(
     "/",
     response_model=BookPublic,
@@ -1,4 +1,5 @@
 import uuid
+from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import ValidationError
@@ -6,15 +7,26 @@ from sqlalchemy.exc import IntegrityError
 from sqlmodel import func, select
 
 from app import crud
-from app.api.deps import SessionDep, get_current_admin_or_superuser
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    get_current_admin_or_superuser,
+    get_current_user,
+)
+from app.core.progress import heartbeats
+from app.crud.ordering import OrderKeysExhausted
 from app.models import (
     Lesson,
     LessonCreate,
+    LessonProgressHeartbeat,
     LessonPublic,
     LessonsPublic,
     LessonUpdate,
     Message,
+    OrderUpdate,
+    PositionUpdate,
 )
+from app.models.search import search_match
 
 router = APIRouter(prefix="/lessons", tags=["lessons"])
 
@@ -28,7 +40,7 @@ def read_lessons_by_book(
     limit: int = Query(default=100, le=500),
 ) -> LessonsPublic:
     """
-    Retrieve lessons for a specific book.
+    Retrieve lessons for a specific book, in order, with their positions.
     """
     lessons = crud.get_lessons_by_book(
         session=session, book_id=book_id, skip=skip, limit=limit
@@ -37,6 +49,63 @@ def read_lessons_by_book(
         select(func.count()).select_from(Lesson).where(Lesson.book_id == book_id)
     )
     count = session.exec(count_statement).one()
+    data = [
+        LessonPublic.model_validate(lesson, update={"position": skip + i})
+        for i, lesson in enumerate(lessons)
+    ]
+    return LessonsPublic(data=data, count=count)
+
+
+@router.put(
+    "/book/{book_id}/order",
+    response_model=Message,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def reorder_lessons(
+    session: SessionDep, book_id: uuid.UUID, order_in: OrderUpdate
+) -> Message:
+    """
+    Reorder the lessons of a book, given all their IDs first to last.
+
+    Only admins can reorder lessons.
+    """
+    book = crud.get_book(session=session, book_id=book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    success = crud.reorder_lessons(
+        session=session, book_id=book_id, lesson_ids=order_in.ids
+    )
+    if not success:
+        raise HTTPException(
+            status_code=400, detail="Every lesson of the book must be listed once"
+        )
+    return Message(message="Lessons reordered successfully")
+
+
+@router.get(
+    "/search",
+    response_model=LessonsPublic,
+    dependencies=[Depends(get_current_user)],
+)
+def search_lessons(
+    session: SessionDep,
+    q: str = Query(min_length=1, max_length=200),
+    skip: int = 0,
+    limit: int = Query(default=100, le=500),
+) -> LessonsPublic:
+    """
+    Search lesson explanation notes, best matches first.
+
+    Arabic text matches regardless of tashkeel and alef/ya/ta marbuta forms.
+    """
+    lessons = crud.search_lessons(session=session, text=q, skip=skip, limit=limit)
+    count_statement = (
+        select(func.count())
+        .select_from(Lesson)
+        .where(search_match(Lesson.search_vector, q))
+    )
+    count = session.exec(count_statement).one()
     return LessonsPublic(data=lessons, count=count)
 
 
@@ -71,10 +140,17 @@ def create_lesson(*, session: SessionDep, lesson_in: LessonCreate) -> Lesson:
     try:
         lesson = crud.create_lesson(session=session, lesson_in=lesson_in)
     except IntegrityError:
+        if lesson_in.order is None:
+            raise HTTPException(
+                status_code=409,
+                detail="The lessons were reordered meanwhile, try again",
+            )
         raise HTTPException(
             status_code=400,
             detail=f"Lesson with order {lesson_in.order} already exists for this book",
         )
+    except OrderKeysExhausted:
+        raise HTTPException(status_code=400, detail="The book has too many lessons")
     return lesson
 
 
@@ -107,6 +183,34 @@ def update_lesson(
         raise HTTPException(status_code=422, detail=ve.errors()[0]["msg"])
 
 
+@router.put(
+    "/{lesson_id}/position",
+    response_model=Message,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def move_lesson(
+    session: SessionDep, lesson_id: uuid.UUID, position_in: PositionUpdate
+) -> Message:
+    """
+    Move a lesson to a position in its book, 0 for first.
+
+    Only admins can reorder lessons.
+    """
+    lesson = crud.get_lesson(session=session, lesson_id=lesson_id)
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+
+    try:
+        crud.move_lesson(session=session, lesson=lesson, position=position_in.position)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=409, detail="The lessons were reordered meanwhile, try again"
+        )
+    except OrderKeysExhausted:
+        raise HTTPException(status_code=400, detail="The book has too many lessons")
+    return Message(message="Lesson moved successfully")
+
+
 @router.delete(
     "/{lesson_id}",
     response_model=Message,
@@ -123,3 +227,22 @@ def delete_lesson(session: SessionDep, lesson_id: uuid.UUID) -> Message:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
     return Message(message="Lesson deleted successfully")
+
+
+@router.post("/{lesson_id}/progress", response_model=Message, status_code=202)
+def record_lesson_progress(
+    current_user: CurrentUser, lesson_id: uuid.UUID, heartbeat: LessonProgressHeartbeat
+) -> Message:
+    """
+    Report the current position in the lesson audio, every few seconds.
+
+    Heartbeats are coalesced and written in batches, so progress shows up
+    after a few seconds.
+    """
+    heartbeats.add(
+        student_id=current_user.id,
+        lesson_id=lesson_id,
+        heartbeat=heartbeat,
+        received_at=datetime.now(UTC),
+    )
+    return Message(message="Progress recorded")
@@ -14,7 +14,6 @@ from app.models import Message, NewPassword, Token, User, UserPublic
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
     verify_password_reset_token,
 )
 
@@ -62,7 +61,8 @@ def recover_password(email: str, session: SessionDep) -> Message:
         email_data = generate_reset_password_email(
             email_to=user.email, email=email, token=password_reset_token
         )
-        send_email(
+        crud.enqueue_email(
+            session=session,
             email_to=user.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
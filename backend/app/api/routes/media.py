@@ -0,0 +1,296 @@
+import uuid
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.api.deps import (
+    CurrentUser,
+    OptionalCurrentUser,
+    SessionDep,
+    get_current_admin_or_superuser,
+)
+from app.core import uploads
+from app.core.media import book_pages_response, media_response
+from app.models import (
+    Book,
+    Lesson,
+    MediaAssetPublic,
+    MediaManifestPublic,
+    MediaUpload,
+    MediaUploadCreate,
+    MediaUploadPublic,
+    Message,
+    User,
+)
+from app.models.media import media_endpoint_url, media_url, media_version
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+
+def can_read_lesson_audio(session: Session, user: User, book_id: uuid.UUID) -> bool:
+    return (
+        user.is_admin
+        or user.is_superuser
+        or crud.is_book_in_user_sessions(
+            session=session, user_id=user.id, book_id=book_id
+        )
+    )
+
+
+def media_asset(
+    target: str, target_id: uuid.UUID, field: str, row: Book | Lesson
+) -> MediaAssetPublic | None:
+    # From the hash and size stored at upload, without reading the file
+    sha256 = getattr(row, f"{field}_sha256")
+    url = media_url(f"{target}s/{target_id}/{field}", getattr(row, field), sha256)
+    if url is None:
+        return None
+    return MediaAssetPublic(
+        url=url,
+        target=target,
+        target_id=target_id,
+        field=field,
+        size=getattr(row, f"{field}_size") if sha256 else None,
+        sha256=sha256,
+    )
+
+
+def book_pages_asset(lesson: Lesson) -> MediaAssetPublic | None:
+    if lesson.book.pdf is None:
+        return None
+    url = media_endpoint_url(
+        f"lessons/{lesson.id}/book_part_pdf", lesson.book_pages_version
+    )
+    return MediaAssetPublic(
+        url=url, target="lesson", target_id=lesson.id, field="book_part_pdf"
+    )
+
+
+# For guest users as well, the lesson audio is listed for those who can read it
+@router.get("/books/{book_id}/manifest", response_model=MediaManifestPublic)
+def read_book_manifest(
+    session: SessionDep, current_user: OptionalCurrentUser, book_id: uuid.UUID
+) -> MediaManifestPublic:
+    """
+    List every media file of a book and its lessons, with its URL, versioned
+    by content when known, and the size and SHA-256 of uploaded files, to
+    download a whole book for offline use and then only the files that changed.
+    """
+    book = crud.get_book(session=session, book_id=book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    fields = ["book_part_pdf", "book_part_audio"]
+    if current_user is not None and can_read_lesson_audio(
+        session, current_user, book.id
+    ):
+        fields.append("lesson_audio")
+
+    assets = [
+        media_asset("book", book.id, "pdf", book),
+        media_asset("book", book.id, "audio", book),
+    ]
+    for lesson in sorted(book.lessons, key=lambda lesson: lesson.order):
+        for field in fields:
+            if (
+                field == "book_part_pdf"
+                and lesson.book_part_pdf is None
+                and lesson.book_pages_start is not None
+                and lesson.book_pages_end is not None
+            ):
+                assets.append(book_pages_asset(lesson))
+            else:
+                assets.append(media_asset("lesson", lesson.id, field, lesson))
+    data = [asset for asset in assets if asset is not None]
+    return MediaManifestPublic(book_id=book.id, assets=data, count=len(data))
+
+
+# For guest users as well
+@router.get("/books/{book_id}/{media}", response_class=Response)
+@router.head("/books/{book_id}/{media}", include_in_schema=False)
+def read_book_media(
+    request: Request,
+    session: SessionDep,
+    book_id: uuid.UUID,
+    media: Literal["pdf", "audio"],
+) -> Response:
+    """
+    Get a book's PDF or audio, with Range support for seeking.
+    """
+    book = crud.get_book(session=session, book_id=book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return media_response(
+        request,
+        getattr(book, media),
+        version=media_version(getattr(book, f"{media}_sha256")),
+        public=True,
+    )
+
+
+# For guest users as well, except the lesson audio
+@router.get("/lessons/{lesson_id}/{media}", response_class=Response)
+@router.head("/lessons/{lesson_id}/{media}", include_in_schema=False)
+def read_lesson_media(
+    request: Request,
+    session: SessionDep,
+    current_user: OptionalCurrentUser,
+    lesson_id: uuid.UUID,
+    media: Literal["book_part_pdf", "book_part_audio", "lesson_audio"],
+) -> Response:
+    """
+    Get a lesson's book part PDF or audio, or its recorded explanation, with
+    Range support for seeking. Book parts given as pages of the book's PDF are
+    sliced from it.
+
+    The explanation audio is only for admins and the students and teachers of a
+    session studying the lesson's book.
+    """
+    lesson = crud.get_lesson(session=session, lesson_id=lesson_id)
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    public = media != "lesson_audio"
+    if not public:
+        if current_user is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if not can_read_lesson_audio(session, current_user, lesson.book_id):
+            raise HTTPException(
+                status_code=403,
+                detail="You are not enrolled in a session with this lesson",
+            )
+    if (
+        media == "book_part_pdf"
+        and lesson.book_part_pdf is None
+        and lesson.book_pages_start is not None
+        and lesson.book_pages_end is not None
+    ):
+        return book_pages_response(
+            request,
+            lesson.book.pdf,
+            lesson.book_pages_start,
+            lesson.book_pages_end,
+            version=lesson.book_pages_version,
+            public=public,
+        )
+    return media_response(
+        request,
+        getattr(lesson, media),
+        version=media_version(getattr(lesson, f"{media}_sha256")),
+        public=public,
+    )
+
+
+# Resumable uploads
+def upload_public(
+    upload: MediaUpload, received: int, reference: str | None = None
+) -> MediaUploadPublic:
+    return MediaUploadPublic.model_validate(
+        upload, update={"received": received, "reference": reference}
+    )
+
+
+@router.post(
+    "/uploads",
+    response_model=MediaUploadPublic,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def create_media_upload(
+    session: SessionDep, current_user: CurrentUser, upload_in: MediaUploadCreate
+) -> MediaUploadPublic:
+    """
+    Start a resumable upload of a book or lesson media file.
+
+    The file is then sent in chunks with PUT, and set on the book or lesson
+    once complete.
+    """
+    if upload_in.target == "book":
+        if not crud.get_book(session=session, book_id=upload_in.target_id):
+            raise HTTPException(status_code=404, detail="Book not found")
+    elif not crud.get_lesson(session=session, lesson_id=upload_in.target_id):
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    upload = crud.create_media_upload(
+        session=session, upload_in=upload_in, created_by=current_user.id
+    )
+    return upload_public(upload, 0)
+
+
+@router.get(
+    "/uploads/{upload_id}",
+    response_model=MediaUploadPublic,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def read_media_upload(session: SessionDep, upload_id: uuid.UUID) -> MediaUploadPublic:
+    """
+    Get an upload in progress, with the offset to resume it from.
+    """
+    upload = crud.get_media_upload(session=session, upload_id=upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload_public(upload, uploads.received_size(upload.id))
+
+
+@router.put(
+    "/uploads/{upload_id}",
+    response_model=MediaUploadPublic,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+async def upload_media_chunk(
+    request: Request,
+    session: SessionDep,
+    upload_id: uuid.UUID,
+    offset: int = Query(ge=0),
+) -> MediaUploadPublic:
+    """
+    Send the next chunk of an upload as the raw request body, starting at
+    `offset` (the bytes received so far).
+
+    The body is streamed to disk and hashed as it arrives. Once the whole file
+    is received, it's stored by content hash (once for identical files) and set
+    on the book or lesson.
+    """
+    upload = await run_in_threadpool(
+        crud.get_media_upload, session=session, upload_id=upload_id
+    )
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    received, reference = await uploads.receive_chunk(upload, offset, request.stream())
+    if reference is None:
+        return upload_public(upload, received)
+
+    # Read before attaching deletes the upload
+    public = upload_public(upload, received, reference)
+    attached = await run_in_threadpool(
+        crud.attach_media_upload,
+        session=session,
+        upload=upload,
+        reference=reference,
+        sha256=uploads.content_digest(reference),
+    )
+    if not attached:
+        raise HTTPException(
+            status_code=404, detail=f"{upload.target.capitalize()} not found"
+        )
+    return public
+
+
+@router.delete(
+    "/uploads/{upload_id}",
+    response_model=Message,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def delete_media_upload(session: SessionDep, upload_id: uuid.UUID) -> Message:
+    """
+    Cancel an upload in progress.
+    """
+    upload = crud.get_media_upload(session=session, upload_id=upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    crud.delete_media_upload(session=session, upload=upload)
+    uploads.discard_upload(upload_id)
+    return Message(message="Upload cancelled")
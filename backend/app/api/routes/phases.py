@@ -1,3 +1,4 @@
+import secrets
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -7,13 +8,17 @@ from sqlmodel import func, select
 
 from app import crud
 from app.api.deps import SessionDep, get_current_admin_or_superuser
+from app.crud.ordering import OrderKeysExhausted
 from app.models import (
     Message,
+    OrderUpdate,
     Phase,
     PhaseCreate,
     PhasePublic,
     PhasesPublic,
     PhaseUpdate,
+    PositionUpdate,
+    QuizPublic,
 )
 
 router = APIRouter(prefix="/phases", tags=["phases"])
@@ -43,7 +48,8 @@ def read_phases_by_program(
     limit: int = Query(default=100, le=500),
 ) -> PhasesPublic:
     """
-    Retrieve phases for a specific program (ordered by phase order).
+    Retrieve phases for a specific program (ordered by phase order), with their
+    positions.
     """
     phases = crud.get_phases_by_program(
         session=session, program_id=program_id, skip=skip, limit=limit
@@ -52,7 +58,38 @@ def read_phases_by_program(
         select(func.count()).select_from(Phase).where(Phase.program_id == program_id)
     )
     count = session.exec(count_statement).one()
-    return PhasesPublic(data=phases, count=count)
+    data = [
+        PhasePublic.model_validate(phase, update={"position": skip + i})
+        for i, phase in enumerate(phases)
+    ]
+    return PhasesPublic(data=data, count=count)
+
+
+@router.put(
+    "/program/{program_id}/order",
+    response_model=Message,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def reorder_phases(
+    session: SessionDep, program_id: uuid.UUID, order_in: OrderUpdate
+) -> Message:
+    """
+    Reorder the phases of a program, given all their IDs first to last.
+
+    Only admins can reorder phases.
+    """
+    program = crud.get_program(session=session, program_id=program_id)
+    if not program:
+        raise HTTPException(status_code=404, detail="Program not found")
+
+    success = crud.reorder_phases(
+        session=session, program_id=program_id, phase_ids=order_in.ids
+    )
+    if not success:
+        raise HTTPException(
+            status_code=400, detail="Every phase of the program must be listed once"
+        )
+    return Message(message="Phases reordered successfully")
 
 
 @router.get("/{phase_id}", response_model=PhasePublic)
@@ -66,6 +103,27 @@ def read_phase(session: SessionDep, phase_id: uuid.UUID) -> Phase:
     return phase
 
 
+@router.get("/{phase_id}/quiz", response_model=QuizPublic)
+def read_phase_quiz(
+    session: SessionDep,
+    phase_id: uuid.UUID,
+    n: int = Query(default=20, ge=1, le=100),
+    seed: int | None = Query(default=None, ge=0),
+) -> QuizPublic:
+    """
+    Get n random questions across all books of the phase.
+
+    The same seed always returns the same questions in the same order.
+    """
+    phase = crud.get_phase(session=session, phase_id=phase_id)
+    if not phase:
+        raise HTTPException(status_code=404, detail="Phase not found")
+    if seed is None:
+        seed = secrets.randbelow(2**31)
+    questions = crud.get_phase_quiz(session=session, phase_id=phase_id, n=n, seed=seed)
+    return QuizPublic(seed=seed, data=questions, count=len(questions))
+
+
 @router.post(
     "/",
     response_model=PhasePublic,
@@ -85,10 +143,17 @@ def create_phase(*, session: SessionDep, phase_in: PhaseCreate) -> Phase:
     try:
         phase = crud.create_phase(session=session, phase_in=phase_in)
     except IntegrityError:
+        if phase_in.order is None:
+            raise HTTPException(
+                status_code=409,
+                detail="The phases were reordered meanwhile, try again",
+            )
         raise HTTPException(
             status_code=400,
             detail=f"Phase with order {phase_in.order} already exists for this program",
         )
+    except OrderKeysExhausted:
+        raise HTTPException(status_code=400, detail="The program has too many phases")
     return phase
 
 
@@ -119,6 +184,34 @@ def update_phase(
         raise HTTPException(status_code=422, detail=ve.errors()[0]["msg"])
 
 
+@router.put(
+    "/{phase_id}/position",
+    response_model=Message,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def move_phase(
+    session: SessionDep, phase_id: uuid.UUID, position_in: PositionUpdate
+) -> Message:
+    """
+    Move a phase to a position in its program, 0 for first.
+
+    Only admins can reorder phases.
+    """
+    phase = crud.get_phase(session=session, phase_id=phase_id)
+    if not phase:
+        raise HTTPException(status_code=404, detail="Phase not found")
+
+    try:
+        crud.move_phase(session=session, phase=phase, position=position_in.position)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=409, detail="The phases were reordered meanwhile, try again"
+        )
+    except OrderKeysExhausted:
+        raise HTTPException(status_code=400, detail="The program has too many phases")
+    return Message(message="Phase moved successfully")
+
+
 @router.delete(
     "/{phase_id}",
     response_model=Message,
@@ -137,6 +230,67 @@ def delete_phase(session: SessionDep, phase_id: uuid.UUID) -> Message:
     return Message(message="Phase deleted successfully")
 
 
+@router.put(
+    "/{phase_id}/books/order",
+    response_model=Message,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def reorder_phase_books(
+    session: SessionDep, phase_id: uuid.UUID, order_in: OrderUpdate
+) -> Message:
+    """
+    Reorder the books of a phase, given all their IDs first to last.
+
+    Only admins can manage phase books.
+    """
+    phase = crud.get_phase(session=session, phase_id=phase_id)
+    if not phase:
+        raise HTTPException(status_code=404, detail="Phase not found")
+
+    success = crud.reorder_phase_books(
+        session=session, phase_id=phase_id, book_ids=order_in.ids
+    )
+    if not success:
+        raise HTTPException(
+            status_code=400, detail="Every book of the phase must be listed once"
+        )
+    return Message(message="Phase books reordered successfully")
+
+
+@router.put(
+    "/{phase_id}/books/{book_id}/position",
+    response_model=Message,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def move_phase_book(
+    session: SessionDep,
+    phase_id: uuid.UUID,
+    book_id: uuid.UUID,
+    position_in: PositionUpdate,
+) -> Message:
+    """
+    Move a book to a position in a phase, 0 for first.
+
+    Only admins can manage phase books.
+    """
+    try:
+        success = crud.move_phase_book(
+            session=session,
+            phase_id=phase_id,
+            book_id=book_id,
+            position=position_in.position,
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=409, detail="The books were reordered meanwhile, try again"
+        )
+    except OrderKeysExhausted:
+        raise HTTPException(status_code=400, detail="The phase has too many books")
+    if not success:
+        raise HTTPException(status_code=404, detail="Book not found in phase")
+    return Message(message="Book moved successfully")
+
+
 @router.post(
     "/{phase_id}/books/{book_id}",
     response_model=Message,
@@ -147,9 +301,11 @@ def add_book_to_phase(
     phase_id: uuid.UUID,
     book_id: uuid.UUID,
     order: int | None = None,
+    position: int | None = Query(default=None, ge=0),
 ) -> Message:
     """
-    Add a book to a phase.
+    Add a book to a phase, at a position (0 for first) or with a given order,
+    last by default.
 
     Only admins can manage phase books.
     """
@@ -162,18 +318,26 @@ def add_book_to_phase(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
+    if order is not None and position is not None:
+        raise HTTPException(
+            status_code=422, detail="order and position must not both be set"
+        )
+
     try:
         crud.add_book_to_phase(
             session=session,
             phase_id=phase_id,
             book_id=book_id,
             order=order,
+            position=position,
         )
     except IntegrityError:
         raise HTTPException(
             status_code=400,
             detail="A book with this order already exists in the phase, or book already in phase",
         )
+    except OrderKeysExhausted:
+        raise HTTPException(status_code=400, detail="The phase has too many books")
     return Message(message="Book added to phase successfully")
 
 
@@ -8,8 +8,11 @@ from app import crud
 from app.api.deps import SessionDep, get_current_admin_or_superuser
 from app.models import (
     Message,
+    PhaseDeepPublic,
     Program,
     ProgramCreate,
+    ProgramDeepCreate,
+    ProgramDeepPublic,
     ProgramPublic,
     ProgramsPublic,
     ProgramUpdate,
@@ -59,6 +62,52 @@ def create_program(*, session: SessionDep, program_in: ProgramCreate) -> Program
     return ProgramPublic.from_program(program)
 
 
+@router.post(
+    "/deep",
+    response_model=ProgramDeepPublic,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def create_program_deep(
+    *, session: SessionDep, program_in: ProgramDeepCreate
+) -> ProgramDeepPublic:
+    """
+    Create a program with its phases and the books of each phase, existing ones
+    or new ones with their lessons, in one transaction.
+
+    Phases, books and lessons are ordered by their position in the request.
+    Only admins can create programs.
+    """
+    book_ids = {
+        phase_book.book_id
+        for phase in program_in.phases
+        for phase_book in phase.books
+        if phase_book.book_id is not None
+    }
+    missing = book_ids - crud.get_existing_book_ids(session=session, book_ids=book_ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Book {min(missing)} not found")
+
+    try:
+        program, phases = crud.create_program_deep(
+            session=session, program_in=program_in
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return ProgramDeepPublic(
+        **ProgramPublic.from_program(program).model_dump(),
+        phases=[
+            PhaseDeepPublic(
+                id=phase.id,
+                order=phase.order,
+                position=position,
+                program_id=phase.program_id,
+                book_ids=phase_book_ids,
+            )
+            for position, (phase, phase_book_ids) in enumerate(phases)
+        ],
+    )
+
+
 @router.patch(
     "/{program_id}",
     response_model=ProgramPublic,
@@ -2,18 +2,23 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import ValidationError
-from sqlmodel import func, select
+from sqlmodel import col, func, select
 
 from app import crud
-from app.api.deps import SessionDep, get_current_admin_or_superuser
+from app.api.deps import SessionDep, get_current_admin_or_superuser, get_current_user
 from app.models import (
+    Lesson,
     Message,
     Question,
     QuestionCreate,
     QuestionPublic,
     QuestionsPublic,
+    QuestionStats,
+    QuestionsWithStatsPublic,
     QuestionUpdate,
+    QuestionWithStatsPublic,
 )
+from app.models.search import search_match
 
 router = APIRouter(prefix="/questions", tags=["questions"])
 
@@ -40,6 +45,32 @@ def read_questions(
     return QuestionsPublic(data=questions, count=count)
 
 
+@router.get(
+    "/search",
+    response_model=QuestionsPublic,
+    dependencies=[Depends(get_current_user)],
+)
+def search_questions(
+    session: SessionDep,
+    q: str = Query(min_length=1, max_length=200),
+    skip: int = 0,
+    limit: int = Query(default=100, le=500),
+) -> QuestionsPublic:
+    """
+    Search questions, their options and explanations, best matches first.
+
+    Arabic text matches regardless of tashkeel and alef/ya/ta marbuta forms.
+    """
+    questions = crud.search_questions(session=session, text=q, skip=skip, limit=limit)
+    count_statement = (
+        select(func.count())
+        .select_from(Question)
+        .where(search_match(Question.search_vector, q))
+    )
+    count = session.exec(count_statement).one()
+    return QuestionsPublic(data=questions, count=count)
+
+
 # For guest users as well
 @router.get("/lesson/{lesson_id}", response_model=QuestionsPublic)
 def read_questions_by_lesson(
@@ -63,6 +94,77 @@ def read_questions_by_lesson(
     return QuestionsPublic(data=questions, count=count)
 
 
+def _questions_with_stats(
+    rows: list[tuple[Question, QuestionStats | None]], count: int
+) -> QuestionsWithStatsPublic:
+    return QuestionsWithStatsPublic(
+        data=[
+            QuestionWithStatsPublic.model_validate(question, update={"stats": stats})
+            for question, stats in rows
+        ],
+        count=count,
+    )
+
+
+@router.get(
+    "/lesson/{lesson_id}/stats",
+    response_model=QuestionsWithStatsPublic,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def read_questions_with_stats_by_lesson(
+    session: SessionDep,
+    lesson_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = Query(default=100, le=500),
+) -> QuestionsWithStatsPublic:
+    """
+    Retrieve questions for a specific lesson with their answer stats, weakest
+    (lowest correct rate) first.
+
+    Only admins can see question stats.
+    """
+    rows = crud.get_questions_with_stats_by_lesson(
+        session=session, lesson_id=lesson_id, skip=skip, limit=limit
+    )
+    count_statement = (
+        select(func.count())
+        .select_from(Question)
+        .where(Question.lesson_id == lesson_id)
+    )
+    count = session.exec(count_statement).one()
+    return _questions_with_stats(rows, count)
+
+
+@router.get(
+    "/book/{book_id}/stats",
+    response_model=QuestionsWithStatsPublic,
+    dependencies=[Depends(get_current_admin_or_superuser)],
+)
+def read_questions_with_stats_by_book(
+    session: SessionDep,
+    book_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = Query(default=100, le=500),
+) -> QuestionsWithStatsPublic:
+    """
+    Retrieve questions across all lessons of a book with their answer stats,
+    weakest (lowest correct rate) first.
+
+    Only admins can see question stats.
+    """
+    rows = crud.get_questions_with_stats_by_book(
+        session=session, book_id=book_id, skip=skip, limit=limit
+    )
+    count_statement = (
+        select(func.count())
+        .select_from(Question)
+        .join(Lesson, col(Lesson.id) == Question.lesson_id)
+        .where(Lesson.book_id == book_id)
+    )
+    count = session.exec(count_statement).one()
+    return _questions_with_stats(rows, count)
+
+
 # For guest users as well
 @router.get("/{question_id}", response_model=QuestionPublic)
 def read_question(session: SessionDep, question_id: uuid.UUID) -> Question:
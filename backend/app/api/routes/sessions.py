@@ -1,26 +1,42 @@
+import csv
+import io
 import uuid
+from collections.abc import Iterator
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
-from sqlmodel import func, select
+from sqlmodel import Session, func, select
 
 from app import crud
 from app.api.deps import (
+    CurrentUser,
     SessionDep,
+    SessionIDCurrentTeacher,
+    SessionIDCurrentUser,
     get_current_admin_or_superuser,
     get_current_teacher_or_admin,
 )
+from app.core.db import engine
 from app.models import (
+    EventAttendancePublic,
+    EventAttendanceRatePublic,
+    EventAttendanceUpdate,
+    LessonProgressesPublic,
     Message,
     ProgramSession,
     ProgramSessionCreate,
     ProgramSessionPublic,
     ProgramSessionsPublic,
     ProgramSessionUpdate,
+    SessionAttendancePublic,
+    SessionCompletionPublic,
     SessionEvent,
     SessionEventCreate,
     SessionEventPublic,
     SessionEventsPublic,
+    StudentAttendanceRatePublic,
+    StudentCompletionPublic,
 )
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
@@ -246,6 +262,79 @@ def remove_teacher_from_session(
     return db_session
 
 
+@router.get("/{session_id}/progress", response_model=LessonProgressesPublic)
+def read_session_progress(
+    session: SessionDep,
+    current_user: CurrentUser,
+    session_id: SessionIDCurrentUser,
+    skip: int = 0,
+    limit: int = Query(default=100, le=500),
+) -> LessonProgressesPublic:
+    """
+    Get the students' listening progress in the session's lessons.
+
+    Teachers and admins see every student of the session, students their own.
+    """
+    student_id = None
+    if not (current_user.is_admin or current_user.is_superuser):
+        db_session = crud.get_session(session=session, session_id=session_id)
+        if db_session not in current_user.teacher_sessions:
+            student_id = current_user.id
+    progress = crud.get_session_progress(
+        session=session,
+        session_id=session_id,
+        student_id=student_id,
+        skip=skip,
+        limit=limit,
+    )
+    count = crud.count_session_progress(
+        session=session, session_id=session_id, student_id=student_id
+    )
+    return LessonProgressesPublic(data=progress, count=count)
+
+
+@router.get("/{session_id}/completion", response_model=SessionCompletionPublic)
+def read_session_completion(
+    session: SessionDep, session_id: SessionIDCurrentTeacher
+) -> SessionCompletionPublic:
+    """
+    Get every student's lesson completion in the session, with a histogram of
+    the number of completed lessons.
+
+    Only the session's teachers and admins can see it.
+    """
+    db_session = crud.get_session(session=session, session_id=session_id)
+    if not db_session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    lesson_ids = crud.get_program_lesson_ids(
+        session=session, program_id=db_session.program_id
+    )
+    lesson_count = len(lesson_ids)
+    completions = crud.get_session_completion(
+        session=session, session_id=session_id, lesson_ids=lesson_ids
+    )
+    histogram = [0] * (lesson_count + 1)
+    data = []
+    for completion in completions:
+        histogram[completion.completed_count] += 1
+        next_lesson = completion.next_unfinished(lesson_count)
+        data.append(
+            StudentCompletionPublic(
+                student_id=completion.student_id,
+                completed_count=completion.completed_count,
+                completion_rate=completion.completed_count / lesson_count
+                if lesson_count
+                else 0.0,
+                next_lesson_id=None if next_lesson is None else lesson_ids[next_lesson],
+                lessons=completion.bit_string(lesson_count),
+            )
+        )
+    return SessionCompletionPublic(
+        lesson_ids=lesson_ids, data=data, count=len(data), histogram=histogram
+    )
+
+
 # Session Events endpoints
 @router.get("/{session_id}/events", response_model=SessionEventsPublic)
 def read_session_events(
@@ -342,3 +431,188 @@ def create_session_event(
 
     event = crud.create_session_event(session=session, event_in=event_in)
     return event
+
+
+# Attendance endpoints
+@router.put(
+    "/{session_id}/events/{event_id}/attendance",
+    response_model=EventAttendancePublic,
+)
+def record_event_attendance(
+    *,
+    session: SessionDep,
+    session_id: SessionIDCurrentTeacher,
+    event_id: uuid.UUID,
+    attendance_in: EventAttendanceUpdate,
+) -> EventAttendancePublic:
+    """
+    Record the attendance of a lesson for the whole roster: the listed students
+    were present, the session's other students absent.
+
+    Only the session's teachers and admins can record attendance.
+    """
+    event = crud.get_session_event(session=session, event_id=event_id)
+    if not event or event.session_id != session_id:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.is_break:
+        raise HTTPException(
+            status_code=400, detail="Attendance is only recorded for lessons"
+        )
+
+    roster = crud.assign_roster_positions(session=session, session_id=session_id)
+    present = set(attendance_in.present)
+    for student_id in attendance_in.present:
+        if student_id not in roster:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Student {student_id} is not enrolled in this session",
+            )
+    attendance = crud.record_event_attendance(
+        session=session, event_id=event_id, roster=roster, present=list(present)
+    )
+    return EventAttendancePublic(
+        event_id=event_id,
+        present=sorted(present, key=roster.__getitem__),
+        absent=sorted(roster.keys() - present, key=roster.__getitem__),
+        roster_count=attendance.roster_count,
+        present_count=attendance.present_count,
+        attendance_rate=attendance.attendance_rate,
+        updated_at=attendance.updated_at,
+    )
+
+
+@router.get("/{session_id}/attendance", response_model=SessionAttendancePublic)
+def read_session_attendance(
+    session: SessionDep, session_id: SessionIDCurrentTeacher
+) -> SessionAttendancePublic:
+    """
+    Get the attendance rate of every lesson and every student of the session.
+
+    Only the session's teachers and admins can see it.
+    """
+    if not crud.get_session(session=session, session_id=session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    attendances = crud.get_session_attendance(session=session, session_id=session_id)
+    masks = [
+        (attendance.roster_mask, attendance.present_mask)
+        for _, attendance in attendances
+    ]
+    events = [
+        EventAttendanceRatePublic(
+            event_id=event.id,
+            event_date=event.event_date,
+            roster_count=attendance.roster_count,
+            present_count=attendance.present_count,
+            attendance_rate=attendance.attendance_rate,
+        )
+        for event, attendance in attendances
+    ]
+    students = []
+    for student_id, position in crud.get_roster_students(
+        session=session, session_id=session_id
+    ):
+        lesson_count, present_count = crud.count_attendance(position, masks)
+        students.append(
+            StudentAttendanceRatePublic(
+                student_id=student_id,
+                lesson_count=lesson_count,
+                present_count=present_count,
+                attendance_rate=present_count / lesson_count if lesson_count else 0.0,
+            )
+        )
+    return SessionAttendancePublic(events=events, students=students)
+
+
+def _attendance_report(
+    session_id: uuid.UUID,
+    event_dates: list[str],
+    masks: list[tuple[int, int]],
+    batch_size: int = 500,
+) -> Iterator[str]:
+    """
+    CSV rows of the attendance report: a column per lesson with 1 (present),
+    0 (absent) or nothing (not enrolled then), written in batches of students.
+
+    The students are read with a session of its own: the rows are streamed
+    once the request's session is closed.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(
+        [
+            "student_id",
+            "first_name",
+            "father_name",
+            "family_name",
+            "email",
+            *event_dates,
+            "lessons",
+            "present",
+            "attendance_rate",
+        ]
+    )
+    with Session(engine) as session:
+        users = crud.iter_roster_users(
+            session=session, session_id=session_id, batch_size=batch_size
+        )
+        for row_number, (user, position) in enumerate(users, 1):
+            if position is None:
+                marks = [""] * len(masks)
+            else:
+                marks = [
+                    str(present_mask >> position & 1)
+                    if roster_mask >> position & 1
+                    else ""
+                    for roster_mask, present_mask in masks
+                ]
+            lesson_count, present_count = crud.count_attendance(position, masks)
+            rate = present_count / lesson_count if lesson_count else 0.0
+            writer.writerow(
+                [
+                    user.id,
+                    user.first_name,
+                    user.father_name,
+                    user.family_name,
+                    user.email,
+                    *marks,
+                    lesson_count,
+                    present_count,
+                    f"{rate:.3f}",
+                ]
+            )
+            if row_number % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/{session_id}/attendance/report")
+def read_session_attendance_report(
+    session: SessionDep, session_id: SessionIDCurrentTeacher
+) -> StreamingResponse:
+    """
+    Download the session's attendance as CSV, one row per student, streamed
+    as the students are read.
+
+    Only the session's teachers and admins can download it.
+    """
+    if not crud.get_session(session=session, session_id=session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    attendances = crud.get_session_attendance(session=session, session_id=session_id)
+    event_dates = [event.event_date.isoformat() for event, _ in attendances]
+    masks = [
+        (attendance.roster_mask, attendance.present_mask)
+        for _, attendance in attendances
+    ]
+    return StreamingResponse(
+        _attendance_report(session_id, event_dates, masks),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="attendance-{session_id}.csv"'
+            )
+        },
+    )
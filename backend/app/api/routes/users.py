@@ -1,4 +1,5 @@
 import uuid
+from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import ValidationError
@@ -9,11 +10,13 @@ from app.api.deps import (
     CurrentUser,
     SessionDep,
     get_current_active_superuser,
+    get_current_admin_or_superuser,
 )
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.models import (
     Message,
+    QuestionsPublic,
     UpdatePassword,
     User,
     UserCreate,
@@ -23,7 +26,7 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -49,6 +52,46 @@ def read_users(
     return UsersPublic(data=users, count=count)
 
 
+@router.get(
+    "/search",
+    dependencies=[Depends(get_current_admin_or_superuser)],
+    response_model=UsersPublic,
+)
+def search_users(
+    session: SessionDep,
+    q: str = Query(min_length=2, max_length=100),
+    is_teacher: bool | None = None,
+    is_admin: bool | None = None,
+    is_active: bool | None = None,
+    skip: int = 0,
+    limit: int = Query(default=100, le=500),
+) -> UsersPublic:
+    """
+    Search users by full name or email.
+
+    Matches prefixes, substrings and misspellings of the full name (first, father
+    and family name), ignoring tashkeel and hamza forms, or part of the email.
+    Only admins can search users.
+    """
+    users = crud.search_users(
+        session=session,
+        text=q,
+        is_teacher=is_teacher,
+        is_admin=is_admin,
+        is_active=is_active,
+        skip=skip,
+        limit=limit,
+    )
+    count = crud.count_search_users(
+        session=session,
+        text=q,
+        is_teacher=is_teacher,
+        is_admin=is_admin,
+        is_active=is_active,
+    )
+    return UsersPublic(data=users, count=count)
+
+
 @router.post(
     "/", dependencies=[Depends(get_current_active_superuser)], response_model=UserPublic
 )
@@ -68,7 +111,8 @@ def create_user(session: SessionDep, user_in: UserCreate) -> User:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
+        crud.enqueue_email(
+            session=session,
             email_to=user_in.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
@@ -126,6 +170,26 @@ def read_user_me(current_user: CurrentUser) -> User:
     return current_user
 
 
+@router.get("/me/review", response_model=QuestionsPublic)
+def read_my_review_queue(
+    session: SessionDep,
+    current_user: CurrentUser,
+    n: int = Query(default=20, ge=1, le=100),
+) -> QuestionsPublic:
+    """
+    Get the next n questions due for review, most overdue first.
+
+    Answering them through the answers endpoint reschedules them. Count is the
+    number of questions due now.
+    """
+    now = datetime.now(UTC)
+    questions = crud.get_due_reviews(
+        session=session, student_id=current_user.id, now=now, n=n
+    )
+    count = crud.count_due_reviews(session=session, student_id=current_user.id, now=now)
+    return QuestionsPublic(data=questions, count=count)
+
+
 @router.delete("/me", response_model=Message)
 def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Message:
     """
@@ -1,5 +1,6 @@
 import secrets
 import warnings
+from pathlib import Path
 from typing import Annotated, Any, Literal, Self
 
 from pydantic import (
@@ -51,6 +52,36 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str
     SENTRY_DSN: HttpUrl | None = None
+    # Expose Prometheus metrics on /metrics. Always enabled for local development.
+    METRICS_ENABLED: bool = False
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def metrics_enabled(self) -> bool:
+        return self.METRICS_ENABLED or self.ENVIRONMENT == "local"
+
+    # Local only: report SQL statements per request in X-DB-Queries/Server-Timing
+    # headers, and warn when a statement repeats this often in one request (N+1)
+    DB_REPEATED_QUERY_THRESHOLD: int = 5
+
+    # Lesson audio heartbeats are coalesced in memory and written this often
+    PROGRESS_FLUSH_SECONDS: float = 5.0
+
+    # Phases, phase books and lessons whose order keys got too close together
+    # are respaced this often (see app/crud/ordering.py)
+    ORDER_REBALANCE_SECONDS: float = 60 * 60.0
+
+    # Book and lesson files referenced by relative path are served from here
+    MEDIA_ROOT: Path = Path("media")
+    # When set, media is handed to the reverse proxy (nginx X-Accel-Redirect)
+    # under this internal location mapped to MEDIA_ROOT, instead of being sent
+    # by the API worker
+    MEDIA_ACCEL_REDIRECT_PREFIX: str | None = None
+    # Lesson book parts sliced from book PDFs are cached under MEDIA_ROOT, the
+    # least recently used evicted past this size
+    PDF_SLICE_CACHE_MAX_BYTES: int = 1024**3
+    PDF_SLICE_WORKERS: int = 2
+
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
@@ -85,6 +116,16 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Compile all email templates at startup instead of on first use
+    EMAIL_TEMPLATES_PRECOMPILE: bool = False
+
+    # Outbox drained by app/email_worker.py
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    # Retry delay doubles with every failed attempt, up to the max
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: int = 60 * 60
 
     @computed_field  # type: ignore[prop-decorator]
     @property
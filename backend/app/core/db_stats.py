@@ -0,0 +1,156 @@
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement so that repeated executions compare equal.
+
+    Statements emitted by SQLAlchemy are already parametrized, so apart from
+    whitespace the text only differs when the query itself differs.
+    """
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+@dataclass
+class RequestDBStats:
+    """SQL statements executed while handling the current request"""
+
+    queries: int = 0
+    duration: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times: likely N+1"""
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+# Set for the lifetime of a request. The stats object is mutated in place, so
+# updates made from threadpool workers (sync endpoints and dependencies run in
+# copied contexts) are visible to whoever set it.
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+@contextmanager
+def track_db_stats() -> Generator[RequestDBStats]:
+    """Collect DB stats for the enclosed block, reusing any enclosing tracker"""
+    stats = request_db_stats.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = RequestDBStats()
+    token = request_db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_db_stats.reset(token)
+
+
+def _before_cursor_execute(
+    conn: Any, _cursor: Any, _statement: Any, _params: Any, _context: Any, _many: Any
+) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, _cursor: Any, statement: str, _params: Any, _context: Any, _many: Any
+) -> None:
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.duration += duration
+        stats.shapes[statement_shape(statement)] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every SQL statement executed within a tracked request"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries(engine: Engine) -> Generator[list[str]]:
+    """
+    Capture every statement executed on `engine` in the enclosed block.
+
+    Unlike track_db_stats this isn't scoped to the current context, so it also
+    sees statements run by the TestClient's server thread. Meant for tests.
+    """
+    statements: list[str] = []
+
+    def _capture(
+        _conn: Any, _cursor: Any, statement: str, *_args: Any, **_kwargs: Any
+    ) -> None:
+        statements.append(statement_shape(statement))
+
+    event.listen(engine, "after_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", _capture)
+
+
+class DBStatsMiddleware:
+    """
+    Report the SQL statements of every HTTP request, for development.
+
+    Adds `X-DB-Queries` and `Server-Timing` response headers with the number of
+    statements and the time spent in the DB, and logs a warning when the same
+    statement shape runs `repeat_threshold` times or more in one request, which
+    usually means a lazy relationship loaded in a loop (N+1 queries).
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_db_stats() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    server_timing = (
+                        f"db;dur={stats.duration * 1000:.1f};"
+                        f'desc="{stats.queries} queries"'
+                    )
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-queries", str(stats.queries).encode()),
+                        (b"server-timing", server_timing.encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for shape, count in stats.repeated_shapes(self.repeat_threshold):
+            logger.warning(
+                f"Possible N+1 in {scope['method']} {scope['path']}: "
+                f"statement executed {count} times: {shape}"
+            )
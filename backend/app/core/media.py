@@ -0,0 +1,125 @@
+import mimetypes
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from app.core.config import settings
+from app.core.pdf_slices import PageRangeError, pdf_slices
+from app.models.media import is_remote
+
+# Under MEDIA_ROOT: uploaded files, named by content hash (see app/core/uploads.py)
+CONTENT_DIR = "sha256"
+
+# Versioned URLs change along with the content, so they're cached for good
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def resolve_media_path(reference: str) -> Path | None:
+    """
+    Resolve a relative media reference to a file under MEDIA_ROOT, or None when
+    it doesn't exist or points outside of it.
+    """
+    root = settings.MEDIA_ROOT.resolve()
+    path = (root / reference.lstrip("/")).resolve()
+    if not path.is_relative_to(root) or not path.is_file():
+        return None
+    return path
+
+
+def media_etag(stat_result: os.stat_result) -> str:
+    """Strong ETag: any change to the file changes its inode, size or mtime"""
+    return (
+        f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    )
+
+
+def media_response(
+    request: Request, reference: str | None, *, version: str | None, public: bool
+) -> Response:
+    """
+    Serve a book or lesson media reference, at the version of its URL (see
+    app.models.media.media_url).
+
+    References with a scheme are hosted elsewhere and redirected to. Local files
+    support Range requests and revalidation. They are sent without copying
+    through the worker: by the reverse proxy when MEDIA_ACCEL_REDIRECT_PREFIX is
+    set, or with the server's pathsend/sendfile otherwise.
+    """
+    if not reference:
+        raise HTTPException(status_code=404, detail="Media not found")
+    if is_remote(reference):
+        return RedirectResponse(reference)
+    path = resolve_media_path(reference)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return file_response(request, path, version=version, public=public)
+
+
+def book_pages_path(book_pdf: str | None, start: int, end: int) -> Path:
+    """Path of pages of a book's PDF, sliced on first request and then cached"""
+    source = resolve_media_path(book_pdf) if book_pdf else None
+    if source is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    try:
+        return pdf_slices.get(source, start, end)
+    except PageRangeError:
+        raise HTTPException(
+            status_code=404, detail="The lesson pages are not in the book PDF"
+        )
+
+
+def book_pages_response(
+    request: Request,
+    book_pdf: str | None,
+    start: int,
+    end: int,
+    *,
+    version: str | None,
+    public: bool,
+) -> Response:
+    """Serve pages of a book's PDF"""
+    path = book_pages_path(book_pdf, start, end)
+    return file_response(request, path, version=version, public=public)
+
+
+def file_response(
+    request: Request, path: Path, *, version: str | None, public: bool
+) -> Response:
+    """
+    Send a file under MEDIA_ROOT.
+
+    Requests for its current version (the `v` query parameter) can be cached
+    for good, requests for another version are redirected to the current one,
+    or to the unversioned URL when the version isn't known.
+    """
+    requested_version = request.query_params.get("v")
+    if requested_version is not None and requested_version != version:
+        if version is None:
+            return RedirectResponse(str(request.url.remove_query_params("v")))
+        return RedirectResponse(str(request.url.include_query_params(v=version)))
+
+    stat_result = path.stat()
+    etag = media_etag(stat_result)
+    cache_control = "public" if public else "private"
+    if requested_version is None:
+        cache_control += ", no-cache"
+    else:
+        cache_control += f", max-age={IMMUTABLE_MAX_AGE}, immutable"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX is not None:
+        relative = path.resolve().relative_to(settings.MEDIA_ROOT.resolve())
+        headers["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip(
+            "/"
+        ) + quote(f"/{relative.as_posix()}")
+        return Response(media_type=media_type, headers=headers)
+    return FileResponse(
+        path, media_type=media_type, headers=headers, stat_result=stat_result
+    )
@@ -0,0 +1,279 @@
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import db_stats
+
+# Same default buckets as the official Prometheus clients, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(labelnames, labelvalues, strict=True)
+    )
+    return f"{{{pairs}}}"
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in values
+        ]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        collect: Callable[[], float] | None = None,
+    ) -> None:
+        """A gauge set explicitly, or read from `collect` at scrape time"""
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._collect = collect
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def _samples(self) -> list[str]:
+        if self._collect is not None:
+            self.set(self._collect())
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        with self._lock:
+            counts = self._counts.get(labelvalues)
+            if counts is None:
+                counts = self._counts[labelvalues] = [0] * (len(self.buckets) + 1)
+            counts[idx] += 1
+            self._sums[labelvalues] = self._sums.get(labelvalues, 0.0) + value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = [
+                (labels, list(counts), self._sums[labels])
+                for labels, counts in self._counts.items()
+            ]
+        lines = []
+        bucket_labelnames = (*self.labelnames, "le")
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(
+                (*[str(b) for b in self.buckets], "+Inf"), counts, strict=True
+            ):
+                cumulative += count
+                bucket_labels = _format_labels(bucket_labelnames, (*labels, bound))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            sample_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{sample_labels} {total}")
+            lines.append(f"{self.name}_count{sample_labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register[M: _Metric](self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(
+    Counter(
+        "http_requests_total",
+        "Total HTTP requests by route, method and status code.",
+        ("route", "method", "status"),
+    )
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request duration in seconds.",
+        ("route", "method"),
+    )
+)
+http_request_db_duration_seconds = registry.register(
+    Histogram(
+        "http_request_db_duration_seconds",
+        "Time spent executing SQL statements per HTTP request, in seconds.",
+        ("route", "method"),
+    )
+)
+http_requests_in_progress = registry.register(
+    Gauge(
+        "http_requests_in_progress",
+        "HTTP requests currently being processed.",
+        ("method",),
+    )
+)
+
+
+# ==================== Database pool ====================
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time SQL statements and expose the engine's connection pool stats"""
+    db_stats.instrument_engine(engine)
+
+    pool: Any = engine.pool
+    for stat, documentation in (
+        ("size", "Configured size of the DB connection pool."),
+        ("checkedout", "DB connections currently checked out of the pool."),
+        ("checkedin", "Idle DB connections in the pool."),
+        ("overflow", "DB connections opened beyond the pool size."),
+    ):
+        if callable(getattr(pool, stat, None)):
+            registry.register(
+                Gauge(f"db_pool_{stat}", documentation, collect=getattr(pool, stat))
+            )
+
+
+# ==================== Middleware ====================
+
+
+class MetricsMiddleware:
+    """
+    Record duration, DB time and status of every HTTP request.
+
+    Requests are labelled with `route_id(route)` for the matched API route. Pass
+    the app's unique ID function so labels match the OpenAPI operation IDs
+    (e.g. `sessions-read_session_events`) and cardinality stays bounded by the
+    number of routes.
+    """
+
+    def __init__(self, app: ASGIApp, route_id: Callable[[APIRoute], str]) -> None:
+        self.app = app
+        self.route_id = route_id
+
+    def _route_label(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if isinstance(route, APIRoute):
+            return self.route_id(route)
+        return getattr(route, "name", None) or UNMATCHED_ROUTE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        start = time.perf_counter()
+        try:
+            with db_stats.track_db_stats() as stats:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_progress.dec(method)
+            route = self._route_label(scope)
+            http_requests_total.inc(route, method, str(status_code))
+            http_request_duration_seconds.observe(duration, route, method)
+            http_request_db_duration_seconds.observe(stats.duration, route, method)
@@ -0,0 +1,32 @@
+import asyncio
+import logging
+
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+
+def rebalance_orders() -> int:
+    """Respace the crowded containers, returning how many were"""
+    with Session(engine) as session:
+        return crud.rebalance_orders(session=session)
+
+
+async def run_order_rebalancer(interval: float) -> None:
+    """
+    Rebalance orders every `interval` seconds, until cancelled, so that moves
+    rarely find their neighbours too close and have to respace themselves.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            rebalanced = await run_in_threadpool(rebalance_orders)
+        except Exception:
+            logger.exception("Failed to rebalance orders, will retry")
+        else:
+            if rebalanced:
+                logger.info(f"Rebalanced the order of {rebalanced} containers")
@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Under MEDIA_ROOT
+CACHE_DIR = "cache/pdf-slices"
+
+
+class PageRangeError(ValueError):
+    """The pages are not in the PDF"""
+
+
+def write_slice(source: Path, start: int, end: int, destination: Path) -> None:
+    """Write pages start..end (1-based, inclusive) of a PDF to a new one"""
+    reader = PdfReader(source)
+    if end > len(reader.pages):
+        raise PageRangeError(f"{source.name} has {len(reader.pages)} pages")
+    writer = PdfWriter()
+    for page in reader.pages[start - 1 : end]:
+        writer.add_page(page)
+    # Other API workers may read the cache: only publish complete files
+    partial = destination.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        with partial.open("wb") as file:
+            writer.write(file)
+        os.replace(partial, destination)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def _mark_used(path: Path) -> None:
+    # Recency for eviction is the access time, set explicitly (mounts often
+    # don't update it on read). The modification time is kept: it's part of
+    # the slice's ETag, see app/core/media.py.
+    stat_result = path.stat()
+    os.utime(path, ns=(time.time_ns(), stat_result.st_mtime_ns))
+
+
+class PdfSliceCache:
+    """
+    Page ranges of book PDFs, generated on first request by a process pool and
+    cached on disk up to a size, evicting the least recently used (by access
+    time).
+
+    Concurrent requests for the same slice wait on a single generation. Slices
+    are keyed by the source's size and mtime as well, so replacing a book's PDF
+    doesn't serve stale slices.
+    """
+
+    def __init__(self, max_bytes: int, workers: int) -> None:
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pending: dict[Path, Future[None]] = {}
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def directory(self) -> Path:
+        return settings.MEDIA_ROOT / CACHE_DIR
+
+    def _slice_path(self, source: Path, start: int, end: int) -> Path:
+        stat_result = source.stat()
+        key = f"{source}:{stat_result.st_size}:{stat_result.st_mtime_ns}:{start}:{end}"
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.pdf"
+
+    def get(self, source: Path, start: int, end: int) -> Path:
+        """Path of the slice, generating it first if not cached"""
+        path = self._slice_path(source, start, end)
+        with self._lock:
+            future = self._pending.get(path)
+            submitted = future is None
+            if future is None:
+                if path.exists():
+                    _mark_used(path)
+                    return path
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self.directory.mkdir(parents=True, exist_ok=True)
+                future = self._executor.submit(write_slice, source, start, end, path)
+                self._pending[path] = future
+        if submitted:
+            # Runs right away if already done, so not under the lock
+            future.add_done_callback(lambda _: self._done(path))
+        future.result()
+        return path
+
+    def _done(self, path: Path) -> None:
+        with self._lock:
+            self._pending.pop(path, None)
+        try:
+            self.evict()
+        except OSError:
+            logger.exception("Failed to evict PDF slices")
+
+    def evict(self) -> None:
+        """Delete the least recently used slices until under the size cap"""
+        slices = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf"):
+                stat_result = entry.stat()
+                slices.append((stat_result.st_atime_ns, stat_result.st_size, entry))
+                total += stat_result.st_size
+        slices.sort(key=lambda item: item[0])
+        for _, size, entry in slices:
+            if total <= self.max_bytes:
+                break
+            Path(entry.path).unlink(missing_ok=True)
+            total -= size
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+pdf_slices = PdfSliceCache(
+    max_bytes=settings.PDF_SLICE_CACHE_MAX_BYTES, workers=settings.PDF_SLICE_WORKERS
+)
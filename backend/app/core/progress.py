@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import threading
+import uuid
+from datetime import datetime
+
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.db import engine
+from app.models import LessonProgress, LessonProgressHeartbeat
+
+logger = logging.getLogger(__name__)
+
+
+class HeartbeatBuffer:
+    """
+    Lesson audio heartbeats waiting to be written, coalesced per (student, lesson).
+
+    Players report their position every few seconds. Only the latest position
+    and the furthest one matter, so heartbeats are merged in memory and flushed
+    periodically in a single upsert: the DB sees one row per active listener
+    per flush instead of one write per heartbeat.
+    """
+
+    def __init__(self) -> None:
+        # Heartbeats arrive from threadpool workers (sync endpoints)
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[uuid.UUID, uuid.UUID], LessonProgress] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _merge(self, progress: LessonProgress) -> None:
+        key = (progress.student_id, progress.lesson_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = progress
+            return
+        if progress.updated_at >= pending.updated_at:
+            pending.position_seconds = progress.position_seconds
+            pending.updated_at = progress.updated_at
+        pending.max_position_seconds = max(
+            pending.max_position_seconds, progress.max_position_seconds
+        )
+        if progress.duration_seconds is not None:
+            pending.duration_seconds = progress.duration_seconds
+
+    def add(
+        self,
+        *,
+        student_id: uuid.UUID,
+        lesson_id: uuid.UUID,
+        heartbeat: LessonProgressHeartbeat,
+        received_at: datetime,
+    ) -> None:
+        """Record a heartbeat, replacing the pending one of the same lesson"""
+        progress = LessonProgress(
+            student_id=student_id,
+            lesson_id=lesson_id,
+            position_seconds=heartbeat.position_seconds,
+            max_position_seconds=heartbeat.position_seconds,
+            duration_seconds=heartbeat.duration_seconds,
+            updated_at=received_at,
+        )
+        with self._lock:
+            self._merge(progress)
+
+    def drain(self) -> list[LessonProgress]:
+        """Take all the pending progress, leaving the buffer empty"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+    def restore(self, progress: list[LessonProgress]) -> None:
+        """Put back drained progress that couldn't be written"""
+        with self._lock:
+            for item in progress:
+                self._merge(item)
+
+
+# Per process: each API worker flushes its own heartbeats
+heartbeats = HeartbeatBuffer()
+
+
+def flush_heartbeats(buffer: HeartbeatBuffer = heartbeats) -> int:
+    """Write the pending progress, returning the number of rows written"""
+    progress = buffer.drain()
+    if not progress:
+        return 0
+    try:
+        with Session(engine) as session:
+            written = crud.upsert_lesson_progress(session=session, progress=progress)
+            session.commit()
+    except Exception:
+        buffer.restore(progress)
+        raise
+    return written
+
+
+async def run_heartbeat_flusher(interval: float) -> None:
+    """Flush heartbeats every `interval` seconds, until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(flush_heartbeats)
+        except Exception:
+            logger.exception("Failed to flush lesson progress, will retry")
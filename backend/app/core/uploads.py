@@ -0,0 +1,145 @@
+import fcntl
+import hashlib
+import os
+import re
+import threading
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.media import CONTENT_DIR
+from app.models import MediaUpload
+
+# Under MEDIA_ROOT: part files of uploads in progress. Completed files go to
+# CONTENT_DIR by content hash, so identical uploads are stored once.
+UPLOADS_DIR = "uploads"
+
+_READ_SIZE = 1024 * 1024
+
+# Hash state of the uploads this process received chunks for, with the offset
+# it's at. Other workers (or a restart) rebuild it from the part file.
+_hashers: dict[uuid.UUID, tuple[hashlib._Hash, int]] = {}
+_hashers_lock = threading.Lock()
+
+
+def part_path(upload_id: uuid.UUID) -> Path:
+    return settings.MEDIA_ROOT / UPLOADS_DIR / f"{upload_id}.part"
+
+
+def received_size(upload_id: uuid.UUID) -> int:
+    """Bytes received so far, the offset to resume from"""
+    try:
+        return part_path(upload_id).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _hasher_at(upload_id: uuid.UUID, fd: int, offset: int) -> hashlib._Hash:
+    with _hashers_lock:
+        cached = _hashers.pop(upload_id, None)
+    if cached is not None and cached[1] == offset:
+        return cached[0]
+    hasher = hashlib.sha256()
+    position = 0
+    while position < offset:
+        block = os.pread(fd, min(_READ_SIZE, offset - position), position)
+        hasher.update(block)
+        position += len(block)
+    return hasher
+
+
+def _save_hasher(upload_id: uuid.UUID, hasher: hashlib._Hash, offset: int) -> None:
+    with _hashers_lock:
+        _hashers[upload_id] = (hasher, offset)
+
+
+def _append(fd: int, hasher: hashlib._Hash, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+    hasher.update(data)
+
+
+def _lock(fd: int) -> None:
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise HTTPException(status_code=409, detail="Upload already in progress")
+
+
+def _content_reference(digest: str, filename: str) -> str:
+    suffix = Path(filename).suffix.lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,10}", suffix):
+        suffix = ""
+    return f"{CONTENT_DIR}/{digest[:2]}/{digest}{suffix}"
+
+
+def content_digest(reference: str) -> str:
+    """SHA-256 of a file stored by an upload, from its reference"""
+    return Path(reference).name.split(".", 1)[0]
+
+
+def _store_content(upload: MediaUpload, fd: int) -> str:
+    path = part_path(upload.id)
+    digest = _hasher_at(upload.id, fd, upload.size).hexdigest()
+    reference = _content_reference(digest, upload.filename)
+    destination = settings.MEDIA_ROOT / reference
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        # Same content uploaded before
+        path.unlink()
+    else:
+        os.replace(path, destination)
+    return reference
+
+
+async def receive_chunk(
+    upload: MediaUpload, offset: int, chunks: AsyncIterator[bytes]
+) -> tuple[int, str | None]:
+    """
+    Append a chunk streamed from the request body at `offset`, which must be
+    the size received so far, hashing it on the way to disk.
+
+    Returns the size received and, once the whole file is, its reference in the
+    content-addressed storage. What was written before a failure is kept, to
+    resume from.
+    """
+    path = part_path(upload.id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        # Released when the file is closed
+        _lock(fd)
+        received = os.fstat(fd).st_size
+        if offset != received:
+            raise HTTPException(
+                status_code=409, detail=f"Upload is at offset {received}"
+            )
+        hasher = await run_in_threadpool(_hasher_at, upload.id, fd, received)
+        os.lseek(fd, received, os.SEEK_SET)
+        try:
+            async for chunk in chunks:
+                if received + len(chunk) > upload.size:
+                    raise HTTPException(
+                        status_code=413, detail="Upload exceeds its declared size"
+                    )
+                await run_in_threadpool(_append, fd, hasher, chunk)
+                received += len(chunk)
+        finally:
+            _save_hasher(upload.id, hasher, received)
+        if received < upload.size:
+            return received, None
+        return received, await run_in_threadpool(_store_content, upload, fd)
+    finally:
+        os.close(fd)
+
+
+def discard_upload(upload_id: uuid.UUID) -> None:
+    """Remove the bytes received for an upload"""
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+    part_path(upload_id).unlink(missing_ok=True)
@@ -1,10 +1,45 @@
+from app.crud.answer import (
+    create_answer_submission,
+    get_answer_keys,
+    get_answer_submission,
+    get_answer_submission_results,
+    grade_submission,
+    update_question_stats,
+)
+from app.crud.attendance import (
+    assign_roster_positions,
+    count_attendance,
+    get_event_attendance,
+    get_roster_students,
+    get_session_attendance,
+    iter_roster_users,
+    record_event_attendance,
+)
 from app.crud.book import (
     create_book,
     delete_book,
     get_book,
     get_books,
+    get_existing_book_ids,
+    is_book_in_user_sessions,
     update_book,
 )
+from app.crud.completion import (
+    build_lesson_completion,
+    get_book_program_ids,
+    get_program_lesson_ids,
+    get_session_completion,
+    rebuild_book_completion,
+    rebuild_program_completion,
+    save_lesson_completion,
+    update_lesson_completion,
+)
+from app.crud.email_outbox import (
+    enqueue_email,
+    get_due_emails,
+    mark_email_failed,
+    mark_email_sent,
+)
 from app.crud.exam import (
     create_exam,
     delete_exam,
@@ -27,32 +62,62 @@ from app.crud.lesson import (
     delete_lesson,
     get_lesson,
     get_lessons_by_book,
+    move_lesson,
+    reorder_lessons,
+    search_lessons,
     update_lesson,
 )
+from app.crud.media import (
+    attach_media_upload,
+    create_media_upload,
+    delete_media_upload,
+    get_media_upload,
+)
+from app.crud.ordering import rebalance_orders
 from app.crud.phase import (
     add_book_to_phase,
     create_phase,
     delete_phase,
     get_phase,
     get_phases_by_program,
+    move_phase,
+    move_phase_book,
     remove_book_from_phase,
+    reorder_phase_books,
+    reorder_phases,
     update_phase,
 )
 from app.crud.program import (
     create_program,
+    create_program_deep,
     delete_program,
     get_all_lessons,
     get_program,
     get_programs,
     update_program,
 )
+from app.crud.progress import (
+    count_session_progress,
+    get_session_progress,
+    upsert_lesson_progress,
+)
 from app.crud.question import (
     create_question,
     delete_question,
+    get_book_quiz,
+    get_phase_quiz,
     get_question,
     get_questions_by_lesson,
+    get_questions_with_stats_by_book,
+    get_questions_with_stats_by_lesson,
+    search_questions,
     update_question,
 )
+from app.crud.review import (
+    count_due_reviews,
+    get_due_reviews,
+    update_review_schedule,
+)
 from app.crud.session import (
     add_student_to_session,
     add_teacher_to_session,
@@ -74,19 +139,29 @@ from app.crud.session_event import (
 )
 from app.crud.user import (
     authenticate,
+    count_search_users,
     create_user,
     get_user_by_email,
+    search_users,
     update_user,
 )
+from app.crud.utils import unit_of_work
 
 __all__ = [
+    # Transactions
+    "unit_of_work",
+    # Ordering
+    "rebalance_orders",
     # User
     "create_user",
     "update_user",
     "get_user_by_email",
     "authenticate",
+    "search_users",
+    "count_search_users",
     # Program
     "create_program",
+    "create_program_deep",
     "get_program",
     "get_programs",
     "update_program",
@@ -98,24 +173,38 @@ __all__ = [
     "get_phases_by_program",
     "update_phase",
     "delete_phase",
+    "reorder_phases",
+    "move_phase",
     "add_book_to_phase",
     "remove_book_from_phase",
+    "reorder_phase_books",
+    "move_phase_book",
     # Book
     "create_book",
     "get_book",
     "get_books",
+    "get_existing_book_ids",
     "update_book",
     "delete_book",
+    "is_book_in_user_sessions",
     # Lesson
     "create_lesson",
     "get_lesson",
     "get_lessons_by_book",
+    "search_lessons",
     "update_lesson",
     "delete_lesson",
+    "reorder_lessons",
+    "move_lesson",
     # Question
     "create_question",
     "get_question",
     "get_questions_by_lesson",
+    "get_book_quiz",
+    "get_phase_quiz",
+    "get_questions_with_stats_by_lesson",
+    "get_questions_with_stats_by_book",
+    "search_questions",
     "update_question",
     "delete_question",
     # Session
@@ -135,6 +224,19 @@ __all__ = [
     "get_session_events_by_session",
     "update_session_event",
     "delete_session_event",
+    # MediaUpload
+    "create_media_upload",
+    "get_media_upload",
+    "attach_media_upload",
+    "delete_media_upload",
+    # Attendance
+    "assign_roster_positions",
+    "record_event_attendance",
+    "get_event_attendance",
+    "get_session_attendance",
+    "get_roster_students",
+    "iter_roster_users",
+    "count_attendance",
     # Exam
     "create_exam",
     "get_exam",
@@ -150,4 +252,33 @@ __all__ = [
     "get_student_attempts_for_exam",
     "update_exam_attempt",
     "delete_exam_attempt",
+    # Answers
+    "get_answer_keys",
+    "grade_submission",
+    "update_question_stats",
+    "create_answer_submission",
+    "get_answer_submission",
+    "get_answer_submission_results",
+    # Review
+    "update_review_schedule",
+    "get_due_reviews",
+    "count_due_reviews",
+    # LessonProgress
+    "upsert_lesson_progress",
+    "get_session_progress",
+    "count_session_progress",
+    # LessonCompletion
+    "get_program_lesson_ids",
+    "build_lesson_completion",
+    "get_session_completion",
+    "save_lesson_completion",
+    "update_lesson_completion",
+    "get_book_program_ids",
+    "rebuild_program_completion",
+    "rebuild_book_completion",
+    # EmailOutbox
+    "enqueue_email",
+    "get_due_emails",
+    "mark_email_sent",
+    "mark_email_failed",
 ]
@@ -0,0 +1,201 @@
+import uuid
+from collections.abc import Collection
+from typing import NamedTuple
+
+from sqlalchemy import BigInteger, ColumnElement, type_coerce
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, func, select
+
+from app.crud.review import update_review_schedule
+from app.crud.utils import commit
+from app.models import (
+    AnswerResultPublic,
+    AnswerSubmission,
+    AnswerSubmissionCreate,
+    AnswerSubmissionPublic,
+    Question,
+    QuestionAnswer,
+    QuestionStats,
+)
+from app.models.question import mask_to_options, options_to_mask
+
+
+def _correct_options_mask() -> ColumnElement[int]:
+    """Question.correct_options_mask as an int, the computed column is never NULL"""
+    return type_coerce(col(Question.correct_options_mask), BigInteger)
+
+
+class AnswerKey(NamedTuple):
+    correct: int
+    """Bitmask of the correct options"""
+    num_options: int
+
+
+def get_answer_keys(
+    *, session: Session, question_ids: Collection[uuid.UUID]
+) -> dict[uuid.UUID, AnswerKey]:
+    """Get the answer keys of the given questions, in one query"""
+    statement = select(
+        Question.id,
+        _correct_options_mask(),
+        func.json_array_length(Question.options),
+    ).where(col(Question.id).in_(question_ids))
+    return {
+        question_id: AnswerKey(correct_options_mask, num_options)
+        for question_id, correct_options_mask, num_options in session.exec(statement)
+    }
+
+
+def grade_submission(
+    *,
+    submission_id: uuid.UUID,
+    submission_in: AnswerSubmissionCreate,
+    answer_keys: dict[uuid.UUID, AnswerKey],
+) -> list[QuestionAnswer]:
+    """Grade every answer against the answer keys, with no DB access"""
+    # An answer is correct when exactly the correct options are selected
+    answers = []
+    for answer in submission_in.answers:
+        selected = options_to_mask(answer.selected_options)
+        answers.append(
+            QuestionAnswer(
+                submission_id=submission_id,
+                question_id=answer.question_id,
+                selected=selected,
+                is_correct=selected == answer_keys[answer.question_id].correct,
+            )
+        )
+    return answers
+
+
+def update_question_stats(
+    *,
+    session: Session,
+    answers: list[QuestionAnswer],
+    answer_keys: dict[uuid.UUID, AnswerKey],
+) -> None:
+    """Add the graded answers of a submission to the questions' stats, in one upsert"""
+    score = sum(answer.is_correct for answer in answers) / len(answers)
+    rows = [
+        {
+            "question_id": answer.question_id,
+            "attempts": 1,
+            "correct": int(answer.is_correct),
+            "option_picks": [
+                answer.selected >> option & 1
+                for option in range(answer_keys[answer.question_id].num_options)
+            ],
+            "score_sum": score,
+            "score_squares_sum": score**2,
+            "correct_score_sum": score if answer.is_correct else 0.0,
+        }
+        # Lock rows in the same order in concurrent submissions to avoid deadlocks
+        for answer in sorted(answers, key=lambda answer: answer.question_id)
+    ]
+    statement = insert(QuestionStats).values(rows)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[col(QuestionStats.question_id)],
+        set_={
+            "attempts": QuestionStats.attempts + excluded.attempts,
+            "correct": QuestionStats.correct + excluded.correct,
+            "option_picks": func.int_array_add(
+                QuestionStats.option_picks, excluded.option_picks
+            ),
+            "score_sum": QuestionStats.score_sum + excluded.score_sum,
+            "score_squares_sum": QuestionStats.score_squares_sum
+            + excluded.score_squares_sum,
+            "correct_score_sum": QuestionStats.correct_score_sum
+            + excluded.correct_score_sum,
+        },
+    )
+    session.exec(statement)
+
+
+def create_answer_submission(
+    *,
+    session: Session,
+    student_id: uuid.UUID,
+    submission_in: AnswerSubmissionCreate,
+    answer_keys: dict[uuid.UUID, AnswerKey],
+) -> AnswerSubmissionPublic:
+    """
+    Grade and store a batch of answers, returning the results.
+
+    Also updates the question stats and the student's review schedule.
+    """
+    submission_id = uuid.uuid4()
+    answers = grade_submission(
+        submission_id=submission_id,
+        submission_in=submission_in,
+        answer_keys=answer_keys,
+    )
+    submission = AnswerSubmission(
+        id=submission_id,
+        student_id=student_id,
+        score=sum(answer.is_correct for answer in answers),
+        total=len(answers),
+        answers=answers,
+    )
+    # Build the results before committing expires the submission and answers
+    results = AnswerSubmissionPublic(
+        id=submission.id,
+        score=submission.score,
+        total=submission.total,
+        submitted_at=submission.submitted_at,
+        results=[
+            AnswerResultPublic(
+                question_id=answer.question_id,
+                selected_options=mask_to_options(answer.selected),
+                correct_options=mask_to_options(
+                    answer_keys[answer.question_id].correct
+                ),
+                is_correct=answer.is_correct,
+            )
+            for answer in answers
+        ],
+    )
+    session.add(submission)
+    update_question_stats(session=session, answers=answers, answer_keys=answer_keys)
+    update_review_schedule(
+        session=session,
+        student_id=student_id,
+        answers=answers,
+        now=submission.submitted_at,
+    )
+    commit(session)
+    return results
+
+
+def get_answer_submission(
+    *, session: Session, submission_id: uuid.UUID
+) -> AnswerSubmission | None:
+    """Get an answer submission by ID"""
+    return session.get(AnswerSubmission, submission_id)
+
+
+def get_answer_submission_results(
+    *, session: Session, submission: AnswerSubmission
+) -> AnswerSubmissionPublic:
+    """Get the graded answers of a submission, with the correct options"""
+    statement = (
+        select(QuestionAnswer, _correct_options_mask())
+        .join(Question, col(Question.id) == QuestionAnswer.question_id)
+        .where(QuestionAnswer.submission_id == submission.id)
+    )
+    results = [
+        AnswerResultPublic(
+            question_id=answer.question_id,
+            selected_options=mask_to_options(answer.selected),
+            correct_options=mask_to_options(correct_options_mask),
+            is_correct=answer.is_correct,
+        )
+        for answer, correct_options_mask in session.exec(statement)
+    ]
+    return AnswerSubmissionPublic(
+        id=submission.id,
+        score=submission.score,
+        total=submission.total,
+        submitted_at=submission.submitted_at,
+        results=results,
+    )
@@ -0,0 +1,179 @@
+import uuid
+from collections.abc import Iterator
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, and_, col, func, select
+
+from app.crud.utils import commit
+from app.models import (
+    EventAttendance,
+    ProgramSession,
+    SessionEvent,
+    SessionRosterEntry,
+    User,
+    UserSessionStudent,
+)
+from app.models.attendance import positions_to_bitmap
+
+
+def assign_roster_positions(
+    *, session: Session, session_id: uuid.UUID
+) -> dict[uuid.UUID, int]:
+    """
+    Get the roster positions of the session's students, giving positions to
+    students who don't have one yet.
+    """
+    # Serialize position assignment within the session
+    session.exec(
+        select(ProgramSession.id)
+        .where(ProgramSession.id == session_id)
+        .with_for_update()
+    )
+    statement = (
+        select(UserSessionStudent.user_id, SessionRosterEntry.position)
+        .outerjoin(
+            SessionRosterEntry,
+            and_(
+                col(SessionRosterEntry.session_id) == UserSessionStudent.session_id,
+                col(SessionRosterEntry.student_id) == UserSessionStudent.user_id,
+            ),
+        )
+        .where(UserSessionStudent.session_id == session_id)
+    )
+    roster: dict[uuid.UUID, int] = {}
+    unassigned: list[uuid.UUID] = []
+    for student_id, position in session.exec(statement):
+        if position is None:
+            unassigned.append(student_id)
+        else:
+            roster[student_id] = position
+    if unassigned:
+        next_position = session.exec(
+            select(func.coalesce(func.max(SessionRosterEntry.position) + 1, 0)).where(
+                SessionRosterEntry.session_id == session_id
+            )
+        ).one()
+        assigned = {
+            student_id: position
+            for position, student_id in enumerate(sorted(unassigned), next_position)
+        }
+        entries = [
+            {"session_id": session_id, "position": position, "student_id": student_id}
+            for student_id, position in assigned.items()
+        ]
+        session.exec(insert(SessionRosterEntry).values(entries))
+        roster.update(assigned)
+    return roster
+
+
+def record_event_attendance(
+    *,
+    session: Session,
+    event_id: uuid.UUID,
+    roster: dict[uuid.UUID, int],
+    present: list[uuid.UUID],
+) -> EventAttendance:
+    """Store the attendance of a lesson as bitmaps over the roster, replacing any"""
+    size = max(roster.values(), default=-1) + 1
+    attendance = EventAttendance(
+        event_id=event_id,
+        roster=positions_to_bitmap(list(roster.values()), size),
+        present=positions_to_bitmap(
+            [roster[student_id] for student_id in present], size
+        ),
+        roster_count=len(roster),
+        present_count=len(set(present)),
+    )
+    statement = insert(EventAttendance).values(**attendance.model_dump())
+    statement = statement.on_conflict_do_update(
+        index_elements=[col(EventAttendance.event_id)],
+        set_={
+            column: statement.excluded[column]
+            for column in (
+                "roster",
+                "present",
+                "roster_count",
+                "present_count",
+                "updated_at",
+            )
+        },
+    )
+    session.exec(statement)
+    commit(session)
+    return attendance
+
+
+def get_event_attendance(
+    *, session: Session, event_id: uuid.UUID
+) -> EventAttendance | None:
+    """Get the attendance of a lesson"""
+    return session.get(EventAttendance, event_id)
+
+
+def get_session_attendance(
+    *, session: Session, session_id: uuid.UUID
+) -> list[tuple[SessionEvent, EventAttendance]]:
+    """Get the attendance of every lesson of the session, by event date"""
+    statement = (
+        select(SessionEvent, EventAttendance)
+        .join(EventAttendance)
+        .where(SessionEvent.session_id == session_id)
+        .order_by(col(SessionEvent.event_date), col(SessionEvent.id))
+    )
+    return list(session.exec(statement).all())
+
+
+def get_roster_students(
+    *, session: Session, session_id: uuid.UUID
+) -> list[tuple[uuid.UUID, int | None]]:
+    """Get the session's students with their roster positions, if assigned"""
+    statement = (
+        select(UserSessionStudent.user_id, SessionRosterEntry.position)
+        .outerjoin(
+            SessionRosterEntry,
+            and_(
+                col(SessionRosterEntry.session_id) == UserSessionStudent.session_id,
+                col(SessionRosterEntry.student_id) == UserSessionStudent.user_id,
+            ),
+        )
+        .where(UserSessionStudent.session_id == session_id)
+        .order_by(col(SessionRosterEntry.position).nulls_last())
+    )
+    return list(session.exec(statement).all())
+
+
+def iter_roster_users(
+    *, session: Session, session_id: uuid.UUID, batch_size: int = 500
+) -> Iterator[tuple[User, int | None]]:
+    """Stream the session's students with their roster positions, in batches"""
+    statement = (
+        select(User, SessionRosterEntry.position)
+        .join(UserSessionStudent, col(UserSessionStudent.user_id) == User.id)
+        .outerjoin(
+            SessionRosterEntry,
+            and_(
+                col(SessionRosterEntry.session_id) == UserSessionStudent.session_id,
+                col(SessionRosterEntry.student_id) == User.id,
+            ),
+        )
+        .where(UserSessionStudent.session_id == session_id)
+        .order_by(col(SessionRosterEntry.position).nulls_last(), col(User.id))
+        .execution_options(yield_per=batch_size)
+    )
+    yield from session.exec(statement)
+
+
+def count_attendance(
+    position: int | None, masks: list[tuple[int, int]]
+) -> tuple[int, int]:
+    """
+    Count the lessons a student was enrolled in and present at, from the
+    (roster, present) bitmasks of the lessons.
+    """
+    if position is None:
+        return 0, 0
+    enrolled = present = 0
+    for roster_mask, present_mask in masks:
+        enrolled += roster_mask >> position & 1
+        present += present_mask >> position & 1
+    return enrolled, present
@@ -1,18 +1,27 @@
 import uuid
+from collections.abc import Collection
 
-from sqlmodel import Session, select
+from sqlmodel import Session, col, exists, select, union_all
 
-from app.crud.utils import validate_update_model
-from app.models import Book, BookCreate, BookUpdate
+from app.crud.completion import get_book_program_ids, rebuild_program_completion
+from app.crud.media import clear_media_digests, set_book_pages_versions
+from app.crud.utils import commit, save, validate_update_model
+from app.models import (
+    Book,
+    BookCreate,
+    BookUpdate,
+    Phase,
+    PhaseBook,
+    ProgramSession,
+    UserSessionStudent,
+    UserSessionTeacher,
+)
 
 
 def create_book(*, session: Session, book_in: BookCreate) -> Book:
     """Create a new book"""
     db_obj = Book.model_validate(book_in)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
 
 
 def get_book(*, session: Session, book_id: uuid.UUID) -> Book | None:
@@ -26,22 +35,60 @@ def get_books(*, session: Session, skip: int = 0, limit: int = 100) -> list[Book
     return list(session.exec(statement).all())
 
 
+def get_existing_book_ids(
+    *, session: Session, book_ids: Collection[uuid.UUID]
+) -> set[uuid.UUID]:
+    """Get which of the books exist"""
+    if not book_ids:
+        return set()
+    statement = select(Book.id).where(col(Book.id).in_(book_ids))
+    return set(session.exec(statement).all())
+
+
 def update_book(*, session: Session, db_book: Book, book_in: BookUpdate) -> Book:
     """Update a book"""
     book_data = book_in.model_dump(exclude_unset=True)
     validate_update_model(Book, db_book, book_data)
+    pdf_changed = book_data.get("pdf", db_book.pdf) != db_book.pdf
+    clear_media_digests(db_book, book_data)
     db_book.sqlmodel_update(book_data)
-    session.add(db_book)
-    session.commit()
-    session.refresh(db_book)
-    return db_book
+    if pdf_changed:
+        # Not uploaded, so no longer known
+        set_book_pages_versions(
+            session=session, book_id=db_book.id, book_pdf_sha256=None
+        )
+    return save(session=session, db_obj=db_book)
 
 
 def delete_book(*, session: Session, book_id: uuid.UUID) -> bool:
     """Delete a book"""
     db_obj = session.get(Book, book_id)
     if db_obj:
+        program_ids = get_book_program_ids(session=session, book_id=book_id)
         session.delete(db_obj)
-        session.commit()
+        rebuild_program_completion(session=session, program_ids=program_ids)
+        commit(session)
         return True
     return False
+
+
+def is_book_in_user_sessions(
+    *, session: Session, user_id: uuid.UUID, book_id: uuid.UUID
+) -> bool:
+    """Whether the user studies or teaches a session whose program has the book"""
+    user_sessions = union_all(
+        select(UserSessionStudent.session_id).where(
+            UserSessionStudent.user_id == user_id
+        ),
+        select(UserSessionTeacher.session_id).where(
+            UserSessionTeacher.user_id == user_id
+        ),
+    ).subquery()
+    statement = select(
+        exists()
+        .where(col(ProgramSession.id).in_(select(user_sessions.c.session_id)))
+        .where(col(Phase.program_id) == ProgramSession.program_id)
+        .where(col(PhaseBook.phase_id) == Phase.id)
+        .where(col(PhaseBook.book_id) == book_id)
+    )
+    return session.exec(statement).one()
@@ -0,0 +1,225 @@
+import uuid
+from collections import defaultdict
+from collections.abc import Collection, Iterable, Sequence
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, and_, col, select
+
+from app.models import (
+    Book,
+    Lesson,
+    LessonCompletion,
+    LessonProgress,
+    Phase,
+    PhaseBook,
+    ProgramSession,
+    UserSessionStudent,
+)
+from app.models.completion import lessons_fingerprint
+
+
+def get_program_lesson_ids(
+    *, session: Session, program_id: uuid.UUID
+) -> list[uuid.UUID]:
+    """Get the IDs of all lessons of a program, in crud.get_all_lessons order"""
+    statement = (
+        select(Lesson.id)
+        .join(Book)
+        .join(PhaseBook)
+        .join(Phase)
+        .where(Phase.program_id == program_id)
+        .order_by(col(Phase.order), col(PhaseBook.order), col(Lesson.order))
+    )
+    return list(session.exec(statement).all())
+
+
+def build_lesson_completion(
+    *,
+    session: Session,
+    session_id: uuid.UUID,
+    lesson_ids: Sequence[uuid.UUID],
+    student_ids: Collection[uuid.UUID],
+) -> list[LessonCompletion]:
+    """Build the students' completion bitsets from their lesson progress"""
+    positions = {lesson_id: position for position, lesson_id in enumerate(lesson_ids)}
+    masks: dict[uuid.UUID, int] = defaultdict(int)
+    statement = select(LessonProgress.student_id, LessonProgress.lesson_id).where(
+        col(LessonProgress.student_id).in_(student_ids),
+        col(LessonProgress.lesson_id).in_(lesson_ids),
+        col(LessonProgress.completed),
+    )
+    for student_id, lesson_id in session.exec(statement):
+        masks[student_id] |= 1 << positions[lesson_id]
+
+    fingerprint = lessons_fingerprint(lesson_ids)
+    size = (len(lesson_ids) + 7) // 8
+    return [
+        LessonCompletion(
+            session_id=session_id,
+            student_id=student_id,
+            bits=masks[student_id].to_bytes(size, "little"),
+            completed_count=masks[student_id].bit_count(),
+            lessons_fingerprint=fingerprint,
+        )
+        for student_id in sorted(student_ids)
+    ]
+
+
+def save_lesson_completion(
+    *, session: Session, completions: Sequence[LessonCompletion]
+) -> None:
+    """Store completion bitsets in one upsert. Doesn't commit."""
+    if not completions:
+        return
+    statement = insert(LessonCompletion).values(
+        [completion.model_dump() for completion in completions]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            col(LessonCompletion.session_id),
+            col(LessonCompletion.student_id),
+        ],
+        set_={
+            column: statement.excluded[column]
+            for column in ("bits", "completed_count", "lessons_fingerprint")
+        },
+    )
+    session.exec(statement)
+
+
+def get_session_completion(
+    *, session: Session, session_id: uuid.UUID, lesson_ids: Sequence[uuid.UUID]
+) -> list[LessonCompletion]:
+    """
+    Get the completion bitsets of every student of a session, in one query.
+
+    Bitsets that are missing or were built against other lessons are built
+    from the progress instead, without being stored: reading writes nothing.
+    They're stored when the students complete a lesson or the program's lessons
+    change (see update_lesson_completion and rebuild_program_completion).
+    """
+    statement = (
+        select(UserSessionStudent.user_id, LessonCompletion)
+        .outerjoin(
+            LessonCompletion,
+            and_(
+                col(LessonCompletion.session_id) == UserSessionStudent.session_id,
+                col(LessonCompletion.student_id) == UserSessionStudent.user_id,
+            ),
+        )
+        .where(UserSessionStudent.session_id == session_id)
+        .order_by(col(UserSessionStudent.user_id))
+    )
+    fingerprint = lessons_fingerprint(lesson_ids)
+    completions: dict[uuid.UUID, LessonCompletion] = {}
+    stale = []
+    for student_id, completion in session.exec(statement):
+        if completion is None or completion.lessons_fingerprint != fingerprint:
+            stale.append(student_id)
+        else:
+            completions[student_id] = completion
+    if stale:
+        for completion in build_lesson_completion(
+            session=session,
+            session_id=session_id,
+            lesson_ids=lesson_ids,
+            student_ids=stale,
+        ):
+            completions[completion.student_id] = completion
+    return [completions[student_id] for student_id in sorted(completions)]
+
+
+def _rebuild_lesson_completion(
+    *, session: Session, rows: Iterable[tuple[uuid.UUID, uuid.UUID, uuid.UUID]]
+) -> None:
+    # rows are (session, program, student)
+    programs: dict[uuid.UUID, uuid.UUID] = {}
+    students: dict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+    for session_id, program_id, student_id in rows:
+        programs[session_id] = program_id
+        students[session_id].add(student_id)
+
+    program_lesson_ids: dict[uuid.UUID, list[uuid.UUID]] = {}
+    for session_id in sorted(students):
+        program_id = programs[session_id]
+        if program_id not in program_lesson_ids:
+            program_lesson_ids[program_id] = get_program_lesson_ids(
+                session=session, program_id=program_id
+            )
+        completions = build_lesson_completion(
+            session=session,
+            session_id=session_id,
+            lesson_ids=program_lesson_ids[program_id],
+            student_ids=students[session_id],
+        )
+        save_lesson_completion(session=session, completions=completions)
+
+
+def update_lesson_completion(
+    *, session: Session, completed: Collection[tuple[uuid.UUID, uuid.UUID]]
+) -> None:
+    """
+    Rebuild the completion bitsets of students who completed lessons, given
+    as (student, lesson) pairs, in the sessions whose program has the lesson
+    only. Doesn't commit.
+    """
+    statement = (
+        select(
+            UserSessionStudent.session_id,
+            ProgramSession.program_id,
+            UserSessionStudent.user_id,
+        )
+        .join(ProgramSession, col(ProgramSession.id) == UserSessionStudent.session_id)
+        .join(Phase, col(Phase.program_id) == ProgramSession.program_id)
+        .join(PhaseBook, col(PhaseBook.phase_id) == Phase.id)
+        .join(Lesson, col(Lesson.book_id) == PhaseBook.book_id)
+        .where(
+            tuple_(col(UserSessionStudent.user_id), col(Lesson.id)).in_(list(completed))
+        )
+        .distinct()
+    )
+    _rebuild_lesson_completion(session=session, rows=session.exec(statement))
+
+
+def get_book_program_ids(*, session: Session, book_id: uuid.UUID) -> list[uuid.UUID]:
+    """Get the IDs of the programs with the book in one of their phases"""
+    statement = (
+        select(Phase.program_id)
+        .join(PhaseBook, col(PhaseBook.phase_id) == Phase.id)
+        .where(PhaseBook.book_id == book_id)
+        .distinct()
+    )
+    return list(session.exec(statement).all())
+
+
+def rebuild_program_completion(
+    *, session: Session, program_ids: Collection[uuid.UUID]
+) -> None:
+    """
+    Rebuild the completion bitsets of every student of the programs' sessions,
+    after the programs' lessons changed. Doesn't commit.
+    """
+    if not program_ids:
+        return
+    statement = (
+        select(
+            UserSessionStudent.session_id,
+            ProgramSession.program_id,
+            UserSessionStudent.user_id,
+        )
+        .join(ProgramSession, col(ProgramSession.id) == UserSessionStudent.session_id)
+        .where(col(ProgramSession.program_id).in_(program_ids))
+    )
+    _rebuild_lesson_completion(session=session, rows=session.exec(statement))
+
+
+def rebuild_book_completion(*, session: Session, book_id: uuid.UUID) -> None:
+    """
+    Rebuild the completion bitsets of every student of the sessions whose
+    program has the book, after the book's lessons changed. Doesn't commit.
+    """
+    rebuild_program_completion(
+        session=session,
+        program_ids=get_book_program_ids(session=session, book_id=book_id),
+    )
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.crud.utils import save
+from app.models import EmailOutbox
+from app.models.email_outbox import (
+    EMAIL_STATUS_FAILED,
+    EMAIL_STATUS_PENDING,
+    EMAIL_STATUS_SENT,
+    utc_now,
+)
+
+
+def enqueue_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    """Persist an email to be delivered by the email worker"""
+    db_obj = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    return save(session=session, db_obj=db_obj)
+
+
+def get_due_emails(*, session: Session, limit: int = 100) -> list[EmailOutbox]:
+    """Lock and return pending emails whose next attempt is due.
+
+    Rows locked by another worker are skipped, so several workers can drain the
+    outbox concurrently. The lock is held until the caller commits.
+    """
+    statement = (
+        select(EmailOutbox)
+        .where(
+            EmailOutbox.status == EMAIL_STATUS_PENDING,
+            col(EmailOutbox.next_attempt_at) <= utc_now(),
+        )
+        .order_by(col(EmailOutbox.next_attempt_at))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(session.exec(statement).all())
+
+
+def mark_email_sent(*, session: Session, db_email: EmailOutbox) -> None:
+    """Flag an email as delivered. The caller is responsible for committing."""
+    db_email.status = EMAIL_STATUS_SENT
+    db_email.attempts += 1
+    db_email.last_error = None
+    db_email.sent_at = utc_now()
+    session.add(db_email)
+
+
+def mark_email_failed(*, session: Session, db_email: EmailOutbox, error: str) -> None:
+    """Schedule a retry with exponential back-off, or give up after max attempts.
+
+    The caller is responsible for committing.
+    """
+    db_email.attempts += 1
+    db_email.last_error = error
+    if db_email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        db_email.status = EMAIL_STATUS_FAILED
+    else:
+        delay = min(
+            settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (db_email.attempts - 1),
+            settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS,
+        )
+        db_email.next_attempt_at = utc_now() + timedelta(seconds=delay)
+    session.add(db_email)
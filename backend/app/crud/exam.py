@@ -2,17 +2,14 @@ import uuid
 
 from sqlmodel import Session, select
 
-from app.crud.utils import validate_update_model
+from app.crud.utils import commit, save, validate_update_model
 from app.models import Exam, ExamCreate, ExamUpdate
 
 
 def create_exam(*, session: Session, exam_in: ExamCreate) -> Exam:
     """Create a new exam"""
     db_obj = Exam.model_validate(exam_in)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
 
 
 def get_exam(*, session: Session, exam_id: uuid.UUID) -> Exam | None:
@@ -43,10 +40,7 @@ def update_exam(*, session: Session, db_exam: Exam, exam_in: ExamUpdate) -> Exam
     exam_data = exam_in.model_dump(exclude_unset=True)
     validate_update_model(Exam, db_exam, exam_data)
     db_exam.sqlmodel_update(exam_data)
-    session.add(db_exam)
-    session.commit()
-    session.refresh(db_exam)
-    return db_exam
+    return save(session=session, db_obj=db_exam)
 
 
 def delete_exam(*, session: Session, exam_id: uuid.UUID) -> bool:
@@ -54,6 +48,6 @@ def delete_exam(*, session: Session, exam_id: uuid.UUID) -> bool:
     db_obj = session.get(Exam, exam_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        commit(session)
         return True
     return False
@@ -2,7 +2,7 @@ import uuid
 
 from sqlmodel import Session, col, select
 
-from app.crud.utils import validate_update_model
+from app.crud.utils import commit, save, validate_update_model
 from app.models import ExamAttempt, ExamAttemptCreate, ExamAttemptUpdate
 
 
@@ -11,10 +11,7 @@ def create_exam_attempt(
 ) -> ExamAttempt:
     """Create a new exam attempt"""
     db_obj = ExamAttempt.model_validate(attempt_in)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
 
 
 def get_exam_attempt(*, session: Session, attempt_id: uuid.UUID) -> ExamAttempt | None:
@@ -69,10 +66,7 @@ def update_exam_attempt(
     attempt_data = attempt_in.model_dump(exclude_unset=True)
     validate_update_model(ExamAttempt, db_attempt, attempt_data)
     db_attempt.sqlmodel_update(attempt_data)
-    session.add(db_attempt)
-    session.commit()
-    session.refresh(db_attempt)
-    return db_attempt
+    return save(session=session, db_obj=db_attempt)
 
 
 def delete_exam_attempt(*, session: Session, attempt_id: uuid.UUID) -> bool:
@@ -80,6 +74,6 @@ def delete_exam_attempt(*, session: Session, attempt_id: uuid.UUID) -> bool:
     db_obj = session.get(ExamAttempt, attempt_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        commit(session)
         return True
     return False
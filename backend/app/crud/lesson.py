@@ -1,18 +1,30 @@
 import uuid
 
-from sqlmodel import Session, col, select
+from sqlmodel import Session, col, func, select
 
-from app.crud.utils import validate_update_model
+from app.crud.completion import rebuild_book_completion
+from app.crud.media import clear_media_digests, set_book_pages_version
+from app.crud.ordering import LESSONS, insert_order_key, move, reorder
+from app.crud.utils import commit, save, unit_of_work, validate_update_model
 from app.models import Lesson, LessonCreate, LessonUpdate
+from app.models.search import search_match, search_query
 
 
 def create_lesson(*, session: Session, lesson_in: LessonCreate) -> Lesson:
-    """Create a new lesson"""
-    db_obj = Lesson.model_validate(lesson_in)
+    """Create a new lesson, at its position in the book or last without one"""
+    order = lesson_in.order
+    if order is None:
+        order = insert_order_key(
+            session=session,
+            ordering=LESSONS,
+            parent_id=lesson_in.book_id,
+            position=lesson_in.position,
+        )
+    db_obj = Lesson.model_validate(lesson_in, update={"order": order})
+    set_book_pages_version(session=session, lesson=db_obj)
     session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    rebuild_book_completion(session=session, book_id=db_obj.book_id)
+    return save(session=session, db_obj=db_obj)
 
 
 def get_lesson(*, session: Session, lesson_id: uuid.UUID) -> Lesson | None:
@@ -34,17 +46,59 @@ def get_lessons_by_book(
     return list(session.exec(statement).all())
 
 
+def search_lessons(
+    *, session: Session, text: str, skip: int = 0, limit: int = 100
+) -> list[Lesson]:
+    """Full-text search lesson explanation notes, best matches first"""
+    rank = func.ts_rank(col(Lesson.search_vector), search_query(text))
+    statement = (
+        select(Lesson)
+        .where(search_match(Lesson.search_vector, text))
+        .order_by(rank.desc(), col(Lesson.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
 def update_lesson(
     *, session: Session, db_lesson: Lesson, lesson_in: LessonUpdate
 ) -> Lesson:
     """Update a lesson"""
     lesson_data = lesson_in.model_dump(exclude_unset=True)
     validate_update_model(Lesson, db_lesson, lesson_data)
+    clear_media_digests(db_lesson, lesson_data)
     db_lesson.sqlmodel_update(lesson_data)
-    session.add(db_lesson)
-    session.commit()
-    session.refresh(db_lesson)
-    return db_lesson
+    set_book_pages_version(session=session, lesson=db_lesson)
+    return save(session=session, db_obj=db_lesson)
+
+
+def reorder_lessons(
+    *, session: Session, book_id: uuid.UUID, lesson_ids: list[uuid.UUID]
+) -> bool:
+    """Reorder all the lessons of a book, in one statement"""
+    with unit_of_work(session):
+        reordered = reorder(
+            session=session, ordering=LESSONS, parent_id=book_id, keys=lesson_ids
+        )
+        if reordered:
+            rebuild_book_completion(session=session, book_id=book_id)
+    return reordered
+
+
+def move_lesson(*, session: Session, lesson: Lesson, position: int) -> bool:
+    """Move a lesson to a position in its book, writing its order only"""
+    with unit_of_work(session):
+        moved = move(
+            session=session,
+            ordering=LESSONS,
+            parent_id=lesson.book_id,
+            key=lesson.id,
+            position=position,
+        )
+        if moved:
+            rebuild_book_completion(session=session, book_id=lesson.book_id)
+    return moved
 
 
 def delete_lesson(*, session: Session, lesson_id: uuid.UUID) -> bool:
@@ -52,6 +106,7 @@ def delete_lesson(*, session: Session, lesson_id: uuid.UUID) -> bool:
     db_obj = session.get(Lesson, lesson_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        rebuild_book_completion(session=session, book_id=db_obj.book_id)
+        commit(session)
         return True
     return False
@@ -0,0 +1,95 @@
+import uuid
+from typing import Any
+
+from sqlmodel import Session, col, select, update
+
+from app.crud.utils import commit, save
+from app.models import Book, Lesson, MediaUpload, MediaUploadCreate
+from app.models.media import MEDIA_FIELDS, book_pages_version
+
+
+def create_media_upload(
+    *, session: Session, upload_in: MediaUploadCreate, created_by: uuid.UUID
+) -> MediaUpload:
+    """Start a resumable upload"""
+    db_obj = MediaUpload.model_validate(upload_in, update={"created_by": created_by})
+    return save(session=session, db_obj=db_obj)
+
+
+def get_media_upload(*, session: Session, upload_id: uuid.UUID) -> MediaUpload | None:
+    """Get an upload in progress by ID"""
+    return session.get(MediaUpload, upload_id)
+
+
+def attach_media_upload(
+    *, session: Session, upload: MediaUpload, reference: str, sha256: str
+) -> bool:
+    """
+    Set the completed upload's reference, with its hash and size, on its book
+    or lesson (a lesson's book part file replacing its page range) and drop
+    the upload, in one transaction. Returns False if the target no longer
+    exists.
+    """
+    model = Book if upload.target == "book" else Lesson
+    values: dict[str, Any] = {
+        upload.field: reference,
+        f"{upload.field}_sha256": sha256,
+        f"{upload.field}_size": upload.size,
+    }
+    if upload.field == "book_part_pdf":
+        # The file replaces the lesson's page range of the book PDF
+        values.update(
+            book_pages_start=None, book_pages_end=None, book_pages_version=None
+        )
+    result = session.exec(
+        update(model).where(col(model.id) == upload.target_id).values(values)
+    )
+    if upload.target == "book" and upload.field == "pdf":
+        set_book_pages_versions(
+            session=session, book_id=upload.target_id, book_pdf_sha256=sha256
+        )
+    session.delete(upload)
+    commit(session)
+    return result.rowcount > 0
+
+
+def delete_media_upload(*, session: Session, upload: MediaUpload) -> None:
+    """Drop an upload in progress"""
+    session.delete(upload)
+    commit(session)
+
+
+def clear_media_digests(db_obj: Book | Lesson, data: dict[str, Any]) -> None:
+    """
+    Forget the hash and size of the media references an update changes: they
+    were stored for uploaded files only. Doesn't commit.
+    """
+    target = "book" if isinstance(db_obj, Book) else "lesson"
+    for field in MEDIA_FIELDS[target]:
+        if field in data and data[field] != getattr(db_obj, field):
+            setattr(db_obj, f"{field}_sha256", None)
+            setattr(db_obj, f"{field}_size", None)
+
+
+def set_book_pages_version(*, session: Session, lesson: Lesson) -> None:
+    """Version a lesson's pages of its book's PDF, by the PDF's hash. Doesn't commit."""
+    book = session.get(Book, lesson.book_id)
+    lesson.book_pages_version = book_pages_version(
+        book.pdf_sha256 if book else None,
+        lesson.book_pages_start,
+        lesson.book_pages_end,
+    )
+
+
+def set_book_pages_versions(
+    *, session: Session, book_id: uuid.UUID, book_pdf_sha256: str | None
+) -> None:
+    """Version the pages of all the lessons of a book, once its PDF changed. Doesn't commit."""
+    statement = select(Lesson).where(
+        Lesson.book_id == book_id, col(Lesson.book_pages_start).is_not(None)
+    )
+    for lesson in session.exec(statement):
+        lesson.book_pages_version = book_pages_version(
+            book_pdf_sha256, lesson.book_pages_start, lesson.book_pages_end
+        )
+        session.add(lesson)
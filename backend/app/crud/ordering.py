@@ -0,0 +1,294 @@
+from typing import Any, NamedTuple
+
+from sqlalchemy import Integer, Table, column, values
+from sqlmodel import Session, SQLModel, func, select, update
+
+from app.crud.utils import commit
+from app.models import Book, Lesson, Phase, PhaseBook, Program
+
+# Items are sorted by an integer `order` key within their container, spaced
+# ORDER_GAP apart: an item is inserted or moved between two others by writing
+# its own key only, halfway between theirs. When there's no key left between
+# two items, the container is respaced first. Crowded containers are respaced
+# in the background as well (see app/core/ordering.py), once a gap drops below
+# REBALANCE_GAP. Writers lock the container's row first (see lock_container),
+# so a key is never computed from neighbours that a concurrent respace is
+# about to move.
+ORDER_GAP = 1024
+REBALANCE_GAP = 16
+# The order columns are INTEGER
+MAX_ORDER = 2**31 - 1
+
+
+class OrderKeysExhausted(Exception):
+    """No key left for an item in its container, even once respaced"""
+
+
+class Ordering(NamedTuple):
+    """
+    A table of items ordered within a parent, identified by `key` in it. The
+    parent is a row of the `container` table.
+    """
+
+    model: type[SQLModel]
+    parent: str
+    key: str
+    container: type[SQLModel]
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__  # type: ignore[attr-defined,no-any-return]
+
+    @property
+    def container_table(self) -> Table:
+        return self.container.__table__  # type: ignore[attr-defined,no-any-return]
+
+
+PHASES = Ordering(Phase, parent="program_id", key="id", container=Program)
+PHASE_BOOKS = Ordering(PhaseBook, parent="phase_id", key="book_id", container=Phase)
+LESSONS = Ordering(Lesson, parent="book_id", key="id", container=Book)
+ORDERINGS = (PHASES, PHASE_BOOKS, LESSONS)
+
+
+def lock_container(*, session: Session, ordering: Ordering, parent_id: Any) -> None:
+    """
+    Lock the container's row until the end of the transaction, serializing the
+    changes to the keys of its items. Doesn't commit.
+    """
+    container = ordering.container_table
+    session.exec(
+        select(container.c.id).where(container.c.id == parent_id).with_for_update()
+    )
+
+
+def order_key(position: int) -> int:
+    """Key of the item at a position (0 for first) of a spaced out container"""
+    return (position + 1) * ORDER_GAP
+
+
+def next_order_key(*, session: Session, ordering: Ordering, parent_id: Any) -> int:
+    """Key to append an item to a container. Doesn't commit."""
+    lock_container(session=session, ordering=ordering, parent_id=parent_id)
+    table = ordering.table
+    last = session.exec(
+        select(func.max(table.c.order)).where(table.c[ordering.parent] == parent_id)
+    ).one()
+    return order_key(0) if last is None else last + ORDER_GAP
+
+
+def insert_order_key(
+    *, session: Session, ordering: Ordering, parent_id: Any, position: int | None
+) -> int:
+    """
+    Key for a new item of a container: at a position (0 for first, past the end
+    for last), or appended without one. Doesn't commit.
+    """
+    if position is None:
+        return next_order_key(session=session, ordering=ordering, parent_id=parent_id)
+    return free_key_at(
+        session=session,
+        ordering=ordering,
+        parent_id=parent_id,
+        key=None,
+        position=position,
+    )
+
+
+def reorder(
+    *, session: Session, ordering: Ordering, parent_id: Any, keys: list[Any]
+) -> bool:
+    """
+    Set the order of all the items of a container at once, from their keys
+    listed first to last, spaced out. Returns False, changing nothing, unless
+    the keys are each of the items exactly once.
+
+    A single UPDATE ... FROM (VALUES ...) whatever the number of items: the
+    unique constraint on (parent, order) is deferrable, so it's checked at the
+    end of the statement rather than per row, and orders can be swapped without
+    moving rows out of the way first. The ORM objects of the session aren't
+    updated: they're expired by the commit (not within a unit of work).
+    """
+    lock_container(session=session, ordering=ordering, parent_id=parent_id)
+    table = ordering.table
+    new_order = values(
+        column("key", table.c[ordering.key].type),
+        column("order", Integer),
+        name="new_order",
+    ).data([(key, order_key(position)) for position, key in enumerate(keys)])
+    siblings = table.alias("siblings")
+    items = (
+        select(func.count())
+        .select_from(siblings)
+        .where(siblings.c[ordering.parent] == parent_id)
+    )
+    result = session.exec(
+        update(table)
+        .where(
+            table.c[ordering.parent] == parent_id,
+            table.c[ordering.key] == new_order.c.key,
+        )
+        # All or nothing: every item and only them, or no row matches
+        .where(items.scalar_subquery() == len(keys))
+        .where(
+            items.where(siblings.c[ordering.key].in_(keys)).scalar_subquery()
+            == len(keys)
+        )
+        .values({table.c.order: new_order.c.order})
+    )
+    if result.rowcount == 0:
+        return False
+    commit(session)
+    return True
+
+
+def respace(*, session: Session, ordering: Ordering, parent_id: Any) -> None:
+    """
+    Space the keys of a container ORDER_GAP apart again, keeping the order, in
+    one statement. Doesn't commit.
+    """
+    lock_container(session=session, ordering=ordering, parent_id=parent_id)
+    table = ordering.table
+    ranked = (
+        select(
+            table.c[ordering.key].label("key"),
+            func.row_number().over(order_by=table.c.order).label("position"),
+        )
+        .where(table.c[ordering.parent] == parent_id)
+        .subquery("ranked")
+    )
+    session.exec(
+        update(table)
+        .where(
+            table.c[ordering.parent] == parent_id,
+            table.c[ordering.key] == ranked.c.key,
+        )
+        .values({table.c.order: ranked.c.position * ORDER_GAP})
+    )
+
+
+def _key_at(
+    *, session: Session, ordering: Ordering, parent_id: Any, key: Any, position: int
+) -> int | None:
+    # Between the keys of the items that would come before and after it (other
+    # than the item itself, None for a new one), None when they're too close
+    table = ordering.table
+    others = table.c[ordering.parent] == parent_id, table.c[ordering.key] != key
+    neighbours = select(table.c.order).where(*others).order_by(table.c.order)
+    before: int | None = None
+    after: int | None = None
+    if position == 0:
+        after = session.exec(neighbours.limit(1)).first()
+    else:
+        rows = session.exec(neighbours.offset(position - 1).limit(2)).all()
+        if rows:
+            before = rows[0]
+            after = rows[1] if len(rows) > 1 else None
+        else:
+            # Past the end
+            before = session.exec(select(func.max(table.c.order)).where(*others)).one()
+    low = 0 if before is None else before
+    if after is None:
+        new_key = low + ORDER_GAP
+        return new_key if new_key <= MAX_ORDER else None
+    if after - low < 2:
+        return None
+    return (low + after) // 2
+
+
+def free_key_at(
+    *, session: Session, ordering: Ordering, parent_id: Any, key: Any, position: int
+) -> int:
+    """
+    Key for an item at a position of its container (0 for first, past the end
+    for last), respacing the container first when there's none left there.
+    `key` identifies the item if it's already in the container, None for a new
+    one. Doesn't commit.
+
+    Raises OrderKeysExhausted when the container has too many items for keys
+    up to MAX_ORDER, even spaced out.
+    """
+    # Held until the item is written with the key, by the caller
+    lock_container(session=session, ordering=ordering, parent_id=parent_id)
+    new_key = _key_at(
+        session=session,
+        ordering=ordering,
+        parent_id=parent_id,
+        key=key,
+        position=position,
+    )
+    if new_key is None:
+        respace(session=session, ordering=ordering, parent_id=parent_id)
+        new_key = _key_at(
+            session=session,
+            ordering=ordering,
+            parent_id=parent_id,
+            key=key,
+            position=position,
+        )
+    if new_key is None:
+        raise OrderKeysExhausted
+    return new_key
+
+
+def move(
+    *, session: Session, ordering: Ordering, parent_id: Any, key: Any, position: int
+) -> bool:
+    """
+    Move an item to a position of its container (0 for first, past the end for
+    last), writing its own key only unless the container has to be respaced.
+    Returns False if the item is not in the container, raises
+    OrderKeysExhausted if there's no key left for it.
+    """
+    new_key = free_key_at(
+        session=session,
+        ordering=ordering,
+        parent_id=parent_id,
+        key=key,
+        position=position,
+    )
+    table = ordering.table
+    result = session.exec(
+        update(table)
+        .where(table.c[ordering.parent] == parent_id, table.c[ordering.key] == key)
+        .values({table.c.order: new_key})
+    )
+    if result.rowcount == 0:
+        return False
+    commit(session)
+    return True
+
+
+def get_crowded_parents(
+    *, session: Session, ordering: Ordering, limit: int = 100
+) -> list[Any]:
+    """Containers with items closer than REBALANCE_GAP, or keys near MAX_ORDER"""
+    table = ordering.table
+    previous = func.lag(table.c.order).over(
+        partition_by=table.c[ordering.parent], order_by=table.c.order
+    )
+    gaps = select(
+        table.c[ordering.parent].label("parent_id"),
+        table.c.order,
+        (table.c.order - previous).label("gap"),
+    ).subquery("gaps")
+    statement = (
+        select(gaps.c.parent_id)
+        .where((gaps.c.gap < REBALANCE_GAP) | (gaps.c.order > MAX_ORDER // 2))
+        .distinct()
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
+def rebalance_orders(*, session: Session) -> int:
+    """
+    Respace the crowded containers of every ordered table, each locked and
+    committed on its own. Returns the number of containers respaced.
+    """
+    rebalanced = 0
+    for ordering in ORDERINGS:
+        for parent_id in get_crowded_parents(session=session, ordering=ordering):
+            respace(session=session, ordering=ordering, parent_id=parent_id)
+            commit(session)
+            rebalanced += 1
+    return rebalanced
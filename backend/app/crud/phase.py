@@ -1,18 +1,25 @@
 import uuid
 
-from sqlmodel import Session, col, func, select
+from sqlmodel import Session, col, select
 
-from app.crud.utils import validate_update_model
+from app.crud.completion import rebuild_program_completion
+from app.crud.ordering import PHASE_BOOKS, PHASES, insert_order_key, move, reorder
+from app.crud.utils import commit, save, unit_of_work, validate_update_model
 from app.models import Phase, PhaseBook, PhaseCreate, PhaseUpdate
 
 
 def create_phase(*, session: Session, phase_in: PhaseCreate) -> Phase:
-    """Create a new phase"""
-    db_obj = Phase.model_validate(phase_in)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    """Create a new phase, at its position in the program or last without one"""
+    order = phase_in.order
+    if order is None:
+        order = insert_order_key(
+            session=session,
+            ordering=PHASES,
+            parent_id=phase_in.program_id,
+            position=phase_in.position,
+        )
+    db_obj = Phase.model_validate(phase_in, update={"order": order})
+    return save(session=session, db_obj=db_obj)
 
 
 def get_phase(*, session: Session, phase_id: uuid.UUID) -> Phase | None:
@@ -39,10 +46,38 @@ def update_phase(*, session: Session, db_phase: Phase, phase_in: PhaseUpdate) ->
     phase_data = phase_in.model_dump(exclude_unset=True)
     validate_update_model(Phase, db_phase, phase_data)
     db_phase.sqlmodel_update(phase_data)
-    session.add(db_phase)
-    session.commit()
-    session.refresh(db_phase)
-    return db_phase
+    if "order" in phase_data:
+        session.add(db_phase)
+        rebuild_program_completion(session=session, program_ids=[db_phase.program_id])
+    return save(session=session, db_obj=db_phase)
+
+
+def reorder_phases(
+    *, session: Session, program_id: uuid.UUID, phase_ids: list[uuid.UUID]
+) -> bool:
+    """Reorder all the phases of a program, in one statement"""
+    with unit_of_work(session):
+        reordered = reorder(
+            session=session, ordering=PHASES, parent_id=program_id, keys=phase_ids
+        )
+        if reordered:
+            rebuild_program_completion(session=session, program_ids=[program_id])
+    return reordered
+
+
+def move_phase(*, session: Session, phase: Phase, position: int) -> bool:
+    """Move a phase to a position in its program, writing its order only"""
+    with unit_of_work(session):
+        moved = move(
+            session=session,
+            ordering=PHASES,
+            parent_id=phase.program_id,
+            key=phase.id,
+            position=position,
+        )
+        if moved:
+            rebuild_program_completion(session=session, program_ids=[phase.program_id])
+    return moved
 
 
 def delete_phase(*, session: Session, phase_id: uuid.UUID) -> bool:
@@ -50,34 +85,44 @@ def delete_phase(*, session: Session, phase_id: uuid.UUID) -> bool:
     db_obj = session.get(Phase, phase_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        rebuild_program_completion(session=session, program_ids=[db_obj.program_id])
+        commit(session)
         return True
     return False
 
 
+def _rebuild_phase_completion(*, session: Session, phase_id: uuid.UUID) -> None:
+    # The completion bitsets of the program's sessions follow its lessons
+    program_id = session.exec(
+        select(Phase.program_id).where(Phase.id == phase_id)
+    ).one()
+    rebuild_program_completion(session=session, program_ids=[program_id])
+
+
 def add_book_to_phase(
     *,
     session: Session,
     phase_id: uuid.UUID,
     book_id: uuid.UUID,
     order: int | None = None,
+    position: int | None = None,
 ) -> bool:
-    """Add a book to a phase"""
-    # If order not provided, calculate it based on existing books in the phase
+    """Add a book to a phase, at a position (0 for first) or a given order"""
+    # If order not provided, insert it at the position, or after the existing
+    # books in the phase
     if order is None:
-        order = (
-            session.exec(
-                select(func.coalesce(func.max(PhaseBook.order), -1)).where(
-                    PhaseBook.phase_id == phase_id
-                )
-            ).one()
-            + 1
+        order = insert_order_key(
+            session=session,
+            ordering=PHASE_BOOKS,
+            parent_id=phase_id,
+            position=position,
         )
 
     # Add the relationship
     phase_book = PhaseBook(phase_id=phase_id, book_id=book_id, order=order)
     session.add(phase_book)
-    session.commit()
+    _rebuild_phase_completion(session=session, phase_id=phase_id)
+    commit(session)
     return True
 
 
@@ -94,6 +139,37 @@ def remove_book_from_phase(
 
     if phase_book:
         session.delete(phase_book)
-        session.commit()
+        _rebuild_phase_completion(session=session, phase_id=phase_id)
+        commit(session)
         return True
     return False
+
+
+def reorder_phase_books(
+    *, session: Session, phase_id: uuid.UUID, book_ids: list[uuid.UUID]
+) -> bool:
+    """Reorder all the books of a phase, in one statement"""
+    with unit_of_work(session):
+        reordered = reorder(
+            session=session, ordering=PHASE_BOOKS, parent_id=phase_id, keys=book_ids
+        )
+        if reordered:
+            _rebuild_phase_completion(session=session, phase_id=phase_id)
+    return reordered
+
+
+def move_phase_book(
+    *, session: Session, phase_id: uuid.UUID, book_id: uuid.UUID, position: int
+) -> bool:
+    """Move a book to a position in a phase, writing its order only"""
+    with unit_of_work(session):
+        moved = move(
+            session=session,
+            ordering=PHASE_BOOKS,
+            parent_id=phase_id,
+            key=book_id,
+            position=position,
+        )
+        if moved:
+            _rebuild_phase_completion(session=session, phase_id=phase_id)
+    return moved
@@ -1,8 +1,11 @@
 import uuid
+from typing import Any
 
+from sqlalchemy import insert
 from sqlmodel import Session, col, select
 
-from app.crud.utils import validate_update_model
+from app.crud.ordering import order_key
+from app.crud.utils import commit, save, validate_update_model
 from app.models import (
     Book,
     Lesson,
@@ -10,6 +13,7 @@ from app.models import (
     PhaseBook,
     Program,
     ProgramCreate,
+    ProgramDeepCreate,
     ProgramUpdate,
 )
 from app.models.program import days_list_to_bitmask
@@ -20,10 +24,64 @@ def create_program(*, session: Session, program_in: ProgramCreate) -> Program:
     data = program_in.model_dump()
     data["days_of_study"] = days_list_to_bitmask(data["days_of_study"])
     db_obj = Program.model_validate(data)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
+
+
+def create_program_deep(
+    *, session: Session, program_in: ProgramDeepCreate
+) -> tuple[Program, list[tuple[Phase, list[uuid.UUID]]]]:
+    """
+    Create a program with its phases, the books of each phase (new ones with
+    their lessons), in one transaction with a batched insert per table.
+    Returns the program and its phases with their book IDs, in order.
+    """
+    data = program_in.model_dump(exclude={"phases"})
+    data["days_of_study"] = days_list_to_bitmask(data["days_of_study"])
+    program = Program.model_validate(data)
+    phases: list[tuple[Phase, list[uuid.UUID]]] = []
+    books: list[dict[str, Any]] = []
+    lessons: list[dict[str, Any]] = []
+    phase_books: list[dict[str, Any]] = []
+    for phase_order, phase_in in enumerate(program_in.phases):
+        phase = Phase(order=order_key(phase_order), program_id=program.id)
+        book_ids = []
+        for book_order, phase_book_in in enumerate(phase_in.books):
+            book_id = phase_book_in.book_id or uuid.uuid4()
+            if phase_book_in.book is not None:
+                books.append(
+                    {
+                        "id": book_id,
+                        **phase_book_in.book.model_dump(exclude={"lessons"}),
+                    }
+                )
+                lessons.extend(
+                    {
+                        "id": uuid.uuid4(),
+                        "order": order_key(lesson_order),
+                        "book_id": book_id,
+                        **lesson_in.model_dump(),
+                    }
+                    for lesson_order, lesson_in in enumerate(phase_book_in.book.lessons)
+                )
+            phase_books.append(
+                {
+                    "phase_id": phase.id,
+                    "book_id": book_id,
+                    "order": order_key(book_order),
+                }
+            )
+            book_ids.append(book_id)
+        phases.append((phase, book_ids))
+
+    session.add(program)
+    session.add_all(phase for phase, _ in phases)
+    # The rows below refer to the program's phases
+    session.flush()
+    for model, rows in ((Book, books), (Lesson, lessons), (PhaseBook, phase_books)):
+        if rows:
+            session.execute(insert(model), rows)
+    commit(session, expire=False)
+    return program, phases
 
 
 def get_program(*, session: Session, program_id: uuid.UUID) -> Program | None:
@@ -49,10 +107,7 @@ def update_program(
         )
     validate_update_model(Program, db_program, program_data)
     db_program.sqlmodel_update(program_data)
-    session.add(db_program)
-    session.commit()
-    session.refresh(db_program)
-    return db_program
+    return save(session=session, db_obj=db_program)
 
 
 def delete_program(*, session: Session, program_id: uuid.UUID) -> bool:
@@ -60,7 +115,7 @@ def delete_program(*, session: Session, program_id: uuid.UUID) -> bool:
     db_obj = session.get(Program, program_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        commit(session)
         return True
     return False
 
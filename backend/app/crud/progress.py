@@ -0,0 +1,135 @@
+import uuid
+
+from sqlalchemy import Boolean, ColumnElement, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, case, col, func, or_, select
+
+from app.crud.completion import update_lesson_completion
+from app.models import Lesson, LessonProgress, SessionEvent, User, UserSessionStudent
+from app.models.progress import LESSON_COMPLETION_RATIO, is_lesson_completed
+
+
+def upsert_lesson_progress(*, session: Session, progress: list[LessonProgress]) -> int:
+    """
+    Write coalesced progress in one upsert, merging with the stored progress.
+
+    Progress of lessons or students deleted since it was reported is dropped.
+    The completion bitsets of students who just completed a lesson are
+    rebuilt. Returns the number of rows written.
+    """
+    lesson_ids = {item.lesson_id for item in progress}
+    student_ids = {item.student_id for item in progress}
+    existing_lessons = set(
+        session.exec(select(Lesson.id).where(col(Lesson.id).in_(lesson_ids)))
+    )
+    existing_students = set(
+        session.exec(select(User.id).where(col(User.id).in_(student_ids)))
+    )
+    rows = [
+        {
+            **item.model_dump(),
+            "completed": is_lesson_completed(
+                item.max_position_seconds, item.duration_seconds
+            ),
+        }
+        # Lock rows in the same order in concurrent flushes to avoid deadlocks
+        for item in sorted(progress, key=lambda item: (item.student_id, item.lesson_id))
+        if item.lesson_id in existing_lessons and item.student_id in existing_students
+    ]
+    if not rows:
+        return 0
+
+    statement = insert(LessonProgress).values(rows)
+    excluded = statement.excluded
+    # Other API workers flush their own heartbeats: keep the latest position
+    # and the furthest one
+    is_newer = excluded.updated_at >= LessonProgress.updated_at
+    max_position = func.greatest(
+        LessonProgress.max_position_seconds, excluded.max_position_seconds
+    )
+    duration = func.coalesce(excluded.duration_seconds, LessonProgress.duration_seconds)
+    statement = statement.on_conflict_do_update(
+        index_elements=[col(LessonProgress.student_id), col(LessonProgress.lesson_id)],
+        set_={
+            "position_seconds": case(
+                (is_newer, excluded.position_seconds),
+                else_=LessonProgress.position_seconds,
+            ),
+            "max_position_seconds": max_position,
+            "duration_seconds": duration,
+            # is_lesson_completed, kept once true
+            "completed": or_(
+                col(LessonProgress.completed),
+                func.coalesce(
+                    max_position >= LESSON_COMPLETION_RATIO * duration, False
+                ),
+            ),
+            "updated_at": func.greatest(LessonProgress.updated_at, excluded.updated_at),
+        },
+    )
+    # old.* is the row before the upsert, null when it's inserted. RETURNING
+    # old.* and new.* needs Postgres 18 or later.
+    returning = statement.returning(
+        col(LessonProgress.student_id),
+        col(LessonProgress.lesson_id),
+        literal_column("old.completed", Boolean).label("was_completed"),
+        col(LessonProgress.completed),
+    )
+    newly_completed = {
+        (row.student_id, row.lesson_id)
+        for row in session.exec(returning)
+        if row.completed and not row.was_completed
+    }
+    if newly_completed:
+        update_lesson_completion(session=session, completed=newly_completed)
+    return len(rows)
+
+
+def _session_progress_filters(
+    session_id: uuid.UUID, student_id: uuid.UUID | None
+) -> list[ColumnElement[bool]]:
+    session_lessons = select(SessionEvent.lesson_id).where(
+        SessionEvent.session_id == session_id,
+        col(SessionEvent.lesson_id).is_not(None),
+    )
+    session_students = select(UserSessionStudent.user_id).where(
+        UserSessionStudent.session_id == session_id
+    )
+    filters: list[ColumnElement[bool]] = [
+        col(LessonProgress.lesson_id).in_(session_lessons),
+        col(LessonProgress.student_id).in_(session_students),
+    ]
+    if student_id is not None:
+        filters.append(col(LessonProgress.student_id) == student_id)
+    return filters
+
+
+def get_session_progress(
+    *,
+    session: Session,
+    session_id: uuid.UUID,
+    student_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[LessonProgress]:
+    """Get the progress of the session's students in the session's lessons"""
+    statement = (
+        select(LessonProgress)
+        .where(*_session_progress_filters(session_id, student_id))
+        .order_by(col(LessonProgress.student_id), col(LessonProgress.lesson_id))
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
+def count_session_progress(
+    *, session: Session, session_id: uuid.UUID, student_id: uuid.UUID | None = None
+) -> int:
+    """Count the progress of the session's students in the session's lessons"""
+    statement = (
+        select(func.count())
+        .select_from(LessonProgress)
+        .where(*_session_progress_filters(session_id, student_id))
+    )
+    return session.exec(statement).one()
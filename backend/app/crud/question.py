@@ -1,18 +1,26 @@
+import random
 import uuid
 
-from sqlmodel import Session, select
+from sqlalchemy import ColumnElement
+from sqlmodel import Session, col, delete, func, select
+from sqlmodel.sql.expression import SelectOfScalar
 
-from app.crud.utils import validate_update_model
-from app.models import Question, QuestionCreate, QuestionUpdate
+from app.crud.utils import commit, save, validate_update_model
+from app.models import (
+    Lesson,
+    PhaseBook,
+    Question,
+    QuestionCreate,
+    QuestionStats,
+    QuestionUpdate,
+)
+from app.models.search import search_match, search_query
 
 
 def create_question(*, session: Session, question_in: QuestionCreate) -> Question:
     """Create a new question"""
     db_obj = Question.model_validate(question_in)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
 
 
 def get_question(*, session: Session, question_id: uuid.UUID) -> Question | None:
@@ -33,6 +41,103 @@ def get_questions_by_lesson(
     return list(session.exec(statement).all())
 
 
+def _get_questions_with_stats(
+    *, session: Session, whereclause: ColumnElement[bool], skip: int, limit: int
+) -> list[tuple[Question, QuestionStats | None]]:
+    statement = (
+        select(Question, QuestionStats)
+        .outerjoin(QuestionStats, col(QuestionStats.question_id) == Question.id)
+        .where(whereclause)
+        .order_by(
+            # Lowest correct rate first, unanswered questions last
+            (QuestionStats.correct / func.nullif(QuestionStats.attempts, 0))
+            .asc()
+            .nulls_last(),
+            col(Question.id),
+        )
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
+def get_questions_with_stats_by_lesson(
+    *, session: Session, lesson_id: uuid.UUID, skip: int = 0, limit: int = 100
+) -> list[tuple[Question, QuestionStats | None]]:
+    """Get questions of a lesson with their stats, weakest first"""
+    return _get_questions_with_stats(
+        session=session,
+        whereclause=col(Question.lesson_id) == lesson_id,
+        skip=skip,
+        limit=limit,
+    )
+
+
+def get_questions_with_stats_by_book(
+    *, session: Session, book_id: uuid.UUID, skip: int = 0, limit: int = 100
+) -> list[tuple[Question, QuestionStats | None]]:
+    """Get questions across all lessons of a book with their stats, weakest first"""
+    lesson_ids = select(Lesson.id).where(Lesson.book_id == book_id)
+    return _get_questions_with_stats(
+        session=session,
+        whereclause=col(Question.lesson_id).in_(lesson_ids),
+        skip=skip,
+        limit=limit,
+    )
+
+
+def _sample_questions(
+    *, session: Session, id_statement: SelectOfScalar[uuid.UUID], n: int, seed: int
+) -> list[Question]:
+    # Sample from the (small, ordered) list of candidate IDs and only load the
+    # sampled rows, instead of ORDER BY random() over all candidate questions
+    question_ids = session.exec(id_statement.order_by(col(Question.id))).all()
+    sample = random.Random(seed).sample(question_ids, min(n, len(question_ids)))
+    statement = select(Question).where(col(Question.id).in_(sample))
+    questions = {question.id: question for question in session.exec(statement)}
+    return [questions[question_id] for question_id in sample]
+
+
+def get_book_quiz(
+    *, session: Session, book_id: uuid.UUID, n: int, seed: int
+) -> list[Question]:
+    """Get n random questions across all lessons of a book, the same for a given seed"""
+    statement = (
+        select(Question.id)
+        .join(Lesson, col(Lesson.id) == Question.lesson_id)
+        .where(Lesson.book_id == book_id)
+    )
+    return _sample_questions(session=session, id_statement=statement, n=n, seed=seed)
+
+
+def get_phase_quiz(
+    *, session: Session, phase_id: uuid.UUID, n: int, seed: int
+) -> list[Question]:
+    """Get n random questions across all books of a phase, the same for a given seed"""
+    statement = (
+        select(Question.id)
+        .join(Lesson, col(Lesson.id) == Question.lesson_id)
+        .join(PhaseBook, col(PhaseBook.book_id) == Lesson.book_id)
+        .where(PhaseBook.phase_id == phase_id)
+    )
+    return _sample_questions(session=session, id_statement=statement, n=n, seed=seed)
+
+
+def search_questions(
+    *, session: Session, text: str, skip: int = 0, limit: int = 100
+) -> list[Question]:
+    """Full-text search questions, best matches first"""
+    rank = func.ts_rank(col(Question.search_vector), search_query(text))
+    statement = (
+        select(Question)
+        .where(search_match(Question.search_vector, text))
+        .order_by(rank.desc(), col(Question.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
 def update_question(
     *, session: Session, db_question: Question, question_in: QuestionUpdate
 ) -> Question:
@@ -40,10 +145,14 @@ def update_question(
     question_data = question_in.model_dump(exclude_unset=True)
     validate_update_model(Question, db_question, question_data)
     db_question.sqlmodel_update(question_data)
-    session.add(db_question)
-    session.commit()
-    session.refresh(db_question)
-    return db_question
+    # Stats of the old answer key don't apply to the new one
+    if "options" in question_data or "correct_options" in question_data:
+        session.exec(
+            delete(QuestionStats).where(
+                col(QuestionStats.question_id) == db_question.id
+            )
+        )
+    return save(session=session, db_obj=db_question)
 
 
 def delete_question(*, session: Session, question_id: uuid.UUID) -> bool:
@@ -51,6 +160,6 @@ def delete_question(*, session: Session, question_id: uuid.UUID) -> bool:
     db_obj = session.get(Question, question_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        commit(session)
         return True
     return False
@@ -0,0 +1,91 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, func, select
+
+from app.models import Question, QuestionAnswer, ReviewItem
+from app.models.review import REVIEW_QUALITY_CORRECT, REVIEW_QUALITY_INCORRECT
+
+
+def update_review_schedule(
+    *,
+    session: Session,
+    student_id: uuid.UUID,
+    answers: list[QuestionAnswer],
+    now: datetime,
+) -> None:
+    """Reschedule the student's reviews of the answered questions, in one upsert"""
+    question_ids = sorted(answer.question_id for answer in answers)
+    # Read the current schedules as plain values: loading ReviewItem entities
+    # would flush one UPDATE per changed item instead of the single upsert
+    current = {
+        question_id: (interval_days, ease, repetitions)
+        for question_id, interval_days, ease, repetitions in session.exec(
+            select(
+                ReviewItem.question_id,
+                ReviewItem.interval_days,
+                ReviewItem.ease,
+                ReviewItem.repetitions,
+            )
+            .where(
+                ReviewItem.student_id == student_id,
+                col(ReviewItem.question_id).in_(question_ids),
+            )
+            .order_by(col(ReviewItem.question_id))
+            .with_for_update()
+        )
+    }
+
+    items = []
+    for answer in sorted(answers, key=lambda answer: answer.question_id):
+        item = ReviewItem(student_id=student_id, question_id=answer.question_id)
+        if answer.question_id in current:
+            item.interval_days, item.ease, item.repetitions = current[
+                answer.question_id
+            ]
+        item.review(
+            REVIEW_QUALITY_CORRECT if answer.is_correct else REVIEW_QUALITY_INCORRECT,
+            now,
+        )
+        items.append(item.model_dump())
+
+    statement = insert(ReviewItem).values(items)
+    statement = statement.on_conflict_do_update(
+        index_elements=[col(ReviewItem.student_id), col(ReviewItem.question_id)],
+        set_={
+            column: statement.excluded[column]
+            for column in (
+                "due_at",
+                "interval_days",
+                "ease",
+                "repetitions",
+                "last_reviewed_at",
+            )
+        },
+    )
+    session.exec(statement)
+
+
+def get_due_reviews(
+    *, session: Session, student_id: uuid.UUID, now: datetime, n: int = 20
+) -> list[Question]:
+    """Get the student's next n questions due for review, most overdue first"""
+    statement = (
+        select(Question)
+        .join(ReviewItem, col(ReviewItem.question_id) == Question.id)
+        .where(ReviewItem.student_id == student_id, ReviewItem.due_at <= now)
+        .order_by(col(ReviewItem.due_at), col(ReviewItem.question_id))
+        .limit(n)
+    )
+    return list(session.exec(statement).all())
+
+
+def count_due_reviews(*, session: Session, student_id: uuid.UUID, now: datetime) -> int:
+    """Count the student's questions due for review"""
+    statement = (
+        select(func.count())
+        .select_from(ReviewItem)
+        .where(ReviewItem.student_id == student_id, ReviewItem.due_at <= now)
+    )
+    return session.exec(statement).one()
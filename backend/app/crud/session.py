@@ -2,7 +2,7 @@ import uuid
 
 from sqlmodel import Session, select
 
-from app.crud.utils import validate_update_model
+from app.crud.utils import commit, save, validate_update_model
 from app.models import ProgramSession, ProgramSessionCreate, ProgramSessionUpdate, User
 
 
@@ -11,10 +11,7 @@ def create_session(
 ) -> ProgramSession:
     """Create a new session"""
     db_obj = ProgramSession.model_validate(session_in)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
 
 
 def get_session(*, session: Session, session_id: uuid.UUID) -> ProgramSession | None:
@@ -50,10 +47,7 @@ def update_session(
     session_data = session_in.model_dump(exclude_unset=True)
     validate_update_model(ProgramSession, db_session, session_data)
     db_session.sqlmodel_update(session_data)
-    session.add(db_session)
-    session.commit()
-    session.refresh(db_session)
-    return db_session
+    return save(session=session, db_obj=db_session)
 
 
 def delete_session(*, session: Session, session_id: uuid.UUID) -> bool:
@@ -61,7 +55,7 @@ def delete_session(*, session: Session, session_id: uuid.UUID) -> bool:
     db_obj = session.get(ProgramSession, session_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        commit(session)
         return True
     return False
 
@@ -75,9 +69,7 @@ def add_student_to_session(
     if db_session and db_user:
         if db_user not in db_session.students:
             db_session.students.append(db_user)
-            session.add(db_session)
-            session.commit()
-            session.refresh(db_session)
+            save(session=session, db_obj=db_session)
         return db_session
     return None
 
@@ -90,10 +82,7 @@ def remove_student_from_session(
     db_user = session.get(User, user_id)
     if db_session and db_user and db_user in db_session.students:
         db_session.students.remove(db_user)
-        session.add(db_session)
-        session.commit()
-        session.refresh(db_session)
-        return db_session
+        return save(session=session, db_obj=db_session)
     return None
 
 
@@ -106,9 +95,7 @@ def add_teacher_to_session(
     if db_session and db_user:
         if db_user not in db_session.teachers:
             db_session.teachers.append(db_user)
-            session.add(db_session)
-            session.commit()
-            session.refresh(db_session)
+            save(session=session, db_obj=db_session)
         return db_session
     return None
 
@@ -121,8 +108,5 @@ def remove_teacher_from_session(
     db_user = session.get(User, user_id)
     if db_session and db_user and db_user in db_session.teachers:
         db_session.teachers.remove(db_user)
-        session.add(db_session)
-        session.commit()
-        session.refresh(db_session)
-        return db_session
+        return save(session=session, db_obj=db_session)
     return None
@@ -2,7 +2,7 @@ import uuid
 
 from sqlmodel import Session, col, select
 
-from app.crud.utils import validate_update_model
+from app.crud.utils import commit, save, validate_update_model
 from app.models import SessionEvent, SessionEventCreate, SessionEventUpdate
 
 
@@ -11,10 +11,7 @@ def create_session_event(
 ) -> SessionEvent:
     """Create a new session event"""
     db_obj = SessionEvent.model_validate(event_in)
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
 
 
 def get_session_event(*, session: Session, event_id: uuid.UUID) -> SessionEvent | None:
@@ -50,10 +47,7 @@ def update_session_event(
     event_data = event_in.model_dump(exclude_unset=True)
     validate_update_model(SessionEvent, db_event, event_data)
     db_event.sqlmodel_update(event_data)
-    session.add(db_event)
-    session.commit()
-    session.refresh(db_event)
-    return db_event
+    return save(session=session, db_obj=db_event)
 
 
 def delete_session_event(*, session: Session, event_id: uuid.UUID) -> bool:
@@ -61,6 +55,6 @@ def delete_session_event(*, session: Session, event_id: uuid.UUID) -> bool:
     db_obj = session.get(SessionEvent, event_id)
     if db_obj:
         session.delete(db_obj)
-        session.commit()
+        commit(session)
         return True
     return False
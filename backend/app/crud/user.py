@@ -1,7 +1,8 @@
-from sqlmodel import Session, select
+from sqlalchemy import ColumnElement
+from sqlmodel import Session, col, func, or_, select
 
 from app.core.security import get_password_hash, verify_password
-from app.crud.utils import validate_update_model
+from app.crud.utils import save, validate_update_model
 from app.models import User, UserCreate, UserUpdate
 
 
@@ -12,10 +13,7 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     # Add hashed password
     db_obj = User(**user_data, hashed_password=get_password_hash(user_create.password))
 
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return save(session=session, db_obj=db_obj)
 
 
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> User:
@@ -27,10 +25,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> User
         extra_data["hashed_password"] = hashed_password
     validate_update_model(User, db_user, {**user_data, **extra_data})
     db_user.sqlmodel_update(user_data, update=extra_data)
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
-    return db_user
+    return save(session=session, db_obj=db_user)
 
 
 def get_user_by_email(*, session: Session, email: str) -> User | None:
@@ -46,3 +41,86 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     if not verify_password(password, db_user.hashed_password):
         return None
     return db_user
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _user_search_filters(
+    *,
+    text: str,
+    is_teacher: bool | None,
+    is_admin: bool | None,
+    is_active: bool | None,
+) -> list[ColumnElement[bool]]:
+    # Same normalization as the search_name column, which leaves LIKE
+    # wildcards alone, so they can be escaped before
+    name = func.arabic_normalize_name(text)
+    pattern = func.arabic_normalize_name(_escape_like(text))
+    filters: list[ColumnElement[bool]] = [
+        or_(
+            col(User.search_name).contains(pattern, escape="\\"),
+            # Fuzzy: the text is similar to some part of the name
+            name.bool_op("<%")(col(User.search_name)),
+            col(User.email).ilike(f"%{_escape_like(text)}%", escape="\\"),
+        )
+    ]
+    if is_teacher is not None:
+        filters.append(col(User.is_teacher) == is_teacher)
+    if is_admin is not None:
+        filters.append(col(User.is_admin) == is_admin)
+    if is_active is not None:
+        filters.append(col(User.is_active) == is_active)
+    return filters
+
+
+def search_users(
+    *,
+    session: Session,
+    text: str,
+    is_teacher: bool | None = None,
+    is_admin: bool | None = None,
+    is_active: bool | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[User]:
+    """
+    Search users by (partial or misspelled) full name, or part of their email.
+
+    Names starting with the text come first, then by similarity.
+    """
+    filters = _user_search_filters(
+        text=text, is_teacher=is_teacher, is_admin=is_admin, is_active=is_active
+    )
+    name = func.arabic_normalize_name(text)
+    pattern = func.arabic_normalize_name(_escape_like(text))
+    statement = (
+        select(User)
+        .where(*filters)
+        .order_by(
+            col(User.search_name).startswith(pattern, escape="\\").desc(),
+            func.word_similarity(name, col(User.search_name)).desc(),
+            col(User.search_name),
+            col(User.id),
+        )
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
+def count_search_users(
+    *,
+    session: Session,
+    text: str,
+    is_teacher: bool | None = None,
+    is_admin: bool | None = None,
+    is_active: bool | None = None,
+) -> int:
+    """Count the users matched by search_users"""
+    filters = _user_search_filters(
+        text=text, is_teacher=is_teacher, is_admin=is_admin, is_active=is_active
+    )
+    statement = select(func.count()).select_from(User).where(*filters)
+    return session.exec(statement).one()
@@ -1,21 +1,177 @@
-from typing import Any, TypeVar
+import functools
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Annotated, Any, TypeVar
 
-from sqlmodel import SQLModel
+from pydantic import (
+    AfterValidator,
+    BeforeValidator,
+    PlainValidator,
+    TypeAdapter,
+    ValidationError,
+    WrapValidator,
+)
+from pydantic_core import InitErrorDetails
+from sqlmodel import Session, SQLModel
 
 T = TypeVar("T", bound=SQLModel)
 
+# Depth of the units of work open on a session, in Session.info
+_UNIT_OF_WORK = "unit_of_work"
+
+
+@contextmanager
+def unit_of_work(session: Session) -> Iterator[Session]:
+    """
+    Run several CRUD calls as one transaction, committed once at the end.
+
+    Within the block, CRUD functions flush instead of committing, so each sees
+    the writes (and generated IDs) of the previous ones. An error rolls the
+    whole block back. Nested blocks are part of the outermost one.
+    """
+    depth = session.info.get(_UNIT_OF_WORK, 0)
+    session.info[_UNIT_OF_WORK] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info[_UNIT_OF_WORK] = depth
+
+
+def commit(session: Session, *, expire: bool = True) -> None:
+    """
+    Commit, or only flush within a unit of work. Without `expire`, the objects
+    of the session are kept loaded instead of being read again when next used.
+    """
+    if session.info.get(_UNIT_OF_WORK):
+        session.flush()
+    elif expire:
+        session.commit()
+    else:
+        expire_on_commit = session.expire_on_commit
+        session.expire_on_commit = False
+        try:
+            session.commit()
+        finally:
+            session.expire_on_commit = expire_on_commit
+
+
+_FIELD_VALIDATORS = {
+    "before": BeforeValidator,
+    "after": AfterValidator,
+    "wrap": WrapValidator,
+    "plain": PlainValidator,
+}
+
+
+@functools.cache
+def _field_adapter(model_class: type[SQLModel], name: str) -> TypeAdapter[Any]:
+    # The field's constraints, then its @field_validator methods in the order
+    # the model applies them
+    field = model_class.model_fields[name]
+    validators = [
+        _FIELD_VALIDATORS[decorator.info.mode](decorator.func)
+        for decorator in model_class.__pydantic_decorators__.field_validators.values()
+        if name in decorator.info.fields or "*" in decorator.info.fields
+    ]
+    # Built at runtime, so typed as Any rather than as a type expression
+    annotation: Any = Annotated[field.annotation, field, *validators]
+    return TypeAdapter(annotation)
+
+
+def _validate_merged(
+    model_class: type[SQLModel], db_obj: SQLModel, update_data: dict[Any, Any]
+) -> None:
+    # The whole object as it would be after the update, for "before" and
+    # "wrap" model validators, which take the raw input of every field
+    data = {
+        name: update_data[name] if name in update_data else getattr(db_obj, name)
+        for name in model_class.model_fields
+    }
+    model_class.model_validate(data)
+
+
+class _UpdatedView:
+    """Attributes of an object as they would be after an update"""
+
+    def __init__(self, db_obj: SQLModel, update_data: dict[Any, Any]) -> None:
+        self._db_obj = db_obj
+        self._update_data = update_data
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._update_data:
+            return self._update_data[name]
+        # Only loads what is read, deferred columns included
+        return getattr(self._db_obj, name)
+
 
 def validate_update_model(
     model_class: type[T], db_obj: T, update_data: dict[Any, Any]
 ) -> None:
     """
-    Validate an update by merging current and update data, raising ValidationError if invalid.
+    Validate an update, raising ValidationError if invalid.
     Does not mutate the ORM object.
 
+    Only the changed fields are validated, field validators included, then the
+    model validators (cross-field rules like ExamBase.validate_dates) run
+    against the object as it would be after the update, without dumping the
+    whole object. Models with "before" or "wrap" model validators are validated
+    in full instead, those need every field. Field validators get no other
+    field in `info.data`.
+
     The pattern is usually to call it before db_obj.sqlmodel_update. This will validate the model
     without applying changes to the obj, which db_obj.sqlmodel_update does.
     """
-    current_data = db_obj.model_dump()
-    updated_data = {**current_data, **update_data}
-    # model_validate will raise a ValidationError if the data is invalid
-    model_class.model_validate(updated_data)
+    validators = model_class.__pydantic_decorators__.model_validators.values()
+    if any(validator.info.mode != "after" for validator in validators):
+        _validate_merged(model_class, db_obj, update_data)
+        return
+
+    errors: list[InitErrorDetails] = []
+    for name, value in update_data.items():
+        if name not in model_class.model_fields:
+            continue
+        try:
+            _field_adapter(model_class, name).validate_python(value)
+        except ValidationError as e:
+            for error in e.errors():
+                details = InitErrorDetails(
+                    type=error["type"], loc=(name, *error["loc"]), input=error["input"]
+                )
+                if "ctx" in error:
+                    details["ctx"] = error["ctx"]
+                errors.append(details)
+    if not errors:
+        view = _UpdatedView(db_obj, update_data)
+        for validator in validators:
+            try:
+                validator.func(view)
+            except ValueError as e:
+                errors.append(
+                    InitErrorDetails(
+                        type="value_error", loc=(), input=update_data, ctx={"error": e}
+                    )
+                )
+                break
+    if errors:
+        raise ValidationError.from_exception_data(model_class.__name__, errors)
+
+
+def save[M: SQLModel](*, session: Session, db_obj: M) -> M:
+    """
+    Write an object and commit (flush within a unit of work), keeping it loaded
+    instead of refreshing it.
+
+    Server-generated columns come back with INSERT/UPDATE ... RETURNING (eager
+    defaults) in the flush, so a refresh would only read back what the object
+    already holds. Deferred columns computed by the database are left expired,
+    and loaded if ever read.
+    """
+    session.add(db_obj)
+    commit(session, expire=False)
+    return db_obj
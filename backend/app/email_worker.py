@@ -0,0 +1,84 @@
+import logging
+import time
+
+from emails.backend.smtp.backend import SMTPBackend
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.utils import get_smtp_options, send_email
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def close_smtp(smtp: SMTPBackend) -> None:
+    """Drop the SMTP connection, ignoring errors from a server that already hung up."""
+    try:
+        smtp.close()
+    except Exception as e:
+        logger.warning(f"failed to close SMTP connection: {e}")
+
+
+def drain_outbox(*, session: Session, smtp: SMTPBackend) -> int:
+    """
+    Send every due email in the outbox over a single SMTP connection.
+
+    Emails are fetched in batches of EMAIL_OUTBOX_BATCH_SIZE and committed one by
+    one, so a sent email is never sent again. Failed emails are rescheduled with
+    back-off and the connection is dropped, so the next email reconnects. Returns
+    the number of emails processed.
+    """
+    processed = 0
+    batch_size = settings.EMAIL_OUTBOX_BATCH_SIZE
+    while True:
+        emails = crud.get_due_emails(session=session, limit=batch_size)
+        for db_email in emails:
+            try:
+                send_email(
+                    email_to=db_email.email_to,
+                    subject=db_email.subject,
+                    html_content=db_email.html_content,
+                    smtp=smtp,
+                )
+            except Exception as e:
+                logger.warning(f"failed to send email {db_email.id}: {e}")
+                close_smtp(smtp)
+                crud.mark_email_failed(session=session, db_email=db_email, error=str(e))
+            else:
+                crud.mark_email_sent(session=session, db_email=db_email)
+            session.commit()
+        processed += len(emails)
+        if len(emails) < batch_size:
+            return processed
+
+
+def main() -> None:
+    if not settings.emails_enabled:
+        # Stay up rather than exit, the container is restarted whenever it stops
+        logger.warning("Emails are not configured, email worker idle")
+        while True:
+            time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+    logger.info("Starting email worker")
+    smtp = SMTPBackend(fail_silently=False, **get_smtp_options())
+    try:
+        while True:
+            processed = 0
+            try:
+                with Session(engine) as session:
+                    processed = drain_outbox(session=session, smtp=smtp)
+            except Exception:
+                logger.exception("failed to drain the email outbox")
+            if processed:
+                logger.info(f"Processed {processed} emails")
+            else:
+                # Don't hold an idle connection open between polls
+                close_smtp(smtp)
+                time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+    finally:
+        close_smtp(smtp)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.core import db_stats, metrics, ordering, progress
 from app.core.config import settings
+from app.core.db import engine
+from app.core.pdf_slices import pdf_slices
+from app.utils import precompile_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,8 +23,31 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+if settings.EMAIL_TEMPLATES_PRECOMPILE:
+    precompile_email_templates()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
+    flusher = asyncio.create_task(
+        progress.run_heartbeat_flusher(settings.PROGRESS_FLUSH_SECONDS)
+    )
+    rebalancer = asyncio.create_task(
+        ordering.run_order_rebalancer(settings.ORDER_REBALANCE_SECONDS)
+    )
+    try:
+        yield
+    finally:
+        flusher.cancel()
+        rebalancer.cancel()
+        # Don't lose the heartbeats received since the last flush
+        await asyncio.to_thread(progress.flush_heartbeats)
+        pdf_slices.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
@@ -30,4 +62,22 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+if settings.ENVIRONMENT == "local":
+    db_stats.instrument_engine(engine)
+    app.add_middleware(
+        db_stats.DBStatsMiddleware,
+        repeat_threshold=settings.DB_REPEATED_QUERY_THRESHOLD,
+    )
+
+if settings.metrics_enabled:
+    metrics.instrument_engine(engine)
+    app.add_middleware(metrics.MetricsMiddleware, route_id=custom_generate_unique_id)
+
+    @app.get("/metrics", tags=["metrics"], include_in_schema=False)
+    def read_metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            metrics.registry.render(), media_type="text/plain; version=0.0.4"
+        )
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,6 +1,27 @@
 from sqlmodel import SQLModel
 
+from app.models.answer import (
+    AnswerIn,
+    AnswerResultPublic,
+    AnswerSubmission,
+    AnswerSubmissionCreate,
+    AnswerSubmissionPublic,
+    QuestionAnswer,
+    QuestionStats,
+    QuestionStatsPublic,
+    QuestionsWithStatsPublic,
+    QuestionWithStatsPublic,
+)
 from app.models.associations import PhaseBook, UserSessionStudent, UserSessionTeacher
+from app.models.attendance import (
+    EventAttendance,
+    EventAttendancePublic,
+    EventAttendanceRatePublic,
+    EventAttendanceUpdate,
+    SessionAttendancePublic,
+    SessionRosterEntry,
+    StudentAttendanceRatePublic,
+)
 from app.models.book import (
     Book,
     BookBase,
@@ -9,7 +30,20 @@ from app.models.book import (
     BooksPublic,
     BookUpdate,
 )
-from app.models.common import Message, NewPassword, Token, TokenPayload
+from app.models.common import (
+    Message,
+    NewPassword,
+    OrderUpdate,
+    PositionUpdate,
+    Token,
+    TokenPayload,
+)
+from app.models.completion import (
+    LessonCompletion,
+    SessionCompletionPublic,
+    StudentCompletionPublic,
+)
+from app.models.email_outbox import EmailOutbox
 from app.models.exam import (
     Exam,
     ExamAttempt,
@@ -27,11 +61,20 @@ from app.models.exam import (
 from app.models.lesson import (
     Lesson,
     LessonBase,
+    LessonContent,
     LessonCreate,
     LessonPublic,
     LessonsPublic,
     LessonUpdate,
 )
+from app.models.media import (
+    MediaAssetPublic,
+    MediaManifestPublic,
+    MediaUpload,
+    MediaUploadBase,
+    MediaUploadCreate,
+    MediaUploadPublic,
+)
 from app.models.phase import (
     Phase,
     PhaseBase,
@@ -41,13 +84,25 @@ from app.models.phase import (
     PhaseUpdate,
 )
 from app.models.program import (
+    BookDeepCreate,
+    PhaseBookDeepCreate,
+    PhaseDeepCreate,
+    PhaseDeepPublic,
     Program,
     ProgramBase,
     ProgramCreate,
+    ProgramDeepCreate,
+    ProgramDeepPublic,
     ProgramPublic,
     ProgramsPublic,
     ProgramUpdate,
 )
+from app.models.progress import (
+    LessonProgress,
+    LessonProgressesPublic,
+    LessonProgressHeartbeat,
+    LessonProgressPublic,
+)
 from app.models.question import (
     Question,
     QuestionBase,
@@ -55,7 +110,9 @@ from app.models.question import (
     QuestionPublic,
     QuestionsPublic,
     QuestionUpdate,
+    QuizPublic,
 )
+from app.models.review import ReviewItem
 from app.models.session import (
     ProgramSession,
     ProgramSessionBase,
@@ -106,6 +163,12 @@ __all__ = [
     "Program",
     "ProgramPublic",
     "ProgramsPublic",
+    "ProgramDeepCreate",
+    "PhaseDeepCreate",
+    "PhaseBookDeepCreate",
+    "BookDeepCreate",
+    "ProgramDeepPublic",
+    "PhaseDeepPublic",
     # Phase
     "PhaseBase",
     "PhaseCreate",
@@ -121,12 +184,22 @@ __all__ = [
     "BookPublic",
     "BooksPublic",
     # Lesson
+    "LessonContent",
     "LessonBase",
     "LessonCreate",
     "LessonUpdate",
     "Lesson",
     "LessonPublic",
     "LessonsPublic",
+    # LessonProgress
+    "LessonProgressHeartbeat",
+    "LessonProgress",
+    "LessonProgressPublic",
+    "LessonProgressesPublic",
+    # LessonCompletion
+    "LessonCompletion",
+    "StudentCompletionPublic",
+    "SessionCompletionPublic",
     # Question
     "QuestionBase",
     "QuestionCreate",
@@ -134,6 +207,21 @@ __all__ = [
     "Question",
     "QuestionPublic",
     "QuestionsPublic",
+    "QuizPublic",
+    # Answers
+    "AnswerIn",
+    "AnswerSubmissionCreate",
+    "AnswerSubmission",
+    "QuestionAnswer",
+    "AnswerResultPublic",
+    "AnswerSubmissionPublic",
+    # QuestionStats
+    "QuestionStats",
+    "QuestionStatsPublic",
+    "QuestionWithStatsPublic",
+    "QuestionsWithStatsPublic",
+    # Review
+    "ReviewItem",
     # ProgramSession
     "ProgramSessionBase",
     "ProgramSessionCreate",
@@ -148,6 +236,21 @@ __all__ = [
     "SessionEvent",
     "SessionEventPublic",
     "SessionEventsPublic",
+    # MediaUpload
+    "MediaUploadBase",
+    "MediaUploadCreate",
+    "MediaUpload",
+    "MediaUploadPublic",
+    "MediaAssetPublic",
+    "MediaManifestPublic",
+    # Attendance
+    "SessionRosterEntry",
+    "EventAttendance",
+    "EventAttendanceUpdate",
+    "EventAttendancePublic",
+    "EventAttendanceRatePublic",
+    "StudentAttendanceRatePublic",
+    "SessionAttendancePublic",
     # Exam
     "ExamBase",
     "ExamCreate",
@@ -162,10 +265,14 @@ __all__ = [
     "ExamAttempt",
     "ExamAttemptPublic",
     "ExamAttemptsPublic",
+    # EmailOutbox
+    "EmailOutbox",
     # Common
     "Message",
     "Token",
     "TokenPayload",
     "NewPassword",
+    "OrderUpdate",
+    "PositionUpdate",
     "SQLModel",
 ]
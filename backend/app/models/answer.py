@@ -0,0 +1,159 @@
+import math
+import uuid
+from datetime import datetime
+
+from pydantic import field_validator
+from sqlalchemy import ARRAY, BigInteger, DateTime, Integer
+from sqlmodel import Column, Field, Relationship, SQLModel
+
+from app.models.email_outbox import utc_now
+from app.models.question import MAX_OPTIONS, QuestionPublic
+
+# Answers accepted in a single submission
+MAX_SUBMISSION_ANSWERS = 500
+
+
+class AnswerIn(SQLModel):
+    question_id: uuid.UUID
+    selected_options: list[int] = Field(max_length=MAX_OPTIONS)
+
+    @field_validator("selected_options")
+    @classmethod
+    def validate_selected_options(cls, value: list[int]) -> list[int]:
+        for option in value:
+            if option < 0 or option >= MAX_OPTIONS:
+                raise ValueError(f"selected option index {option} is out of range")
+        if len(set(value)) != len(value):
+            raise ValueError("selected options must be unique")
+        return value
+
+
+class AnswerSubmissionCreate(SQLModel):
+    answers: list[AnswerIn] = Field(min_length=1, max_length=MAX_SUBMISSION_ANSWERS)
+
+    @field_validator("answers")
+    @classmethod
+    def validate_unique_questions(cls, value: list[AnswerIn]) -> list[AnswerIn]:
+        question_ids = {answer.question_id for answer in value}
+        if len(question_ids) != len(value):
+            raise ValueError("each question can only be answered once per submission")
+        return value
+
+
+class AnswerSubmission(SQLModel, table=True):
+    __tablename__ = "answer_submission"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    student_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE", index=True)
+    # Number of correct answers out of total
+    score: int = Field(ge=0)
+    total: int = Field(ge=0)
+    submitted_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+    # Relationships
+    answers: list[QuestionAnswer] = Relationship(
+        back_populates="submission", cascade_delete=True, passive_deletes=True
+    )
+
+
+class QuestionAnswer(SQLModel, table=True):
+    __tablename__ = "question_answer"
+
+    submission_id: uuid.UUID = Field(
+        foreign_key="answer_submission.id", ondelete="CASCADE", primary_key=True
+    )
+    question_id: uuid.UUID = Field(
+        foreign_key="question.id", ondelete="CASCADE", primary_key=True, index=True
+    )
+    # Bitmask of the selected options, compared to Question.correct_options_mask
+    selected: int = Field(sa_type=BigInteger)
+    is_correct: bool
+
+    # Relationships
+    submission: AnswerSubmission = Relationship(back_populates="answers")
+
+
+class AnswerResultPublic(SQLModel):
+    question_id: uuid.UUID
+    selected_options: list[int]
+    # Given back once the student has answered
+    correct_options: list[int]
+    is_correct: bool
+
+
+class AnswerSubmissionPublic(SQLModel):
+    id: uuid.UUID
+    score: int
+    total: int
+    submitted_at: datetime
+    results: list[AnswerResultPublic]
+
+
+# ==================== QuestionStats Models ====================
+
+
+# Item statistics of a question, updated with every answer submission, so
+# reading them never scans question_answer. Restarted when the answer key
+# changes.
+class QuestionStats(SQLModel, table=True):
+    __tablename__ = "question_stats"
+
+    question_id: uuid.UUID = Field(
+        foreign_key="question.id", ondelete="CASCADE", primary_key=True
+    )
+    attempts: int = 0
+    correct: int = 0
+    # Number of times each option was selected, by option index
+    option_picks: list[int] = Field(
+        default_factory=list, sa_column=Column(ARRAY(Integer), nullable=False)
+    )
+    # Sums over attempts of the submission's score (fraction of correct
+    # answers), for the discrimination index
+    score_sum: float = 0
+    score_squares_sum: float = 0
+    correct_score_sum: float = 0
+
+    @property
+    def correct_rate(self) -> float | None:
+        """Fraction of correct attempts (item difficulty, higher is easier)"""
+        if not self.attempts:
+            return None
+        return self.correct / self.attempts
+
+    @property
+    def discrimination(self) -> float | None:
+        """
+        Point-biserial correlation between answering this question correctly
+        and the submission's score, from -1 to 1.
+
+        Low or negative values flag questions that strong students miss.
+        """
+        n, correct = self.attempts, self.correct
+        if n < 2 or correct in (0, n):
+            return None
+        mean = self.score_sum / n
+        variance = self.score_squares_sum / n - mean**2
+        if variance <= 0:
+            return None
+        p = correct / n
+        correct_mean = self.correct_score_sum / correct
+        return (correct_mean - mean) / math.sqrt(variance) * math.sqrt(p / (1 - p))
+
+
+class QuestionStatsPublic(SQLModel):
+    attempts: int
+    correct_rate: float | None
+    discrimination: float | None
+    option_picks: list[int]
+
+
+class QuestionWithStatsPublic(QuestionPublic):
+    stats: QuestionStatsPublic | None
+
+
+class QuestionsWithStatsPublic(SQLModel):
+    data: list[QuestionWithStatsPublic]
+    count: int
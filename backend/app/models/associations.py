@@ -35,7 +35,14 @@ class PhaseBook(SQLModel, table=True):
 
     __tablename__ = "phase_book"
     __table_args__ = (
-        UniqueConstraint("phase_id", "order", name="uq_phase_book_phase_order"),
+        # Deferrable, like uq_phase_program_order
+        UniqueConstraint(
+            "phase_id",
+            "order",
+            name="uq_phase_book_phase_order",
+            deferrable=True,
+            initially="IMMEDIATE",
+        ),
         UniqueConstraint("phase_id", "book_id", name="uq_phase_book_phase_book"),
     )
 
@@ -0,0 +1,106 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import DateTime, LargeBinary, UniqueConstraint
+from sqlmodel import Column, Field, SQLModel
+
+from app.models.email_outbox import utc_now
+
+# Most students whose attendance can be recorded in one request
+MAX_ROSTER_SIZE = 10_000
+
+
+def positions_to_bitmap(positions: list[int], size: int) -> bytes:
+    """Little-endian bitmap with the bits at `positions` set"""
+    mask = sum(1 << position for position in set(positions))
+    return mask.to_bytes((size + 7) // 8, "little")
+
+
+# Roster ordering of a session's students: attendance bitmaps are indexed by
+# position. Positions are assigned on first attendance and never reused, so
+# roster changes leave existing bitmaps valid: new students get new positions
+# and the positions of students who leave are just no longer read.
+class SessionRosterEntry(SQLModel, table=True):
+    __tablename__ = "session_roster"
+    __table_args__ = (
+        UniqueConstraint(
+            "session_id", "student_id", name="uq_session_roster_session_student"
+        ),
+    )
+
+    session_id: uuid.UUID = Field(
+        foreign_key="session.id", ondelete="CASCADE", primary_key=True
+    )
+    position: int = Field(primary_key=True, ge=0)
+    # Null once the user is deleted, keeping the position taken
+    student_id: uuid.UUID | None = Field(
+        default=None, foreign_key="user.id", ondelete="SET NULL"
+    )
+
+
+# Attendance of a lesson occurrence (a SessionEvent that isn't a break), as
+# little-endian bitmaps over the session's roster positions
+class EventAttendance(SQLModel, table=True):
+    __tablename__ = "event_attendance"
+
+    event_id: uuid.UUID = Field(
+        foreign_key="session_event.id", ondelete="CASCADE", primary_key=True
+    )
+    # Students enrolled when attendance was taken
+    roster: bytes = Field(sa_type=LargeBinary)
+    present: bytes = Field(sa_type=LargeBinary)
+    roster_count: int = Field(ge=0)
+    present_count: int = Field(ge=0)
+    updated_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+    @property
+    def roster_mask(self) -> int:
+        return int.from_bytes(self.roster, "little")
+
+    @property
+    def present_mask(self) -> int:
+        return int.from_bytes(self.present, "little")
+
+    @property
+    def attendance_rate(self) -> float:
+        return self.present_count / self.roster_count if self.roster_count else 0.0
+
+
+class EventAttendanceUpdate(SQLModel):
+    """The students present at a lesson; the rest of the roster was absent"""
+
+    present: list[uuid.UUID] = Field(max_length=MAX_ROSTER_SIZE)
+
+
+class EventAttendancePublic(SQLModel):
+    event_id: uuid.UUID
+    present: list[uuid.UUID]
+    absent: list[uuid.UUID]
+    roster_count: int
+    present_count: int
+    attendance_rate: float
+    updated_at: datetime
+
+
+class EventAttendanceRatePublic(SQLModel):
+    event_id: uuid.UUID
+    event_date: date
+    roster_count: int
+    present_count: int
+    attendance_rate: float
+
+
+class StudentAttendanceRatePublic(SQLModel):
+    student_id: uuid.UUID
+    # Lessons taken while the student was enrolled
+    lesson_count: int
+    present_count: int
+    attendance_rate: float
+
+
+class SessionAttendancePublic(SQLModel):
+    events: list[EventAttendanceRatePublic]
+    students: list[StudentAttendanceRatePublic]
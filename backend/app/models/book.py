@@ -1,6 +1,8 @@
 import uuid
 from typing import TYPE_CHECKING
 
+from pydantic import computed_field
+from sqlalchemy import BigInteger
 from sqlmodel import Column, Field, Relationship, SQLModel, String
 
 if TYPE_CHECKING:
@@ -9,6 +11,7 @@ if TYPE_CHECKING:
     from app.models.phase import Phase
 
 from app.models.associations import PhaseBook
+from app.models.media import media_url
 
 
 # A book doesn't necessarily have to belong to a phase, which is different from
@@ -31,21 +34,47 @@ class BookUpdate(SQLModel):
     audio: str | None = None
 
 
-class Book(BookBase, table=True):
+# Of the files uploaded through the media API, set along with their reference
+# (cleared when it's set otherwise), so their URLs are versioned without
+# reading them
+class BookMedia(SQLModel):
+    pdf_sha256: str | None = Field(default=None, max_length=64)
+    pdf_size: int | None = Field(default=None, sa_type=BigInteger)
+    audio_sha256: str | None = Field(default=None, max_length=64)
+    audio_size: int | None = Field(default=None, sa_type=BigInteger)
+
+
+class Book(BookBase, BookMedia, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     # Relationships
     phases: list[Phase] = Relationship(
         back_populates="books",
         link_model=PhaseBook,
+        passive_deletes=True,
+    )
+    lessons: list[Lesson] = Relationship(
+        back_populates="book", cascade_delete=True, passive_deletes=True
+    )
+    exams: list[Exam] = Relationship(
+        back_populates="book", cascade_delete=True, passive_deletes=True
     )
-    lessons: list[Lesson] = Relationship(back_populates="book", cascade_delete=True)
-    exams: list[Exam] = Relationship(back_populates="book", cascade_delete=True)
 
 
-class BookPublic(BookBase):
+class BookPublic(BookBase, BookMedia):
     id: uuid.UUID
 
+    # Versioned by content when uploaded, so clients can cache them for good
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def pdf_url(self) -> str | None:
+        return media_url(f"books/{self.id}/pdf", self.pdf, self.pdf_sha256)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def audio_url(self) -> str | None:
+        return media_url(f"books/{self.id}/audio", self.audio, self.audio_sha256)
+
 
 class BooksPublic(SQLModel):
     data: list[BookPublic]
@@ -1,3 +1,7 @@
+import uuid
+from typing import Self
+
+from pydantic import model_validator
 from sqlmodel import Field, SQLModel
 
 
@@ -17,3 +21,20 @@ class TokenPayload(SQLModel):
 class NewPassword(SQLModel):
     token: str
     new_password: str = Field(min_length=8, max_length=128)
+
+
+# The new order of all the items of a container (the phases of a program, the
+# books of a phase or the lessons of a book), first to last
+class OrderUpdate(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=1000)
+
+    @model_validator(mode="after")
+    def validate_unique_ids(self) -> Self:
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError("ids must not repeat")
+        return self
+
+
+# Where to move an item in its container, 0 for first
+class PositionUpdate(SQLModel):
+    position: int = Field(ge=0)
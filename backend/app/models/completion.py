@@ -0,0 +1,68 @@
+import hashlib
+import uuid
+from collections.abc import Sequence
+
+from sqlalchemy import LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+def lessons_fingerprint(lesson_ids: Sequence[uuid.UUID]) -> bytes:
+    """Digest of an ordered list of lessons, changing when it changes"""
+    return hashlib.blake2b(
+        b"".join(lesson_id.bytes for lesson_id in lesson_ids), digest_size=16
+    ).digest()
+
+
+# Lessons a student completed in a session, as a bitset: bit i is set when the
+# student completed lesson i of the session's program, in crud.get_all_lessons
+# order. Rebuilt from lesson_progress when the student completes one of the
+# program's lessons, and for every student of the session when the program's
+# lessons are added, removed or reordered (see lessons_fingerprint).
+class LessonCompletion(SQLModel, table=True):
+    __tablename__ = "lesson_completion"
+
+    session_id: uuid.UUID = Field(
+        foreign_key="session.id", ondelete="CASCADE", primary_key=True
+    )
+    student_id: uuid.UUID = Field(
+        foreign_key="user.id", ondelete="CASCADE", primary_key=True, index=True
+    )
+    # Little-endian, one bit per lesson
+    bits: bytes = Field(sa_type=LargeBinary)
+    completed_count: int = Field(ge=0)
+    # lessons_fingerprint() of the lessons the bits were built against
+    lessons_fingerprint: bytes = Field(sa_type=LargeBinary)
+
+    @property
+    def mask(self) -> int:
+        return int.from_bytes(self.bits, "little")
+
+    def next_unfinished(self, lesson_count: int) -> int | None:
+        """Position of the first lesson not completed yet"""
+        mask = self.mask
+        # Lowest zero bit
+        position = (~mask & (mask + 1)).bit_length() - 1
+        return position if position < lesson_count else None
+
+    def bit_string(self, lesson_count: int) -> str:
+        """Completion as "1" (completed) or "0" per lesson, in lesson order"""
+        if not lesson_count:
+            return ""
+        return format(self.mask, f"0{lesson_count}b")[::-1]
+
+
+class StudentCompletionPublic(SQLModel):
+    student_id: uuid.UUID
+    completed_count: int
+    completion_rate: float
+    next_lesson_id: uuid.UUID | None
+    # "1" for each completed lesson, in the order of lesson_ids
+    lessons: str
+
+
+class SessionCompletionPublic(SQLModel):
+    lesson_ids: list[uuid.UUID]
+    data: list[StudentCompletionPublic]
+    count: int
+    # Number of students by number of completed lessons (the index)
+    histogram: list[int]
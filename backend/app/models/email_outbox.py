@@ -0,0 +1,42 @@
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime, Index
+from sqlmodel import Column, Field, SQLModel
+
+EMAIL_STATUS_PENDING = "pending"
+EMAIL_STATUS_SENT = "sent"
+EMAIL_STATUS_FAILED = "failed"
+
+
+def utc_now() -> datetime:
+    return datetime.now(UTC)
+
+
+# Outgoing emails are persisted here by request handlers and delivered by
+# app/email_worker.py, so requests never block on the mail server.
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str
+    html_content: str
+    # One of EMAIL_STATUS_PENDING, EMAIL_STATUS_SENT or EMAIL_STATUS_FAILED
+    status: str = Field(default=EMAIL_STATUS_PENDING, max_length=16)
+    attempts: int = Field(default=0, ge=0)
+    last_error: str | None = None
+    created_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    next_attempt_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    sent_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
@@ -49,7 +49,7 @@ class Exam(ExamBase, table=True):
     book: Book = Relationship(back_populates="exams")
     session: ProgramSession = Relationship(back_populates="exams")
     attempts: list[ExamAttempt] = Relationship(
-        back_populates="exam", cascade_delete=True
+        back_populates="exam", cascade_delete=True, passive_deletes=True
     )
 
 
@@ -1,52 +1,160 @@
 import uuid
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Self
 
-from sqlalchemy import UniqueConstraint
+from pydantic import computed_field, model_validator
+from sqlalchemy import BigInteger, CheckConstraint, Index, UniqueConstraint
+from sqlalchemy.orm import deferred
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.models.media import media_endpoint_url, media_url
+from app.models.search import SEARCH_CONFIG, search_vector_column
+
 if TYPE_CHECKING:
     from app.models.book import Book
     from app.models.question import Question
     from app.models.session_event import SessionEvent
 
 
-class LessonBase(SQLModel):
-    book_part_pdf: str
+class LessonContent(SQLModel):
+    # Either a separate file or a page range of the book's PDF (1-based,
+    # inclusive) sliced when first requested, see app/core/pdf_slices.py
+    book_part_pdf: str | None = None
+    book_pages_start: int | None = Field(default=None, ge=1)
+    book_pages_end: int | None = Field(default=None, ge=1)
     book_part_audio: str
     lesson_audio: str
     explanation_notes: str
+
+    @model_validator(mode="after")
+    def validate_book_part(self) -> LessonContent:
+        if (self.book_pages_start is None) != (self.book_pages_end is None):
+            raise ValueError("book_pages_start and book_pages_end must be set together")
+        if self.book_pages_start is None:
+            if self.book_part_pdf is None:
+                raise ValueError("either book_part_pdf or the book pages must be set")
+        elif self.book_part_pdf is not None:
+            raise ValueError("book_part_pdf and the book pages must not both be set")
+        elif self.book_pages_end is not None and (
+            self.book_pages_start > self.book_pages_end
+        ):
+            raise ValueError("book_pages_start must not be after book_pages_end")
+        return self
+
+
+# Like BookMedia. The version of the book pages is derived from the book's PDF
+# hash, see app.models.media.book_pages_version
+class LessonMedia(SQLModel):
+    book_part_pdf_sha256: str | None = Field(default=None, max_length=64)
+    book_part_pdf_size: int | None = Field(default=None, sa_type=BigInteger)
+    book_part_audio_sha256: str | None = Field(default=None, max_length=64)
+    book_part_audio_size: int | None = Field(default=None, sa_type=BigInteger)
+    lesson_audio_sha256: str | None = Field(default=None, max_length=64)
+    lesson_audio_size: int | None = Field(default=None, sa_type=BigInteger)
+    book_pages_version: str | None = Field(default=None, max_length=16)
+
+
+class LessonBase(LessonContent):
     order: int = Field(index=True, ge=0)
     book_id: uuid.UUID = Field(foreign_key="book.id", ondelete="CASCADE")
 
 
 class LessonCreate(LessonBase):
-    pass
+    # Like PhaseCreate, among the lessons of the book
+    order: int | None = Field(default=None, ge=0)  # type: ignore[assignment]
+    position: int | None = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def validate_placement(self) -> Self:
+        if self.order is not None and self.position is not None:
+            raise ValueError("order and position must not both be set")
+        return self
 
 
 class LessonUpdate(SQLModel):
     book_part_pdf: str | None = None
+    book_pages_start: int | None = Field(default=None, ge=1)
+    book_pages_end: int | None = Field(default=None, ge=1)
     book_part_audio: str | None = None
     lesson_audio: str | None = None
     explanation_notes: str | None = None
 
 
-class Lesson(LessonBase, table=True):
+BOOK_PART_CHECK = (
+    "(book_part_pdf IS NOT NULL AND book_pages_start IS NULL"
+    " AND book_pages_end IS NULL)"
+    " OR (book_part_pdf IS NULL AND book_pages_start IS NOT NULL"
+    " AND book_pages_end IS NOT NULL AND book_pages_start <= book_pages_end)"
+)
+
+_search_vector = search_vector_column(
+    f"to_tsvector('{SEARCH_CONFIG}', arabic_normalize(explanation_notes))"
+)
+
+
+class Lesson(LessonBase, LessonMedia, table=True):
     __table_args__ = (
-        UniqueConstraint("book_id", "order", name="uq_lesson_book_order"),
+        # Deferrable, like uq_phase_program_order
+        UniqueConstraint(
+            "book_id",
+            "order",
+            name="uq_lesson_book_order",
+            deferrable=True,
+            initially="IMMEDIATE",
+        ),
+        Index("ix_lesson_search_vector", "search_vector", postgresql_using="gin"),
+        # LessonContent.validate_book_part, for writes bypassing the models
+        CheckConstraint(BOOK_PART_CHECK, name="ck_lesson_book_part"),
     )
+    __mapper_args__ = {"properties": {"search_vector": deferred(_search_vector)}}
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    search_vector: str | None = Field(
+        default=None, sa_column=_search_vector, exclude=True
+    )
 
     # Relationships
     book: Book = Relationship(back_populates="lessons")
     questions: list[Question] = Relationship(
-        back_populates="lesson", cascade_delete=True
+        back_populates="lesson", cascade_delete=True, passive_deletes=True
+    )
+    session_events: list[SessionEvent] = Relationship(
+        back_populates="lesson", passive_deletes=True
     )
-    session_events: list[SessionEvent] = Relationship(back_populates="lesson")
 
 
-class LessonPublic(LessonBase):
+class LessonPublic(LessonBase, LessonMedia):
     id: uuid.UUID
+    # In listings of its book: the position of the lesson, 0 for first. Its
+    # order is a sort key with gaps, see app/crud/ordering.py
+    position: int | None = None
+
+    # Versioned by content when uploaded, so clients can cache them for good
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def book_part_pdf_url(self) -> str | None:
+        endpoint = f"lessons/{self.id}/book_part_pdf"
+        if self.book_part_pdf is None:
+            # Pages of the book's PDF
+            return media_endpoint_url(endpoint, self.book_pages_version)
+        return media_url(endpoint, self.book_part_pdf, self.book_part_pdf_sha256)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def book_part_audio_url(self) -> str | None:
+        return media_url(
+            f"lessons/{self.id}/book_part_audio",
+            self.book_part_audio,
+            self.book_part_audio_sha256,
+        )
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def lesson_audio_url(self) -> str | None:
+        return media_url(
+            f"lessons/{self.id}/lesson_audio",
+            self.lesson_audio,
+            self.lesson_audio_sha256,
+        )
 
 
 class LessonsPublic(SQLModel):
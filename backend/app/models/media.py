@@ -0,0 +1,123 @@
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Literal, Self
+from urllib.parse import urlsplit
+
+from pydantic import model_validator
+from sqlalchemy import BigInteger, DateTime
+from sqlmodel import Column, Field, SQLModel
+
+from app.core.config import settings
+from app.models.email_outbox import utc_now
+
+# Largest file accepted by the upload API
+MAX_UPLOAD_SIZE = 2 * 1024**3
+
+# Media fields that can be set by upload, by target
+MEDIA_FIELDS: dict[str, tuple[str, ...]] = {
+    "book": ("pdf", "audio"),
+    "lesson": ("book_part_pdf", "book_part_audio", "lesson_audio"),
+}
+
+
+def is_remote(reference: str) -> bool:
+    return urlsplit(reference).scheme in ("http", "https")
+
+
+def media_version(sha256: str | None) -> str | None:
+    """Version of a media file in its URL, from its stored content hash"""
+    return sha256[:16] if sha256 else None
+
+
+def book_pages_version(
+    book_pdf_sha256: str | None, start: int | None, end: int | None
+) -> str | None:
+    """Version of pages sliced from a book's PDF, from the PDF's content hash"""
+    if not book_pdf_sha256 or start is None or end is None:
+        return None
+    return hashlib.sha256(f"{book_pdf_sha256}:{start}-{end}".encode()).hexdigest()[:16]
+
+
+def media_endpoint_url(endpoint: str, version: str | None) -> str:
+    """URL of a media endpoint (under /media), versioned when the version is known"""
+    url = f"{settings.API_V1_STR}/media/{endpoint}"
+    return url if version is None else f"{url}?v={version}"
+
+
+def media_url(endpoint: str, reference: str | None, sha256: str | None) -> str | None:
+    """
+    URL of a media reference: as is when hosted elsewhere, otherwise its media
+    endpoint, versioned by the stored content hash when there is one.
+    """
+    if not reference:
+        return None
+    if is_remote(reference):
+        return reference
+    return media_endpoint_url(endpoint, media_version(sha256))
+
+
+class MediaUploadBase(SQLModel):
+    # "book" or "lesson"
+    target: str = Field(max_length=16)
+    target_id: uuid.UUID
+    # The media field of the book or lesson set once the upload completes
+    field: str = Field(max_length=32)
+    # Only used for the stored file extension
+    filename: str = Field(max_length=255)
+    size: int = Field(gt=0, le=MAX_UPLOAD_SIZE, sa_type=BigInteger)
+
+
+class MediaUploadCreate(MediaUploadBase):
+    target: Literal["book", "lesson"]
+
+    @model_validator(mode="after")
+    def validate_field(self) -> Self:
+        if self.field not in MEDIA_FIELDS[self.target]:
+            raise ValueError(
+                f"field must be one of {', '.join(MEDIA_FIELDS[self.target])}"
+            )
+        return self
+
+
+# A resumable upload in progress. The bytes received so far are in a part
+# file on disk (see app/core/uploads.py), whose size is the resume offset.
+class MediaUpload(MediaUploadBase, table=True):
+    __tablename__ = "media_upload"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    created_by: uuid.UUID | None = Field(
+        default=None, foreign_key="user.id", ondelete="SET NULL"
+    )
+    created_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+
+class MediaUploadPublic(MediaUploadBase):
+    id: uuid.UUID
+    created_at: datetime
+    # Bytes stored so far: the offset to resume from
+    received: int
+    # The media reference set on the target, once complete
+    reference: str | None = None
+
+
+# A media file in a book's manifest
+class MediaAssetPublic(SQLModel):
+    # Versioned by content (changes whenever the file does) when the content
+    # hash is known
+    url: str
+    target: str
+    target_id: uuid.UUID
+    field: str
+    # Known for uploaded files only
+    size: int | None = None
+    sha256: str | None = None
+
+
+class MediaManifestPublic(SQLModel):
+    book_id: uuid.UUID
+    assets: list[MediaAssetPublic]
+    count: int
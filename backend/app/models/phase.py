@@ -1,6 +1,7 @@
 import uuid
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Self
 
+from pydantic import model_validator
 from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -17,7 +18,16 @@ class PhaseBase(SQLModel):
 
 
 class PhaseCreate(PhaseBase):
-    pass
+    # Either a sort key as is, or a position among the phases of the program
+    # (0 for first). Appended when neither is set
+    order: int | None = Field(default=None, ge=0)  # type: ignore[assignment]
+    position: int | None = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def validate_placement(self) -> Self:
+        if self.order is not None and self.position is not None:
+            raise ValueError("order and position must not both be set")
+        return self
 
 
 class PhaseUpdate(SQLModel):
@@ -26,7 +36,15 @@ class PhaseUpdate(SQLModel):
 
 class Phase(PhaseBase, table=True):
     __table_args__ = (
-        UniqueConstraint("program_id", "order", name="uq_phase_program_order"),
+        # Deferrable: checked at the end of each statement, so orders can be
+        # swapped in one UPDATE (see crud.ordering.reorder)
+        UniqueConstraint(
+            "program_id",
+            "order",
+            name="uq_phase_program_order",
+            deferrable=True,
+            initially="IMMEDIATE",
+        ),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -36,11 +54,15 @@ class Phase(PhaseBase, table=True):
     books: list[Book] = Relationship(
         back_populates="phases",
         link_model=PhaseBook,
+        passive_deletes=True,
     )
 
 
 class PhasePublic(PhaseBase):
     id: uuid.UUID
+    # In listings of its program: the position of the phase, 0 for first. Its
+    # order is a sort key with gaps, see app/crud/ordering.py
+    position: int | None = None
 
 
 class PhasesPublic(SQLModel):
@@ -1,8 +1,13 @@
 import uuid
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Self
 
+from pydantic import model_validator
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.models.book import BookBase
+from app.models.lesson import LessonContent
+from app.models.phase import PhasePublic
+
 if TYPE_CHECKING:
     from app.models.phase import Phase
     from app.models.session import ProgramSession
@@ -84,9 +89,11 @@ class Program(SQLModel, table=True):
     days_of_study: int = Field(ge=0, lt=2**7)
 
     # Relationships
-    phases: list[Phase] = Relationship(back_populates="program", cascade_delete=True)
+    phases: list[Phase] = Relationship(
+        back_populates="program", cascade_delete=True, passive_deletes=True
+    )
     sessions: list[ProgramSession] = Relationship(
-        back_populates="program", cascade_delete=True
+        back_populates="program", cascade_delete=True, passive_deletes=True
     )
 
     @property
@@ -120,6 +127,48 @@ class ProgramPublic(ProgramBase):
         )
 
 
+# Creating a whole program in one request: phases, books and lessons are
+# ordered by their position in the lists
+class BookDeepCreate(BookBase):
+    lessons: list[LessonContent] = Field(default_factory=list, max_length=1000)
+
+
+class PhaseBookDeepCreate(SQLModel):
+    # An existing book, or a new one
+    book_id: uuid.UUID | None = None
+    book: BookDeepCreate | None = None
+
+    @model_validator(mode="after")
+    def validate_book(self) -> Self:
+        if (self.book_id is None) == (self.book is None):
+            raise ValueError("either book_id or book must be set")
+        return self
+
+
+class PhaseDeepCreate(SQLModel):
+    books: list[PhaseBookDeepCreate] = Field(default_factory=list, max_length=100)
+
+    @model_validator(mode="after")
+    def validate_unique_books(self) -> Self:
+        book_ids = [book.book_id for book in self.books if book.book_id is not None]
+        if len(book_ids) != len(set(book_ids)):
+            raise ValueError("a book can only be added to a phase once")
+        return self
+
+
+class ProgramDeepCreate(ProgramCreate):
+    phases: list[PhaseDeepCreate] = Field(default_factory=list, max_length=100)
+
+
+class PhaseDeepPublic(PhasePublic):
+    # In order
+    book_ids: list[uuid.UUID]
+
+
+class ProgramDeepPublic(ProgramPublic):
+    phases: list[PhaseDeepPublic]
+
+
 class ProgramsPublic(SQLModel):
     data: list[ProgramPublic]
     count: int
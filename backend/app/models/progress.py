@@ -0,0 +1,67 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Column, Field, SQLModel
+
+from app.models.email_outbox import utc_now
+
+# Share of the lesson audio to listen to for the lesson to count as completed
+LESSON_COMPLETION_RATIO = 0.9
+
+
+class LessonProgressHeartbeat(SQLModel):
+    """Playback position reported periodically by the lesson audio player"""
+
+    position_seconds: float = Field(ge=0)
+    # Length of the audio, when known to the player
+    duration_seconds: float | None = Field(default=None, gt=0)
+
+
+def is_lesson_completed(
+    max_position_seconds: float, duration_seconds: float | None
+) -> bool:
+    return (
+        duration_seconds is not None
+        and max_position_seconds >= LESSON_COMPLETION_RATIO * duration_seconds
+    )
+
+
+# How far a student listened to a lesson's audio (lesson_audio). Written in
+# batches from coalesced heartbeats, see app/core/progress.py.
+class LessonProgress(SQLModel, table=True):
+    __tablename__ = "lesson_progress"
+
+    student_id: uuid.UUID = Field(
+        foreign_key="user.id", ondelete="CASCADE", primary_key=True
+    )
+    lesson_id: uuid.UUID = Field(
+        foreign_key="lesson.id", ondelete="CASCADE", primary_key=True, index=True
+    )
+    # Last reported position, to resume playback
+    position_seconds: float = Field(ge=0)
+    # Furthest position reached, for completion
+    max_position_seconds: float = Field(ge=0)
+    duration_seconds: float | None = None
+    # is_lesson_completed, sticky: it never goes back to false, even when a
+    # longer duration is reported later. Set by crud.upsert_lesson_progress
+    completed: bool = False
+    updated_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+
+class LessonProgressPublic(SQLModel):
+    student_id: uuid.UUID
+    lesson_id: uuid.UUID
+    position_seconds: float
+    max_position_seconds: float
+    duration_seconds: float | None
+    completed: bool
+    updated_at: datetime
+
+
+class LessonProgressesPublic(SQLModel):
+    data: list[LessonProgressPublic]
+    count: int
@@ -1,12 +1,34 @@
 import uuid
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
 from pydantic import model_validator
+from sqlalchemy import BigInteger, Computed, Index
+from sqlalchemy.orm import deferred
 from sqlmodel import JSON, Column, Field, Relationship, SQLModel
 
+from app.models.search import search_vector_column
+
 if TYPE_CHECKING:
     from app.models.lesson import Lesson
 
+# Sets of options (correct or selected) are stored as BIGINT bitmasks, bit i set
+# when option i is in the set, so a question can have up to 63 options
+MAX_OPTIONS = 63
+
+
+def options_to_mask(options: Iterable[int]) -> int:
+    """Pack option indexes into a bitmask"""
+    mask = 0
+    for option in options:
+        mask |= 1 << option
+    return mask
+
+
+def mask_to_options(mask: int) -> list[int]:
+    """Unpack a bitmask into sorted option indexes"""
+    return [option for option in range(mask.bit_length()) if mask >> option & 1]
+
 
 # Answers are public for now. We can make them private if we start storing students' answers.
 # Basically giving back answers only when a student has made an attempt.
@@ -15,11 +37,15 @@ class QuestionBase(SQLModel):
     options: list[str] = Field(sa_column=Column(JSON))
     correct_options: list[int] = Field(sa_column=Column(JSON))
     explanation: str | None = None
-    lesson_id: uuid.UUID = Field(foreign_key="lesson.id", ondelete="CASCADE")
+    lesson_id: uuid.UUID = Field(
+        foreign_key="lesson.id", ondelete="CASCADE", index=True
+    )
 
     @model_validator(mode="after")
     def validate_correct_options(self) -> QuestionBase:
         max_idx = len(self.options)
+        if max_idx > MAX_OPTIONS:
+            raise ValueError(f"a question can have at most {MAX_OPTIONS} options")
         for option in self.correct_options:
             if option < 0 or option >= max_idx:
                 raise ValueError(
@@ -39,15 +65,50 @@ class QuestionUpdate(SQLModel):
     explanation: str | None = None
 
 
+# Question text, options and explanation, weighted in that order
+_search_vector = search_vector_column(
+    "question_search_vector(question, options, explanation)"
+)
+
+
+# correct_options as a bitmask, kept in sync by the DB, to grade and aggregate
+# answers with bitwise SQL instead of parsing JSON
+_correct_options_mask = Column(
+    "correct_options_mask",
+    BigInteger,
+    Computed("options_mask(correct_options)", persisted=True),
+)
+
+
 class Question(QuestionBase, table=True):
+    __table_args__ = (
+        Index("ix_question_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    __mapper_args__ = {
+        "properties": {"search_vector": deferred(_search_vector)},
+        # Read correct_options_mask back with UPDATE ... RETURNING as well
+        "eager_defaults": True,
+    }
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    search_vector: str | None = Field(
+        default=None, sa_column=_search_vector, exclude=True
+    )
+    correct_options_mask: int | None = Field(
+        default=None, sa_column=_correct_options_mask, exclude=True
+    )
 
     # Relationships
     lesson: Lesson = Relationship(back_populates="questions")
 
     def is_single_answer(self) -> bool:
         """Check if this question has a single correct answer"""
-        return len(self.correct_options) == 1
+        # Not computed yet for questions that aren't saved
+        if self.correct_options_mask is None:
+            return len(self.correct_options) == 1
+        # Exactly one bit set
+        mask = self.correct_options_mask
+        return mask != 0 and mask & (mask - 1) == 0
 
 
 class QuestionPublic(QuestionBase):
@@ -57,3 +118,10 @@ class QuestionPublic(QuestionBase):
 class QuestionsPublic(SQLModel):
     data: list[QuestionPublic]
     count: int
+
+
+class QuizPublic(SQLModel):
+    # Pass the seed back to get the same questions again
+    seed: int
+    data: list[QuestionPublic]
+    count: int
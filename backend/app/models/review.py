@@ -0,0 +1,61 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, Index
+from sqlmodel import Column, Field, SQLModel
+
+from app.models.email_outbox import utc_now
+
+# SM-2 parameters. Answers are graded right or wrong, mapped to these SM-2
+# qualities (0 blackout to 5 perfect recall)
+REVIEW_QUALITY_CORRECT = 4
+REVIEW_QUALITY_INCORRECT = 1
+REVIEW_INITIAL_EASE = 2.5
+REVIEW_MIN_EASE = 1.3
+
+
+# Spaced-repetition schedule of a question for a student, created when the
+# student first answers it and updated with every answer after that
+class ReviewItem(SQLModel, table=True):
+    __tablename__ = "review_item"
+    __table_args__ = (
+        # The student's review queue, next due first
+        Index("ix_review_item_student_id_due_at", "student_id", "due_at"),
+    )
+
+    student_id: uuid.UUID = Field(
+        foreign_key="user.id", ondelete="CASCADE", primary_key=True
+    )
+    question_id: uuid.UUID = Field(
+        foreign_key="question.id", ondelete="CASCADE", primary_key=True, index=True
+    )
+    due_at: datetime = Field(
+        default_factory=utc_now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    interval_days: int = Field(default=0, ge=0)
+    ease: float = Field(default=REVIEW_INITIAL_EASE, ge=REVIEW_MIN_EASE)
+    # Consecutive successful reviews
+    repetitions: int = Field(default=0, ge=0)
+    last_reviewed_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+
+    def review(self, quality: int, now: datetime) -> None:
+        """Reschedule after a review of the given quality (0 to 5), following SM-2"""
+        if quality >= 3:
+            if self.repetitions == 0:
+                self.interval_days = 1
+            elif self.repetitions == 1:
+                self.interval_days = 6
+            else:
+                self.interval_days = round(self.interval_days * self.ease)
+            self.repetitions += 1
+        else:
+            # Start over, seeing the question again tomorrow
+            self.repetitions = 0
+            self.interval_days = 1
+        miss = 5 - quality
+        self.ease = max(REVIEW_MIN_EASE, self.ease + 0.1 - miss * (0.08 + miss * 0.02))
+        self.last_reviewed_at = now
+        self.due_at = now + timedelta(days=self.interval_days)
@@ -0,0 +1,30 @@
+from typing import Any
+
+from sqlalchemy import Column, ColumnElement, Computed, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import col
+
+# Text search configuration of all search vectors and queries. Documents and
+# queries also go through the arabic_normalize() SQL function, which strips
+# tashkeel and unifies alef, ya and ta marbuta forms, so a search matches
+# regardless of how the text was typed.
+SEARCH_CONFIG = "arabic"
+
+
+def search_vector_column(expression: str) -> Column[str]:
+    """
+    A `search_vector` tsvector column computed and stored by the DB.
+
+    Map it deferred, so the vector is only loaded when used in a query.
+    """
+    return Column("search_vector", TSVECTOR, Computed(expression, persisted=True))
+
+
+def search_query(text: str) -> ColumnElement[Any]:
+    """Parse search text (web search syntax: "quoted phrase", or, -not)"""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, func.arabic_normalize(text))
+
+
+def search_match(search_vector: str | None, text: str) -> ColumnElement[bool]:
+    """Filter rows whose search_vector matches the search text"""
+    return col(search_vector).bool_op("@@")(search_query(text))
@@ -38,17 +38,21 @@ class ProgramSession(ProgramSessionBase, table=True):
     students: list[User] = Relationship(
         back_populates="student_sessions",
         link_model=UserSessionStudent,
+        passive_deletes=True,
         sa_relationship_kwargs={"overlaps": "teachers"},
     )
     teachers: list[User] = Relationship(
         back_populates="teacher_sessions",
         link_model=UserSessionTeacher,
+        passive_deletes=True,
         sa_relationship_kwargs={"overlaps": "students"},
     )
     session_events: list[SessionEvent] = Relationship(
-        back_populates="session", cascade_delete=True
+        back_populates="session", cascade_delete=True, passive_deletes=True
+    )
+    exams: list[Exam] = Relationship(
+        back_populates="session", cascade_delete=True, passive_deletes=True
     )
-    exams: list[Exam] = Relationship(back_populates="session", cascade_delete=True)
 
     def get_breaks(self) -> list[SessionEvent]:
         """Get all breaks for this session ordered by their start date"""
@@ -3,6 +3,8 @@ from datetime import date
 from typing import TYPE_CHECKING
 
 from pydantic import EmailStr
+from sqlalchemy import Column, Computed, Index, Text
+from sqlalchemy.orm import deferred
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -79,24 +81,56 @@ class UpdatePassword(SQLModel):
     new_password: str = Field(min_length=PASSWORD_MIN_LEN, max_length=PASSWORD_MAX_LEN)
 
 
+# Full name normalized by the DB for trigram search, see crud.search_users
+_search_name = Column(
+    "search_name",
+    Text,
+    Computed(
+        "arabic_normalize_name(first_name || ' ' || father_name || ' ' || family_name)",
+        persisted=True,
+    ),
+)
+
+
 class User(UserBase, table=True):
+    __table_args__ = (
+        Index(
+            "ix_user_search_name_trgm",
+            "search_name",
+            postgresql_using="gin",
+            postgresql_ops={"search_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+    )
+    __mapper_args__ = {"properties": {"search_name": deferred(_search_name)}}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
     reg_date: date = Field(default_factory=date.today)
+    search_name: str | None = Field(default=None, sa_column=_search_name, exclude=True)
 
     # Relationships
     student_sessions: list[ProgramSession] = Relationship(
         back_populates="students",
         link_model=UserSessionStudent,
+        passive_deletes=True,
         sa_relationship_kwargs={"overlaps": "teacher_sessions"},
     )
     teacher_sessions: list[ProgramSession] = Relationship(
         back_populates="teachers",
         link_model=UserSessionTeacher,
+        passive_deletes=True,
         sa_relationship_kwargs={"overlaps": "student_sessions"},
     )
     exam_attempts: list[ExamAttempt] = Relationship(
         back_populates="student",
+        cascade_delete=True,
+        passive_deletes=True,
         sa_relationship_kwargs={
             "foreign_keys": "ExamAttempt.student_id",
             "overlaps": "examined_attempts",
@@ -104,6 +138,8 @@ class User(UserBase, table=True):
     )
     examined_attempts: list[ExamAttempt] = Relationship(
         back_populates="examiner",
+        cascade_delete=True,
+        passive_deletes=True,
         sa_relationship_kwargs={
             "foreign_keys": "ExamAttempt.examiner_id",
             "overlaps": "exam_attempts",
@@ -0,0 +1,167 @@
+"""
+Benchmark deleting a program along with its book, in seconds.
+
+The program has a phase with a book of 5k lessons and 100k questions, and a
+session with an event per lesson. Compares the ORM walking the cascade (every
+child loaded, then deleted row by row, as before passive deletes) with the
+database cascading ON DELETE from the single delete of the parent.
+
+A book is shared between programs, so deleting a program keeps its books: the
+book is deleted right after, which is where the lessons and questions go.
+
+Only meant for a local development database: the rows are created and deleted
+by the benchmark itself.
+
+Usage (from ./backend/, e.g. inside the backend container):
+
+    python scripts/benchmark_cascade_delete.py [--lessons 5000] [--questions 100000]
+"""
+
+import argparse
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session
+
+from app import crud
+from app.core.db import engine
+from app.crud.ordering import order_key
+from app.models import (
+    Book,
+    Lesson,
+    Phase,
+    PhaseBook,
+    Program,
+    ProgramSession,
+    Question,
+    SessionEvent,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def create_program(
+    session: Session, lessons: int, questions: int
+) -> tuple[uuid.UUID, uuid.UUID]:
+    program = Program(title="Cascade benchmark", days_of_study=0b0010101)
+    book = Book(title="Cascade benchmark")
+    session.add_all([program, book])
+    session.flush()
+    phase = Phase(order=order_key(0), program_id=program.id)
+    program_session = ProgramSession(program_id=program.id, start_date=date.today())
+    session.add_all([phase, program_session])
+    session.flush()
+    session.add(PhaseBook(phase_id=phase.id, book_id=book.id, order=order_key(0)))
+
+    lesson_ids = [uuid.uuid4() for _ in range(lessons)]
+    session.execute(
+        insert(Lesson),
+        [
+            {
+                "id": lesson_id,
+                "book_part_pdf": f"lessons/{position}.pdf",
+                "book_part_audio": f"lessons/{position}.mp3",
+                "lesson_audio": f"lessons/{position}-explanation.mp3",
+                "explanation_notes": "",
+                "order": order_key(position),
+                "book_id": book.id,
+            }
+            for position, lesson_id in enumerate(lesson_ids)
+        ],
+    )
+    session.execute(
+        insert(Question),
+        [
+            {
+                "question": f"Question {i}",
+                "options": ["a", "b", "c", "d"],
+                "correct_options": [i % 4],
+                "lesson_id": lesson_ids[i % lessons],
+            }
+            for i in range(questions)
+        ],
+    )
+    session.execute(
+        insert(SessionEvent),
+        [
+            {
+                "event_date": date.today() + timedelta(days=order),
+                "session_id": program_session.id,
+                "lesson_id": lesson_id,
+            }
+            for order, lesson_id in enumerate(lesson_ids)
+        ],
+    )
+    session.commit()
+    return program.id, book.id
+
+
+def delete_orm_walk(
+    session: Session, program_id: uuid.UUID, book_id: uuid.UUID
+) -> None:
+    # Eager loading is the cheapest way the ORM had to walk the cascade: lazy
+    # loads issued one query per parent on top of this
+    program = session.get(
+        Program,
+        program_id,
+        options=[
+            selectinload(Program.phases).selectinload(Phase.books),
+            selectinload(Program.sessions)
+            .selectinload(ProgramSession.session_events)
+            .selectinload(SessionEvent.lesson),
+        ],
+    )
+    session.delete(program)
+    session.commit()
+    book = session.get(
+        Book,
+        book_id,
+        options=[
+            selectinload(Book.lessons).selectinload(Lesson.questions),
+            selectinload(Book.lessons).selectinload(Lesson.session_events),
+            selectinload(Book.phases),
+        ],
+    )
+    session.delete(book)
+    session.commit()
+
+
+def delete_passive(session: Session, program_id: uuid.UUID, book_id: uuid.UUID) -> None:
+    crud.delete_program(session=session, program_id=program_id)
+    crud.delete_book(session=session, book_id=book_id)
+
+
+def measure(
+    delete: Callable[[Session, uuid.UUID, uuid.UUID], None],
+    lessons: int,
+    questions: int,
+) -> float:
+    with Session(engine) as session:
+        program_id, book_id = create_program(session, lessons, questions)
+    with Session(engine) as session:
+        start = time.perf_counter()
+        delete(session, program_id, book_id)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lessons", type=int, default=5_000)
+    parser.add_argument("--questions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    orm_walk = measure(delete_orm_walk, args.lessons, args.questions)
+    passive = measure(delete_passive, args.lessons, args.questions)
+    logger.info(f"ORM cascade walk: {orm_walk:8.2f} s")
+    logger.info(f"passive deletes:  {passive:8.2f} s")
+    logger.info(f"speedup:          {orm_walk / passive:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
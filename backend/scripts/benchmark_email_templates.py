@@ -0,0 +1,65 @@
+"""
+Benchmark email template rendering, in renders per second.
+
+Compares compiling the template from disk on every render (the previous
+behaviour) with the cached environment used by app.utils.render_email_template.
+
+Usage (from ./backend/, e.g. inside the backend container):
+
+    python scripts/benchmark_email_templates.py [--renders 2000]
+"""
+
+import argparse
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from jinja2 import Template
+
+from app.utils import EMAIL_TEMPLATES_DIR, render_email_template
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME = "reset_password.html"
+CONTEXT: dict[str, Any] = {
+    "project_name": "Benchmark",
+    "username": "student@example.com",
+    "email": "student@example.com",
+    "valid_hours": 48,
+    "link": "http://localhost:5173/reset-password?token=benchmark",
+}
+
+
+def render_uncached() -> str:
+    template_str = (EMAIL_TEMPLATES_DIR / TEMPLATE_NAME).read_text()
+    return Template(template_str).render(CONTEXT)
+
+
+def render_cached() -> str:
+    return render_email_template(template_name=TEMPLATE_NAME, context=CONTEXT)
+
+
+def measure(render: Callable[[], str], renders: int) -> float:
+    render()  # warm up
+    start = time.perf_counter()
+    for _ in range(renders):
+        render()
+    return renders / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    uncached = measure(render_uncached, args.renders)
+    cached = measure(render_cached, args.renders)
+    logger.info(f"compile per render: {uncached:10.0f} renders/sec")
+    logger.info(f"cached environment: {cached:10.0f} renders/sec")
+    logger.info(f"speedup:            {cached / uncached:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
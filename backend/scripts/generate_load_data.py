@@ -0,0 +1,441 @@
+"""
+Fill the database with a large synthetic dataset for load testing.
+
+At --scale 1 this creates 50 programs, 250 books, 5k lessons, 200k questions,
+100k students, 2k sessions, 1M session events, 10k exams and 500k exam
+attempts, streamed into Postgres with COPY. Use a smaller scale (e.g. 0.01)
+for a quick run.
+
+Every generated user has the password LOAD_TEST_PASSWORD and an email at
+LOAD_TEST_EMAIL_DOMAIN, which is how scripts/load_test.py finds them.
+
+Only meant for a local development database (the docker-compose one): --reset
+empties all programs, books, sessions and load test users first.
+
+Usage (from ./backend/, e.g. inside the backend container):
+
+    python scripts/generate_load_data.py [--scale 1.0] [--seed 0] [--reset]
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+import uuid
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date, timedelta
+from typing import Any
+
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.crud.ordering import order_key
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+LOAD_TEST_PASSWORD = "loadtest-password"
+LOAD_TEST_EMAIL_DOMAIN = "loadtest.example.com"
+
+# Counts at --scale 1
+PROGRAMS = 50
+BOOKS_PER_PROGRAM = 5
+LESSONS = 5_000
+QUESTIONS = 200_000
+STUDENTS = 100_000
+SESSIONS = 2_000
+SESSION_EVENTS = 1_000_000
+EXAM_ATTEMPTS = 500_000
+SESSIONS_PER_TEACHER = 2
+# One break every BREAK_EVERY session events
+BREAK_EVERY = 7
+EXAM_MAX_ATTEMPTS = 3
+
+WORDS = (
+    "الصلاة",
+    "الزكاة",
+    "الصيام",
+    "الحج",
+    "الطهارة",
+    "الوضوء",
+    "التيمم",
+    "الغسل",
+    "الأذان",
+    "الإقامة",
+    "القبلة",
+    "الركوع",
+    "السجود",
+    "التشهد",
+    "السنة",
+    "الفريضة",
+    "الواجب",
+    "المستحب",
+    "المكروه",
+    "الحديث",
+    "الإسناد",
+    "الراوي",
+    "الصحابي",
+    "التابعي",
+    "العقيدة",
+    "التوحيد",
+    "الإيمان",
+    "الإحسان",
+    "النية",
+    "الإخلاص",
+    "حكم",
+    "شروط",
+    "أركان",
+    "مبطلات",
+    "فضل",
+    "باب",
+    "كتاب",
+    "مسألة",
+    "قال",
+    "العلماء",
+)
+FIRST_NAMES = ("محمد", "أحمد", "عبدالله", "عمر", "علي", "خالد", "سعد", "يوسف")
+FEMALE_FIRST_NAMES = ("فاطمة", "عائشة", "مريم", "خديجة", "نورة", "سارة", "هند")
+FAMILY_NAMES = ("العصيمي", "القحطاني", "الشمري", "الدوسري", "الغامدي", "الزهراني")
+
+
+def scaled(count: int, scale: float) -> int:
+    return max(1, round(count * scale))
+
+
+class Generator:
+    """Deterministic rows for each table, keeping the IDs later tables refer to."""
+
+    def __init__(self, *, scale: float, seed: int) -> None:
+        self.rng = random.Random(seed)
+        self.today = date.today()
+        self.programs = scaled(PROGRAMS, scale)
+        self.books = self.programs * BOOKS_PER_PROGRAM
+        self.lessons_per_book = max(1, scaled(LESSONS, scale) // self.books)
+        self.questions_per_lesson = max(
+            1, scaled(QUESTIONS, scale) // (self.books * self.lessons_per_book)
+        )
+        self.sessions = scaled(SESSIONS, scale)
+        self.students = scaled(STUDENTS, scale)
+        self.teachers = max(1, self.sessions // SESSIONS_PER_TEACHER)
+        self.events_per_session = max(1, scaled(SESSION_EVENTS, scale) // self.sessions)
+        self.exam_attempts = scaled(EXAM_ATTEMPTS, scale)
+
+        self.program_ids = [self.new_id() for _ in range(self.programs)]
+        # Books of program p are book_ids[p * BOOKS_PER_PROGRAM:][:BOOKS_PER_PROGRAM]
+        self.book_ids = [self.new_id() for _ in range(self.books)]
+        self.lesson_ids = [
+            [self.new_id() for _ in range(self.lessons_per_book)]
+            for _ in range(self.books)
+        ]
+        # Session s belongs to program s % programs, student i to session i % sessions
+        self.session_ids = [self.new_id() for _ in range(self.sessions)]
+        self.student_ids = [self.new_id() for _ in range(self.students)]
+        self.teacher_ids = [self.new_id() for _ in range(self.teachers)]
+        self.exam_ids = [
+            [self.new_id() for _ in range(BOOKS_PER_PROGRAM)]
+            for _ in range(self.sessions)
+        ]
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def text(self, words: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=words))
+
+    def program_books(self, program: int) -> list[uuid.UUID]:
+        start = program * BOOKS_PER_PROGRAM
+        return self.book_ids[start : start + BOOKS_PER_PROGRAM]
+
+    def session_teacher(self, session: int) -> uuid.UUID:
+        return self.teacher_ids[session // SESSIONS_PER_TEACHER % self.teachers]
+
+    def session_students(self, session: int) -> range:
+        return range(session, self.students, self.sessions)
+
+    # ==================== Rows ====================
+
+    def program_rows(self) -> Iterator[Sequence[Any]]:
+        for p, program_id in enumerate(self.program_ids):
+            # Three study days a week
+            days = sum(1 << d for d in self.rng.sample(range(7), 3))
+            yield program_id, f"Load test program {p}", days
+
+    def phase_rows(self) -> Iterator[Sequence[Any]]:
+        # One phase per book, so phase_book rows reuse the book index
+        for p, program_id in enumerate(self.program_ids):
+            for position, book_id in enumerate(self.program_books(p)):
+                yield self.phase_id(book_id), order_key(position), program_id
+
+    def phase_id(self, book_id: uuid.UUID) -> uuid.UUID:
+        return uuid.uuid5(book_id, "phase")
+
+    def phase_book_rows(self) -> Iterator[Sequence[Any]]:
+        for book_id in self.book_ids:
+            yield self.phase_id(book_id), book_id, order_key(0)
+
+    def book_rows(self) -> Iterator[Sequence[Any]]:
+        for b, book_id in enumerate(self.book_ids):
+            yield book_id, f"Load test book {b}", f"books/{b}.pdf", f"books/{b}.mp3"
+
+    def lesson_rows(self) -> Iterator[Sequence[Any]]:
+        for b, book_id in enumerate(self.book_ids):
+            for position, lesson_id in enumerate(self.lesson_ids[b]):
+                yield (
+                    lesson_id,
+                    f"books/{b}/lessons/{position}.pdf",
+                    f"books/{b}/lessons/{position}.mp3",
+                    f"lessons/{lesson_id}.mp3",
+                    self.text(60),
+                    order_key(position),
+                    book_id,
+                )
+
+    def question_rows(self) -> Iterator[Sequence[Any]]:
+        for lesson_ids in self.lesson_ids:
+            for lesson_id in lesson_ids:
+                for _ in range(self.questions_per_lesson):
+                    options = [self.text(4) for _ in range(4)]
+                    correct = sorted(self.rng.sample(range(4), self.rng.randint(1, 2)))
+                    yield (
+                        self.new_id(),
+                        self.text(12) + "؟",
+                        json.dumps(options, ensure_ascii=False),
+                        json.dumps(correct),
+                        self.text(20),
+                        lesson_id,
+                    )
+
+    def user_rows(self, hashed_password: str) -> Iterator[Sequence[Any]]:
+        for role, ids in (("student", self.student_ids), ("teacher", self.teacher_ids)):
+            for i, user_id in enumerate(ids):
+                is_male = self.rng.random() < 0.5
+                first_names = FIRST_NAMES if is_male else FEMALE_FIRST_NAMES
+                yield (
+                    user_id,
+                    self.new_id(),
+                    f"{role}{i}@{LOAD_TEST_EMAIL_DOMAIN}",
+                    self.rng.choice(first_names),
+                    self.rng.choice(FIRST_NAMES),
+                    self.rng.choice(FAMILY_NAMES),
+                    True,
+                    False,
+                    role == "teacher",
+                    False,
+                    is_male,
+                    hashed_password,
+                    self.today - timedelta(days=self.rng.randrange(730)),
+                )
+
+    def session_rows(self) -> Iterator[Sequence[Any]]:
+        for s, session_id in enumerate(self.session_ids):
+            start_date = self.today - timedelta(days=self.rng.randrange(365))
+            yield session_id, start_date, self.program_ids[s % self.programs]
+
+    def session_student_rows(self) -> Iterator[Sequence[Any]]:
+        for i, student_id in enumerate(self.student_ids):
+            yield student_id, self.session_ids[i % self.sessions]
+
+    def session_teacher_rows(self) -> Iterator[Sequence[Any]]:
+        for s, session_id in enumerate(self.session_ids):
+            yield self.session_teacher(s), session_id
+
+    def session_event_rows(self) -> Iterator[Sequence[Any]]:
+        start = self.today - timedelta(days=self.events_per_session)
+        for s, session_id in enumerate(self.session_ids):
+            program = s % self.programs
+            books = range(
+                program * BOOKS_PER_PROGRAM, (program + 1) * BOOKS_PER_PROGRAM
+            )
+            lesson_ids = [lesson_id for b in books for lesson_id in self.lesson_ids[b]]
+            for e in range(self.events_per_session):
+                is_break = e % BREAK_EVERY == BREAK_EVERY - 1
+                lesson_id = None if is_break else lesson_ids[e % len(lesson_ids)]
+                event_date = start + timedelta(days=e)
+                yield self.new_id(), event_date, 1, session_id, is_break, lesson_id
+
+    def exam_rows(self) -> Iterator[Sequence[Any]]:
+        # Open exams, so the load test can record new attempts
+        for s, session_id in enumerate(self.session_ids):
+            books = self.program_books(s % self.programs)
+            for exam_id, book_id in zip(self.exam_ids[s], books, strict=True):
+                yield (
+                    exam_id,
+                    self.today - timedelta(days=30),
+                    self.today + timedelta(days=30),
+                    EXAM_MAX_ATTEMPTS,
+                    book_id,
+                    session_id,
+                )
+
+    def exam_attempt_rows(self) -> Iterator[Sequence[Any]]:
+        # One attempt per (exam, student) pair, session by session
+        remaining = self.exam_attempts
+        for s in range(self.sessions):
+            examiner_id = self.session_teacher(s)
+            for exam_id in self.exam_ids[s]:
+                for i in self.session_students(s):
+                    if remaining == 0:
+                        return
+                    remaining -= 1
+                    yield (
+                        self.new_id(),
+                        self.text(8),
+                        self.rng.random() < 0.7,
+                        self.today - timedelta(days=self.rng.randrange(30)),
+                        exam_id,
+                        self.student_ids[i],
+                        examiner_id,
+                    )
+
+
+def copy_rows(
+    cursor: Any, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> int:
+    start = time.perf_counter()
+    count = 0
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    with cursor.copy(f'COPY "{table}" ({quoted}) FROM STDIN') as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    logger.info(f"{table:<22} {count:>10} rows in {time.perf_counter() - start:.1f}s")
+    return count
+
+
+def reset(cursor: Any) -> None:
+    logger.info("Removing existing programs, books, sessions and load test users")
+    cursor.execute("TRUNCATE program, book, session CASCADE")
+    cursor.execute(
+        'DELETE FROM "user" WHERE email LIKE %s', (f"%@{LOAD_TEST_EMAIL_DOMAIN}",)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true")
+    args = parser.parse_args()
+
+    gen = Generator(scale=args.scale, seed=args.seed)
+    # Hash once: bcrypt per user would take hours at this volume
+    hashed_password = get_password_hash(LOAD_TEST_PASSWORD)
+
+    start = time.perf_counter()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if args.reset:
+            reset(cursor)
+        copy_rows(
+            cursor, "program", ("id", "title", "days_of_study"), gen.program_rows()
+        )
+        copy_rows(cursor, "book", ("id", "title", "pdf", "audio"), gen.book_rows())
+        copy_rows(cursor, "phase", ("id", "order", "program_id"), gen.phase_rows())
+        copy_rows(
+            cursor,
+            "phase_book",
+            ("phase_id", "book_id", "order"),
+            gen.phase_book_rows(),
+        )
+        copy_rows(
+            cursor,
+            "lesson",
+            (
+                "id",
+                "book_part_pdf",
+                "book_part_audio",
+                "lesson_audio",
+                "explanation_notes",
+                "order",
+                "book_id",
+            ),
+            gen.lesson_rows(),
+        )
+        copy_rows(
+            cursor,
+            "question",
+            (
+                "id",
+                "question",
+                "options",
+                "correct_options",
+                "explanation",
+                "lesson_id",
+            ),
+            gen.question_rows(),
+        )
+        copy_rows(
+            cursor,
+            "user",
+            (
+                "id",
+                "reg_num",
+                "email",
+                "first_name",
+                "father_name",
+                "family_name",
+                "is_active",
+                "is_admin",
+                "is_teacher",
+                "is_superuser",
+                "is_male",
+                "hashed_password",
+                "reg_date",
+            ),
+            gen.user_rows(hashed_password),
+        )
+        copy_rows(
+            cursor, "session", ("id", "start_date", "program_id"), gen.session_rows()
+        )
+        copy_rows(
+            cursor,
+            "user_session_student",
+            ("user_id", "session_id"),
+            gen.session_student_rows(),
+        )
+        copy_rows(
+            cursor,
+            "user_session_teacher",
+            ("user_id", "session_id"),
+            gen.session_teacher_rows(),
+        )
+        copy_rows(
+            cursor,
+            "session_event",
+            ("id", "event_date", "num_days", "session_id", "is_break", "lesson_id"),
+            gen.session_event_rows(),
+        )
+        copy_rows(
+            cursor,
+            "exam",
+            ("id", "start_date", "deadline", "max_attempts", "book_id", "session_id"),
+            gen.exam_rows(),
+        )
+        copy_rows(
+            cursor,
+            "exam_attempt",
+            (
+                "id",
+                "observation",
+                "passed",
+                "attempt_date",
+                "exam_id",
+                "student_id",
+                "examiner_id",
+            ),
+            gen.exam_attempt_rows(),
+        )
+        connection.commit()
+        # Fresh planner statistics, as after a long-running production database
+        cursor.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+    logger.info(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+Replay a mix of student and teacher traffic against a running backend.
+
+Virtual users log in as the students and teachers created by
+scripts/generate_load_data.py and pick weighted actions (see STUDENT_ACTIONS and
+TEACHER_ACTIONS) until --duration is over. Prints throughput, error count and
+latency percentiles per route.
+
+The IDs each user works with (their session, books, lessons, exams) are read
+directly from the database, so run this next to the docker-compose stack.
+
+Usage (from ./backend/, e.g. inside the backend container):
+
+    python scripts/load_test.py [--base-url http://localhost:8000] \\
+        [--users 50] [--teacher-ratio 0.1] [--duration 60] [--think-time 0]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from generate_load_data import LOAD_TEST_EMAIL_DOMAIN, LOAD_TEST_PASSWORD
+from sqlmodel import Session, col, func, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import (
+    Exam,
+    Lesson,
+    Phase,
+    PhaseBook,
+    ProgramSession,
+    User,
+    UserSessionStudent,
+    UserSessionTeacher,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+API = settings.API_V1_STR
+# Lessons sampled per session, to spread reads over the lesson and question tables
+LESSONS_PER_SESSION = 50
+
+
+@dataclass
+class VirtualUser:
+    user_id: uuid.UUID
+    email: str
+    session_id: uuid.UUID
+    book_ids: list[uuid.UUID]
+    lesson_ids: list[uuid.UUID]
+    exam_ids: list[uuid.UUID]
+    # Teachers only: students of session_id they record exam attempts for
+    student_ids: list[uuid.UUID] = field(default_factory=list)
+
+
+@dataclass
+class Results:
+    # Latencies in seconds and error count, per route template
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, route: str, latency: float, ok: bool) -> None:
+        self.latencies[route].append(latency)
+        if not ok:
+            self.errors[route] += 1
+
+
+async def request(
+    client: httpx.AsyncClient,
+    results: Results,
+    route: str,
+    method: str,
+    url: str,
+    **kwargs: Any,
+) -> httpx.Response | None:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        results.record(route, time.perf_counter() - start, ok=False)
+        logger.debug(f"{route}: {e!r}")
+        return None
+    results.record(route, time.perf_counter() - start, ok=response.is_success)
+    return response
+
+
+# ==================== Scenarios ====================
+
+Action = Callable[
+    [httpx.AsyncClient, Results, VirtualUser, random.Random], Awaitable[object]
+]
+
+
+async def read_me(
+    client: httpx.AsyncClient, results: Results, _user: VirtualUser, _rng: random.Random
+) -> None:
+    await request(client, results, "GET /users/me", "GET", f"{API}/users/me")
+
+
+async def read_session_lessons(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, _rng: random.Random
+) -> None:
+    await request(
+        client,
+        results,
+        "GET /sessions/{session_id}/lessons",
+        "GET",
+        f"{API}/sessions/{user.session_id}/lessons",
+    )
+
+
+async def read_session_events(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, rng: random.Random
+) -> None:
+    await request(
+        client,
+        results,
+        "GET /sessions/{session_id}/events",
+        "GET",
+        f"{API}/sessions/{user.session_id}/events",
+        params={"skip": rng.randrange(0, 400, 100), "limit": 100},
+    )
+
+
+async def read_book_lessons(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, rng: random.Random
+) -> None:
+    await request(
+        client,
+        results,
+        "GET /lessons/book/{book_id}",
+        "GET",
+        f"{API}/lessons/book/{rng.choice(user.book_ids)}",
+    )
+
+
+async def read_lesson_questions(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, rng: random.Random
+) -> None:
+    await request(
+        client,
+        results,
+        "GET /questions/lesson/{lesson_id}",
+        "GET",
+        f"{API}/questions/lesson/{rng.choice(user.lesson_ids)}",
+    )
+
+
+async def read_session_exams(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, _rng: random.Random
+) -> None:
+    await request(
+        client,
+        results,
+        "GET /exams/session/{session_id}",
+        "GET",
+        f"{API}/exams/session/{user.session_id}",
+    )
+
+
+async def read_my_exam_attempts(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, rng: random.Random
+) -> None:
+    await request(
+        client,
+        results,
+        "GET /exams/{exam_id}/attempts",
+        "GET",
+        f"{API}/exams/{rng.choice(user.exam_ids)}/attempts",
+    )
+
+
+async def read_exam(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, rng: random.Random
+) -> None:
+    await request(
+        client,
+        results,
+        "GET /exams/{exam_id}",
+        "GET",
+        f"{API}/exams/{rng.choice(user.exam_ids)}",
+    )
+
+
+async def create_exam_attempt(
+    client: httpx.AsyncClient, results: Results, user: VirtualUser, rng: random.Random
+) -> None:
+    if not user.student_ids:
+        return
+    exam_id = rng.choice(user.exam_ids)
+    await request(
+        client,
+        results,
+        "POST /exams/{exam_id}/attempts",
+        "POST",
+        f"{API}/exams/{exam_id}/attempts",
+        json={
+            "observation": "Load test attempt",
+            "passed": rng.random() < 0.7,
+            "exam_id": str(exam_id),
+            "student_id": str(rng.choice(user.student_ids)),
+            "examiner_id": str(user.user_id),
+        },
+    )
+
+
+# (action, weight): students mostly browse their lessons and questions
+STUDENT_ACTIONS: Sequence[tuple[Action, int]] = (
+    (read_me, 5),
+    (read_session_lessons, 15),
+    (read_session_events, 10),
+    (read_book_lessons, 15),
+    (read_lesson_questions, 35),
+    (read_session_exams, 10),
+    (read_my_exam_attempts, 10),
+)
+# Teachers follow their sessions and record exam attempts
+TEACHER_ACTIONS: Sequence[tuple[Action, int]] = (
+    (read_me, 5),
+    (read_session_events, 30),
+    (read_session_exams, 25),
+    (read_exam, 20),
+    (create_exam_attempt, 20),
+)
+
+
+# ==================== Setup ====================
+
+
+def load_users(
+    *, session: Session, role: str, count: int, rng: random.Random
+) -> list[VirtualUser]:
+    """Pick `count` generated users of `role` with the IDs their scenario needs"""
+    link = UserSessionTeacher if role == "teacher" else UserSessionStudent
+    rows = session.exec(
+        select(User.id, User.email, link.session_id)
+        .join(link, col(link.user_id) == User.id)
+        .where(col(User.email).like(f"{role}%@{LOAD_TEST_EMAIL_DOMAIN}"))
+        .order_by(func.random())
+        .limit(count)
+    ).all()
+    users = []
+    for user_id, email, session_id in rows:
+        book_ids = list(
+            session.exec(
+                select(PhaseBook.book_id)
+                .join(Phase, col(Phase.id) == PhaseBook.phase_id)
+                .join(
+                    ProgramSession, col(ProgramSession.program_id) == Phase.program_id
+                )
+                .where(ProgramSession.id == session_id)
+            ).all()
+        )
+        lesson_ids = list(
+            session.exec(
+                select(Lesson.id)
+                .where(col(Lesson.book_id).in_(book_ids))
+                .order_by(func.random())
+                .limit(LESSONS_PER_SESSION)
+            ).all()
+        )
+        exam_ids = list(
+            session.exec(select(Exam.id).where(Exam.session_id == session_id)).all()
+        )
+        student_ids = []
+        if role == "teacher":
+            student_ids = list(
+                session.exec(
+                    select(UserSessionStudent.user_id).where(
+                        UserSessionStudent.session_id == session_id
+                    )
+                ).all()
+            )
+        users.append(
+            VirtualUser(
+                user_id=user_id,
+                email=email,
+                session_id=session_id,
+                book_ids=book_ids,
+                lesson_ids=lesson_ids,
+                exam_ids=exam_ids,
+                student_ids=student_ids,
+            )
+        )
+    rng.shuffle(users)
+    return users
+
+
+async def run_user(
+    *,
+    client: httpx.AsyncClient,
+    results: Results,
+    user: VirtualUser,
+    actions: Sequence[tuple[Action, int]],
+    deadline: float,
+    think_time: float,
+    rng: random.Random,
+) -> None:
+    response = await request(
+        client,
+        results,
+        "POST /login/access-token",
+        "POST",
+        f"{API}/login/access-token",
+        data={"username": user.email, "password": LOAD_TEST_PASSWORD},
+    )
+    if response is None or not response.is_success:
+        logger.warning(f"Login failed for {user.email}")
+        return
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    funcs = [action for action, _ in actions]
+    weights = [weight for _, weight in actions]
+    while time.perf_counter() < deadline:
+        action = rng.choices(funcs, weights)[0]
+        await action(client, results, user, rng)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+# ==================== Report ====================
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def report(results: Results, elapsed: float) -> None:
+    header = (
+        f"{'route':<36} {'requests':>9} {'errors':>7} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    logger.info(header)
+    logger.info("-" * len(header))
+    all_latencies: list[float] = []
+    for route in sorted(results.latencies):
+        latencies = sorted(results.latencies[route])
+        all_latencies.extend(latencies)
+        log_row(route, latencies, results.errors[route], elapsed)
+    logger.info("-" * len(header))
+    log_row("total", sorted(all_latencies), sum(results.errors.values()), elapsed)
+
+
+def log_row(route: str, latencies: list[float], errors: int, elapsed: float) -> None:
+    logger.info(
+        f"{route:<36} {len(latencies):>9} {errors:>7} {len(latencies) / elapsed:>8.1f} "
+        f"{percentile(latencies, 50) * 1000:>8.1f} "
+        f"{percentile(latencies, 90) * 1000:>8.1f} "
+        f"{percentile(latencies, 99) * 1000:>8.1f} "
+        f"{(latencies[-1] if latencies else 0) * 1000:>8.1f}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    teachers = round(args.users * args.teacher_ratio)
+    with Session(engine) as session:
+        students = load_users(
+            session=session, role="student", count=args.users - teachers, rng=rng
+        )
+        teacher_users = load_users(
+            session=session, role="teacher", count=teachers, rng=rng
+        )
+    if not students and not teacher_users:
+        raise SystemExit("No load test users, run scripts/generate_load_data.py first")
+    logger.info(
+        f"{len(students)} students, {len(teacher_users)} teachers, "
+        f"{args.duration}s against {args.base_url}"
+    )
+
+    results = Results()
+    # One client per user: its own connection and Authorization header
+    clients = [
+        httpx.AsyncClient(base_url=args.base_url, timeout=30)
+        for _ in range(len(students) + len(teacher_users))
+    ]
+    start = time.perf_counter()
+    deadline = start + args.duration
+    try:
+        async with asyncio.TaskGroup() as group:
+            for client, (user, actions) in zip(
+                clients,
+                [(user, STUDENT_ACTIONS) for user in students]
+                + [(user, TEACHER_ACTIONS) for user in teacher_users],
+                strict=True,
+            ):
+                group.create_task(
+                    run_user(
+                        client=client,
+                        results=results,
+                        user=user,
+                        actions=actions,
+                        deadline=deadline,
+                        think_time=args.think_time,
+                        rng=random.Random(rng.random()),
+                    )
+                )
+    finally:
+        for client in clients:
+            await client.aclose()
+    report(results, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--teacher-ratio", type=float, default=0.1)
+    parser.add_argument("--duration", type=float, default=60)
+    # Mean pause between a user's requests, in seconds (0: closed loop)
+    parser.add_argument("--think-time", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import uuid
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models import Question, QuestionCreate
+from tests.utils.lesson import create_random_lesson
+
+
+def create_lesson_questions(db: Session, count: int) -> list[Question]:
+    lesson = create_random_lesson(db)
+    return [
+        crud.create_question(
+            session=db,
+            question_in=QuestionCreate(
+                question=f"Question {i}",
+                options=["A", "B", "C", "D"],
+                correct_options=[i % 4] if i % 2 else [0, 2],
+                lesson_id=lesson.id,
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def test_submit_answers(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    single, multiple = create_lesson_questions(db, 2)[::-1]
+    data = {
+        "answers": [
+            # Correct, in any order
+            {"question_id": str(multiple.id), "selected_options": [2, 0]},
+            # Wrong
+            {"question_id": str(single.id), "selected_options": [0]},
+        ]
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["score"] == 1
+    assert content["total"] == 2
+    results = {result["question_id"]: result for result in content["results"]}
+    assert results[str(multiple.id)] == {
+        "question_id": str(multiple.id),
+        "selected_options": [0, 2],
+        "correct_options": [0, 2],
+        "is_correct": True,
+    }
+    assert results[str(single.id)]["is_correct"] is False
+    assert results[str(single.id)]["correct_options"] == [1]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/answers/{content['id']}",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    stored = response.json()
+    assert stored["score"] == 1
+    assert sorted(stored["results"], key=lambda r: r["question_id"]) == sorted(
+        content["results"], key=lambda r: r["question_id"]
+    )
+
+
+def test_submit_answers_partial_selection_is_wrong(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    (question,) = create_lesson_questions(db, 1)
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=normal_user_token_headers,
+        json={"answers": [{"question_id": str(question.id), "selected_options": [0]}]},
+    )
+    assert response.status_code == 200
+    assert response.json()["score"] == 0
+
+
+def test_submit_answers_batch_queries(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    db: Session,
+    query_budget: Callable[[int], AbstractContextManager[list[str]]],
+) -> None:
+    questions = create_lesson_questions(db, 100)
+    data = {
+        "answers": [
+            {"question_id": str(question.id), "selected_options": [1]}
+            for question in questions
+        ]
+    }
+    # User, answer keys, the submission and answers inserts, the stats upsert,
+    # and reading and upserting the review schedule
+    with query_budget(7):
+        response = client.post(
+            f"{settings.API_V1_STR}/answers/",
+            headers=normal_user_token_headers,
+            json=data,
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["total"] == 100
+    assert content["score"] == 25
+
+
+def test_submit_answers_question_not_found(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    question_id = uuid.uuid4()
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=normal_user_token_headers,
+        json={"answers": [{"question_id": str(question_id), "selected_options": [0]}]},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"Question {question_id} not found"
+
+
+def test_submit_answers_option_out_of_range(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    (question,) = create_lesson_questions(db, 1)
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=normal_user_token_headers,
+        json={"answers": [{"question_id": str(question.id), "selected_options": [4]}]},
+    )
+    assert response.status_code == 422
+
+
+def test_submit_answers_duplicate_question(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    (question,) = create_lesson_questions(db, 1)
+    answer = {"question_id": str(question.id), "selected_options": [0]}
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=normal_user_token_headers,
+        json={"answers": [answer, answer]},
+    )
+    assert response.status_code == 422
+
+
+def test_read_answer_submission_other_student(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    teacher_token_headers: dict[str, str],
+    db: Session,
+) -> None:
+    (question,) = create_lesson_questions(db, 1)
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=normal_user_token_headers,
+        json={"answers": [{"question_id": str(question.id), "selected_options": [0]}]},
+    )
+    submission_id = response.json()["id"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/answers/{submission_id}",
+        headers=teacher_token_headers,
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Submission not found"
@@ -3,7 +3,9 @@ import uuid
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app import crud
 from app.core.config import settings
+from app.models import LessonCreate, QuestionCreate
 from tests.utils.book import create_random_book
 
 
@@ -156,3 +158,62 @@ def test_update_book_not_found(
     )
     assert response.status_code == 404
     assert response.json()["detail"] == "Book not found"
+
+
+def test_read_book_quiz(client: TestClient, db: Session) -> None:
+    book = create_random_book(db)
+    question_ids = set()
+    for order in range(2):
+        lesson = crud.create_lesson(
+            session=db,
+            lesson_in=LessonCreate(
+                book_part_pdf="https://example.com/part.pdf",
+                book_part_audio="https://example.com/part.mp3",
+                lesson_audio="https://example.com/lesson.mp3",
+                explanation_notes="notes",
+                book_id=book.id,
+                order=order,
+            ),
+        )
+        for i in range(5):
+            question = crud.create_question(
+                session=db,
+                question_in=QuestionCreate(
+                    question=f"Question {i}",
+                    options=["Yes", "No"],
+                    correct_options=[0],
+                    lesson_id=lesson.id,
+                ),
+            )
+            question_ids.add(str(question.id))
+
+    response = client.get(
+        f"{settings.API_V1_STR}/books/{book.id}/quiz", params={"n": 4, "seed": 7}
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["seed"] == 7
+    assert content["count"] == 4
+    quiz_ids = [question["id"] for question in content["data"]]
+    assert len(set(quiz_ids)) == 4
+    assert set(quiz_ids) <= question_ids
+
+    # Same seed, same quiz
+    response = client.get(
+        f"{settings.API_V1_STR}/books/{book.id}/quiz", params={"n": 4, "seed": 7}
+    )
+    assert [question["id"] for question in response.json()["data"]] == quiz_ids
+
+    # Asking for more than there is returns every question once
+    response = client.get(
+        f"{settings.API_V1_STR}/books/{book.id}/quiz", params={"n": 100}
+    )
+    content = response.json()
+    assert content["count"] == 10
+    assert {question["id"] for question in content["data"]} == question_ids
+
+
+def test_read_book_quiz_not_found(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/books/{uuid.uuid4()}/quiz")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Book not found"
@@ -1,13 +1,16 @@
 import uuid
+from datetime import UTC, datetime, timedelta
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from app import crud
 from app.core.config import settings
-from app.models import LessonCreate
+from app.core.progress import HeartbeatBuffer, flush_heartbeats
+from app.models import LessonCreate, LessonProgress, LessonProgressHeartbeat
 from tests.utils.book import create_random_book
 from tests.utils.lesson import create_random_lesson
+from tests.utils.utils import random_lower_string
 
 
 def test_create_lesson(
@@ -108,6 +111,32 @@ def test_read_lessons_by_book(
     assert len(content["data"]) == 2
 
 
+def test_search_lessons(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    book = create_random_book(db)
+    marker = random_lower_string()
+    lesson_in = LessonCreate(
+        book_part_pdf="https://example.com/part.pdf",
+        book_part_audio="https://example.com/part.mp3",
+        lesson_audio="https://example.com/lesson.mp3",
+        explanation_notes=f"شرح أَرْكَانِ الإِيمانِ {marker}",
+        book_id=book.id,
+        order=0,
+    )
+    lesson = crud.create_lesson(session=db, lesson_in=lesson_in)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/lessons/search",
+        headers=normal_user_token_headers,
+        params={"q": f"{marker} الايمان"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert content["data"][0]["id"] == str(lesson.id)
+
+
 def test_update_lesson(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -247,3 +276,283 @@ def test_delete_lesson_not_found(
     )
     assert response.status_code == 404
     assert response.json()["detail"] == "Lesson not found"
+
+
+def test_heartbeat_buffer_coalesces() -> None:
+    buffer = HeartbeatBuffer()
+    student_id, lesson_id = uuid.uuid4(), uuid.uuid4()
+    start = datetime.now(UTC)
+    for seconds, position in enumerate([100, 185, 40]):
+        buffer.add(
+            student_id=student_id,
+            lesson_id=lesson_id,
+            heartbeat=LessonProgressHeartbeat(position_seconds=position),
+            received_at=start + timedelta(seconds=seconds),
+        )
+    # A late heartbeat doesn't move the position back
+    buffer.add(
+        student_id=student_id,
+        lesson_id=lesson_id,
+        heartbeat=LessonProgressHeartbeat(position_seconds=10),
+        received_at=start,
+    )
+    assert len(buffer) == 1
+
+    (progress,) = buffer.drain()
+    assert progress.position_seconds == 40
+    assert progress.max_position_seconds == 185
+    assert len(buffer) == 0
+
+    # Progress that couldn't be written goes back, under newer heartbeats
+    buffer.add(
+        student_id=student_id,
+        lesson_id=lesson_id,
+        heartbeat=LessonProgressHeartbeat(position_seconds=50),
+        received_at=start + timedelta(seconds=10),
+    )
+    buffer.restore([progress])
+    (progress,) = buffer.drain()
+    assert progress.position_seconds == 50
+    assert progress.max_position_seconds == 185
+
+
+def test_record_lesson_progress(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    for heartbeat in [
+        {"position_seconds": 100, "duration_seconds": 200},
+        {"position_seconds": 185},
+        # Seeking back keeps the furthest position for completion
+        {"position_seconds": 40},
+    ]:
+        response = client.post(
+            f"{settings.API_V1_STR}/lessons/{lesson.id}/progress",
+            headers=normal_user_token_headers,
+            json=heartbeat,
+        )
+        assert response.status_code == 202
+
+    flush_heartbeats()
+
+    statement = select(LessonProgress).where(LessonProgress.lesson_id == lesson.id)
+    progress = db.exec(statement).one()
+    assert progress.position_seconds == 40
+    assert progress.max_position_seconds == 185
+    assert progress.duration_seconds == 200
+    assert progress.completed is True
+
+
+def test_record_lesson_progress_merges_with_stored(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    url = f"{settings.API_V1_STR}/lessons/{lesson.id}/progress"
+    client.post(
+        url,
+        headers=normal_user_token_headers,
+        json={"position_seconds": 90, "duration_seconds": 600},
+    )
+    flush_heartbeats()
+    client.post(url, headers=normal_user_token_headers, json={"position_seconds": 30})
+    flush_heartbeats()
+
+    progress = db.exec(
+        select(LessonProgress).where(LessonProgress.lesson_id == lesson.id)
+    ).one()
+    assert progress.position_seconds == 30
+    assert progress.max_position_seconds == 90
+    assert progress.duration_seconds == 600
+    assert progress.completed is False
+
+
+def test_record_lesson_progress_completion_sticky(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    url = f"{settings.API_V1_STR}/lessons/{lesson.id}/progress"
+    client.post(
+        url,
+        headers=normal_user_token_headers,
+        json={"position_seconds": 95, "duration_seconds": 100},
+    )
+    flush_heartbeats()
+    # A longer duration reported later doesn't undo the completion
+    client.post(
+        url,
+        headers=normal_user_token_headers,
+        json={"position_seconds": 10, "duration_seconds": 1000},
+    )
+    flush_heartbeats()
+
+    progress = db.exec(
+        select(LessonProgress).where(LessonProgress.lesson_id == lesson.id)
+    ).one()
+    assert progress.duration_seconds == 1000
+    assert progress.completed is True
+
+
+def test_record_lesson_progress_lesson_not_found(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson_id = uuid.uuid4()
+    response = client.post(
+        f"{settings.API_V1_STR}/lessons/{lesson_id}/progress",
+        headers=normal_user_token_headers,
+        json={"position_seconds": 10},
+    )
+    # Not checked per heartbeat, dropped when flushed
+    assert response.status_code == 202
+    flush_heartbeats()
+    statement = select(LessonProgress).where(LessonProgress.lesson_id == lesson_id)
+    assert db.exec(statement).first() is None
+
+
+def test_reorder_lessons(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    book = create_random_book(db)
+    lessons = [
+        crud.create_lesson(
+            session=db,
+            lesson_in=LessonCreate(
+                book_part_pdf="https://example.com/part.pdf",
+                book_part_audio="https://example.com/part.mp3",
+                lesson_audio="https://example.com/lesson.mp3",
+                explanation_notes="Notes",
+                book_id=book.id,
+                order=i,
+            ),
+        )
+        for i in range(3)
+    ]
+    # Swaps the first two: orders taken by other lessons in the meantime
+    lesson_ids = [str(lessons[i].id) for i in (1, 0, 2)]
+
+    response = client.put(
+        f"{settings.API_V1_STR}/lessons/book/{book.id}/order",
+        headers=superuser_token_headers,
+        json={"ids": lesson_ids},
+    )
+    assert response.status_code == 200
+    assert response.json()["message"] == "Lessons reordered successfully"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/lessons/book/{book.id}",
+        headers=superuser_token_headers,
+    )
+    assert [lesson["id"] for lesson in response.json()["data"]] == lesson_ids
+
+
+def test_reorder_lessons_book_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.put(
+        f"{settings.API_V1_STR}/lessons/book/{uuid.uuid4()}/order",
+        headers=superuser_token_headers,
+        json={"ids": [str(uuid.uuid4())]},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Book not found"
+
+
+def test_reorder_lessons_repeated_ids(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    response = client.put(
+        f"{settings.API_V1_STR}/lessons/book/{lesson.book_id}/order",
+        headers=superuser_token_headers,
+        json={"ids": [str(lesson.id), str(lesson.id)]},
+    )
+    assert response.status_code == 422
+
+
+def test_move_lesson(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    book = create_random_book(db)
+    lessons = [
+        crud.create_lesson(
+            session=db,
+            lesson_in=LessonCreate(
+                book_part_pdf="https://example.com/part.pdf",
+                book_part_audio="https://example.com/part.mp3",
+                lesson_audio="https://example.com/lesson.mp3",
+                explanation_notes="Notes",
+                book_id=book.id,
+                order=order,
+            ),
+        )
+        for order in (0, 1, 2)
+    ]
+
+    response = client.put(
+        f"{settings.API_V1_STR}/lessons/{lessons[2].id}/position",
+        headers=superuser_token_headers,
+        json={"position": 0},
+    )
+    assert response.status_code == 200
+    assert response.json()["message"] == "Lesson moved successfully"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/lessons/book/{book.id}",
+        headers=superuser_token_headers,
+        params={"skip": 1},
+    )
+    content = response.json()
+    assert [lesson["id"] for lesson in content["data"]] == [
+        str(lessons[0].id),
+        str(lessons[1].id),
+    ]
+    assert [lesson["position"] for lesson in content["data"]] == [1, 2]
+
+
+def test_create_lesson_at_position(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    book = create_random_book(db)
+    data = {
+        "book_part_pdf": "https://example.com/part.pdf",
+        "book_part_audio": "https://example.com/part.mp3",
+        "lesson_audio": "https://example.com/lesson.mp3",
+        "explanation_notes": "Notes",
+        "book_id": str(book.id),
+    }
+    url = f"{settings.API_V1_STR}/lessons/"
+    ids = []
+    for position in (None, None, 1):
+        response = client.post(
+            url, headers=superuser_token_headers, json={**data, "position": position}
+        )
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+
+    response = client.get(
+        f"{settings.API_V1_STR}/lessons/book/{book.id}",
+        headers=superuser_token_headers,
+    )
+    assert [lesson["id"] for lesson in response.json()["data"]] == [
+        ids[0],
+        ids[2],
+        ids[1],
+    ]
+
+    response = client.post(
+        url,
+        headers=superuser_token_headers,
+        json={**data, "order": 5, "position": 0},
+    )
+    assert response.status_code == 422
+
+
+def test_move_lesson_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.put(
+        f"{settings.API_V1_STR}/lessons/{uuid.uuid4()}/position",
+        headers=superuser_token_headers,
+        json={"position": 0},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Lesson not found"
@@ -0,0 +1,535 @@
+import hashlib
+import io
+import uuid
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from pypdf import PdfReader, PdfWriter
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models import BookCreate, LessonCreate, PhaseCreate
+from tests.utils.lesson import create_random_lesson
+from tests.utils.session import create_random_session
+from tests.utils.user import authentication_token_from_email
+from tests.utils.utils import random_email, random_lower_string
+
+AUDIO = bytes(range(256)) * 64
+
+
+def create_media(root: Path) -> str:
+    name = f"{random_lower_string()}.mp3"
+    (root / name).write_bytes(AUDIO)
+    return name
+
+
+def test_read_book_media_range(client: TestClient, db: Session, tmp_path: Path) -> None:
+    book = crud.create_book(
+        session=db,
+        book_in=BookCreate(title="Book", audio=create_media(tmp_path)),
+    )
+    url = f"{settings.API_V1_STR}/media/books/{book.id}/audio"
+    with patch("app.core.config.settings.MEDIA_ROOT", tmp_path):
+        response = client.get(url, headers={"Range": "bytes=1000-1999"})
+        assert response.status_code == 206
+        assert response.content == AUDIO[1000:2000]
+        assert response.headers["content-range"] == f"bytes 1000-1999/{len(AUDIO)}"
+        assert response.headers["content-type"] == "audio/mpeg"
+        etag = response.headers["etag"]
+        assert not etag.startswith("W/")
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = client.head(url)
+        assert response.status_code == 200
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-length"] == str(len(AUDIO))
+
+        with patch(
+            "app.core.config.settings.MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/"
+        ):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == f"/protected-media/{book.audio}"
+        assert response.content == b""
+
+        # No PDF for this book
+        response = client.get(f"{settings.API_V1_STR}/media/books/{book.id}/pdf")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Media not found"
+
+
+def test_read_book_media_remote(client: TestClient, db: Session) -> None:
+    book = crud.create_book(
+        session=db,
+        book_in=BookCreate(title="Book", pdf="https://example.com/book.pdf"),
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/media/books/{book.id}/pdf", follow_redirects=False
+    )
+    assert response.status_code == 307
+    assert response.headers["location"] == book.pdf
+
+
+def test_read_book_media_outside_root(
+    client: TestClient, db: Session, tmp_path: Path
+) -> None:
+    media_root = tmp_path / "media"
+    media_root.mkdir()
+    book = crud.create_book(
+        session=db,
+        book_in=BookCreate(title="Book", pdf=f"../{create_media(tmp_path)}"),
+    )
+    with patch("app.core.config.settings.MEDIA_ROOT", media_root):
+        response = client.get(f"{settings.API_V1_STR}/media/books/{book.id}/pdf")
+    assert response.status_code == 404
+
+
+def test_read_book_media_versioned(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    tmp_path: Path,
+) -> None:
+    book = crud.create_book(
+        session=db,
+        book_in=BookCreate(title="Book", pdf=create_media(tmp_path)),
+    )
+    lesson = crud.create_lesson(
+        session=db,
+        lesson_in=LessonCreate(
+            book_pages_start=1,
+            book_pages_end=2,
+            book_part_audio="part.mp3",
+            lesson_audio="lesson.mp3",
+            explanation_notes="notes",
+            order=0,
+            book_id=book.id,
+        ),
+    )
+    uploads_url = f"{settings.API_V1_STR}/media/uploads"
+    with patch("app.core.config.settings.MEDIA_ROOT", tmp_path):
+        # Files that weren't uploaded have no known version
+        response = client.get(f"{settings.API_V1_STR}/books/{book.id}")
+        pdf_url = response.json()["pdf_url"]
+        assert pdf_url == f"{settings.API_V1_STR}/media/books/{book.id}/pdf"
+        assert response.json()["audio_url"] is None
+        response = client.get(f"{pdf_url}?v=0123456789abcdef", follow_redirects=False)
+        assert response.status_code == 307
+        assert response.headers["location"].endswith(pdf_url)
+        response = client.get(pdf_url)
+        assert response.headers["cache-control"] == "public, no-cache"
+
+        for content in (AUDIO, AUDIO[:1000]):
+            upload_id = start_upload(
+                client, superuser_token_headers, book.id, len(content)
+            )
+            response = client.put(
+                f"{uploads_url}/{upload_id}?offset=0",
+                headers=superuser_token_headers,
+                content=content,
+            )
+            assert response.status_code == 200
+        digest = hashlib.sha256(AUDIO[:1000]).hexdigest()
+        response = client.get(f"{settings.API_V1_STR}/books/{book.id}")
+        assert response.json()["audio_sha256"] == digest
+        assert response.json()["audio_size"] == 1000
+        url = response.json()["audio_url"]
+        assert url == (
+            f"{settings.API_V1_STR}/media/books/{book.id}/audio?v={digest[:16]}"
+        )
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.content == AUDIO[:1000]
+        assert response.headers["cache-control"] == (
+            "public, max-age=31536000, immutable"
+        )
+
+        # Old URLs lead to the new one
+        old_digest = hashlib.sha256(AUDIO).hexdigest()
+        response = client.get(
+            f"{settings.API_V1_STR}/media/books/{book.id}/audio?v={old_digest[:16]}",
+            follow_redirects=False,
+        )
+        assert response.status_code == 307
+        assert response.headers["location"].endswith(url)
+
+        # The lesson pages are versioned by the book PDF once uploaded
+        response = client.get(f"{settings.API_V1_STR}/lessons/{lesson.id}")
+        assert response.json()["book_part_pdf_url"] == (
+            f"{settings.API_V1_STR}/media/lessons/{lesson.id}/book_part_pdf"
+        )
+        upload_id = start_upload(
+            client, superuser_token_headers, book.id, len(AUDIO), field="pdf"
+        )
+        client.put(
+            f"{uploads_url}/{upload_id}?offset=0",
+            headers=superuser_token_headers,
+            content=AUDIO,
+        )
+        response = client.get(f"{settings.API_V1_STR}/lessons/{lesson.id}")
+        pages_url = response.json()["book_part_pdf_url"]
+        assert pages_url.startswith(
+            f"{settings.API_V1_STR}/media/lessons/{lesson.id}/book_part_pdf?v="
+        )
+
+        # Set otherwise, the files are no longer known
+        response = client.patch(
+            f"{settings.API_V1_STR}/books/{book.id}",
+            headers=superuser_token_headers,
+            json={"pdf": "https://example.com/book.pdf"},
+        )
+        assert response.json()["pdf_sha256"] is None
+        assert response.json()["audio_sha256"] == digest
+        response = client.get(f"{settings.API_V1_STR}/lessons/{lesson.id}")
+        assert response.json()["book_part_pdf_url"] == pages_url.split("?")[0]
+
+
+def test_read_book_manifest(client: TestClient, db: Session, tmp_path: Path) -> None:
+    book = crud.create_book(
+        session=db,
+        book_in=BookCreate(
+            title="Book",
+            pdf="https://example.com/book.pdf",
+            audio=create_media(tmp_path),
+        ),
+    )
+    lesson = crud.create_lesson(
+        session=db,
+        lesson_in=LessonCreate(
+            book_part_pdf=create_media(tmp_path),
+            book_part_audio="missing.mp3",
+            lesson_audio=create_media(tmp_path),
+            explanation_notes="Notes",
+            order=0,
+            book_id=book.id,
+        ),
+    )
+    # As stored by an upload
+    digest = hashlib.sha256(AUDIO).hexdigest()
+    lesson.book_part_pdf_sha256 = digest
+    lesson.book_part_pdf_size = len(AUDIO)
+    db.add(lesson)
+    db.commit()
+
+    # Built from the database alone, without reading the files
+    response = client.get(f"{settings.API_V1_STR}/media/books/{book.id}/manifest")
+    assert response.status_code == 200
+    content = response.json()
+    assets = {
+        (asset["target_id"], asset["field"]): asset for asset in content["assets"]
+    }
+    # The lesson audio is left out for guests
+    assert content["count"] == len(assets) == 4
+    assert assets[(str(book.id), "pdf")]["url"] == book.pdf
+    assert assets[(str(book.id), "pdf")]["sha256"] is None
+    book_audio = assets[(str(book.id), "audio")]
+    assert book_audio["url"] == f"{settings.API_V1_STR}/media/books/{book.id}/audio"
+    assert book_audio["size"] is None
+    assert book_audio["sha256"] is None
+    lesson_asset = assets[(str(lesson.id), "book_part_pdf")]
+    assert lesson_asset["sha256"] == digest
+    assert lesson_asset["size"] == len(AUDIO)
+    assert lesson_asset["url"] == (
+        f"{settings.API_V1_STR}/media/lessons/{lesson.id}/book_part_pdf?v={digest[:16]}"
+    )
+    assert (str(lesson.id), "book_part_audio") in assets
+
+
+def test_read_lesson_audio_enrolled_only(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    db: Session,
+    tmp_path: Path,
+) -> None:
+    session_obj = create_random_session(db)
+    book = crud.create_book(session=db, book_in=BookCreate(title="Book"))
+    lesson = crud.create_lesson(
+        session=db,
+        lesson_in=LessonCreate(
+            book_part_pdf="part.pdf",
+            book_part_audio=create_media(tmp_path),
+            lesson_audio=create_media(tmp_path),
+            explanation_notes="notes",
+            book_id=book.id,
+            order=0,
+        ),
+    )
+    phase = crud.create_phase(
+        session=db, phase_in=PhaseCreate(order=0, program_id=session_obj.program_id)
+    )
+    crud.add_book_to_phase(session=db, phase_id=phase.id, book_id=book.id, order=0)
+    email = random_email()
+    student_headers = authentication_token_from_email(client=client, email=email, db=db)
+    student = crud.get_user_by_email(session=db, email=email)
+    assert student
+    crud.add_student_to_session(
+        session=db, session_id=session_obj.id, user_id=student.id
+    )
+
+    url = f"{settings.API_V1_STR}/media/lessons/{lesson.id}"
+    with patch("app.core.config.settings.MEDIA_ROOT", tmp_path):
+        # The book part is public
+        response = client.get(f"{url}/book_part_audio")
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public")
+
+        response = client.get(f"{url}/lesson_audio")
+        assert response.status_code == 401
+
+        response = client.get(f"{url}/lesson_audio", headers=normal_user_token_headers)
+        assert response.status_code == 403
+
+        response = client.get(
+            f"{url}/lesson_audio",
+            headers={**student_headers, "Range": "bytes=-100"},
+        )
+        assert response.status_code == 206
+        assert response.content == AUDIO[-100:]
+        assert response.headers["cache-control"].startswith("private")
+
+
+def start_upload(
+    client: TestClient,
+    headers: dict[str, str],
+    target_id: uuid.UUID,
+    size: int,
+    *,
+    target: str = "book",
+    field: str = "audio",
+) -> str:
+    response = client.post(
+        f"{settings.API_V1_STR}/media/uploads",
+        headers=headers,
+        json={
+            "target": target,
+            "target_id": str(target_id),
+            "field": field,
+            "filename": "Lecture.MP3",
+            "size": size,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["received"] == 0
+    return str(response.json()["id"])
+
+
+def test_resumable_upload(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    tmp_path: Path,
+) -> None:
+    book = crud.create_book(session=db, book_in=BookCreate(title="Book"))
+    url = f"{settings.API_V1_STR}/media/uploads"
+    with patch("app.core.config.settings.MEDIA_ROOT", tmp_path):
+        upload_id = start_upload(client, superuser_token_headers, book.id, len(AUDIO))
+        response = client.put(
+            f"{url}/{upload_id}?offset=0",
+            headers=superuser_token_headers,
+            content=AUDIO[:5000],
+        )
+        assert response.status_code == 200
+        assert response.json()["received"] == 5000
+        assert response.json()["reference"] is None
+
+        # Resuming from the wrong offset
+        response = client.put(
+            f"{url}/{upload_id}?offset=0",
+            headers=superuser_token_headers,
+            content=AUDIO[:5000],
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Upload is at offset 5000"
+
+        response = client.get(f"{url}/{upload_id}", headers=superuser_token_headers)
+        assert response.json()["received"] == 5000
+
+        response = client.put(
+            f"{url}/{upload_id}?offset=5000",
+            headers=superuser_token_headers,
+            content=AUDIO[5000:],
+        )
+        assert response.status_code == 200
+        content = response.json()
+        digest = hashlib.sha256(AUDIO).hexdigest()
+        assert content["received"] == len(AUDIO)
+        assert content["reference"] == f"sha256/{digest[:2]}/{digest}.mp3"
+        assert (tmp_path / content["reference"]).read_bytes() == AUDIO
+        db.refresh(book)
+        assert book.audio == content["reference"]
+
+        response = client.get(f"{url}/{upload_id}", headers=superuser_token_headers)
+        assert response.status_code == 404
+
+        # The same file for a lesson is stored once
+        lesson = create_random_lesson(db)
+        upload_id = start_upload(
+            client,
+            superuser_token_headers,
+            lesson.id,
+            len(AUDIO),
+            target="lesson",
+            field="lesson_audio",
+        )
+        response = client.put(
+            f"{url}/{upload_id}?offset=0",
+            headers=superuser_token_headers,
+            content=AUDIO,
+        )
+        assert response.json()["reference"] == book.audio
+        assert len(list((tmp_path / "sha256").rglob("*.mp3"))) == 1
+
+
+def test_upload_exceeding_size(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    tmp_path: Path,
+) -> None:
+    book = crud.create_book(session=db, book_in=BookCreate(title="Book"))
+    with patch("app.core.config.settings.MEDIA_ROOT", tmp_path):
+        upload_id = start_upload(client, superuser_token_headers, book.id, 100)
+        response = client.put(
+            f"{settings.API_V1_STR}/media/uploads/{upload_id}?offset=0",
+            headers=superuser_token_headers,
+            content=AUDIO,
+        )
+        assert response.status_code == 413
+
+        response = client.delete(
+            f"{settings.API_V1_STR}/media/uploads/{upload_id}",
+            headers=superuser_token_headers,
+        )
+        assert response.status_code == 200
+        assert not list((tmp_path / "uploads").iterdir())
+
+
+def test_upload_invalid_field(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    book = crud.create_book(session=db, book_in=BookCreate(title="Book"))
+    response = client.post(
+        f"{settings.API_V1_STR}/media/uploads",
+        headers=superuser_token_headers,
+        json={
+            "target": "book",
+            "target_id": str(book.id),
+            "field": "lesson_audio",
+            "filename": "lecture.mp3",
+            "size": 100,
+        },
+    )
+    assert response.status_code == 422
+
+
+def test_upload_not_admin(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/media/uploads",
+        headers=normal_user_token_headers,
+        json={
+            "target": "book",
+            "target_id": str(uuid.uuid4()),
+            "field": "pdf",
+            "filename": "book.pdf",
+            "size": 100,
+        },
+    )
+    assert response.status_code == 403
+
+
+def test_read_lesson_book_pages(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    tmp_path: Path,
+) -> None:
+    writer = PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=200, height=200)
+    with (tmp_path / "book.pdf").open("wb") as file:
+        writer.write(file)
+    book = crud.create_book(
+        session=db, book_in=BookCreate(title="Book", pdf="book.pdf")
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/lessons/",
+        headers=superuser_token_headers,
+        json={
+            "book_pages_start": 2,
+            "book_pages_end": 4,
+            "book_part_audio": "part.mp3",
+            "lesson_audio": "lesson.mp3",
+            "explanation_notes": "notes",
+            "book_id": str(book.id),
+            "order": 0,
+        },
+    )
+    assert response.status_code == 200
+    lesson_id = response.json()["id"]
+    assert response.json()["book_part_pdf"] is None
+
+    url = f"{settings.API_V1_STR}/media/lessons/{lesson_id}/book_part_pdf"
+    with patch("app.core.config.settings.MEDIA_ROOT", tmp_path):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert len(PdfReader(io.BytesIO(response.content)).pages) == 3
+
+        # Cached
+        etag = response.headers["etag"]
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = client.patch(
+            f"{settings.API_V1_STR}/lessons/{lesson_id}",
+            headers=superuser_token_headers,
+            json={"book_pages_start": 4, "book_pages_end": 9},
+        )
+        assert response.status_code == 200
+        response = client.get(url)
+        assert response.status_code == 404
+        assert response.json()["detail"] == "The lesson pages are not in the book PDF"
+
+
+def test_create_lesson_without_book_part(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    book = crud.create_book(session=db, book_in=BookCreate(title="Book"))
+    data = {
+        "book_part_audio": "part.mp3",
+        "lesson_audio": "lesson.mp3",
+        "explanation_notes": "notes",
+        "book_id": str(book.id),
+        "order": 0,
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/lessons/", headers=superuser_token_headers, json=data
+    )
+    assert response.status_code == 422
+
+    response = client.post(
+        f"{settings.API_V1_STR}/lessons/",
+        headers=superuser_token_headers,
+        json={**data, "book_pages_start": 3, "book_pages_end": 2},
+    )
+    assert response.status_code == 422
+
+    # Not both a file and pages
+    response = client.post(
+        f"{settings.API_V1_STR}/lessons/",
+        headers=superuser_token_headers,
+        json={
+            **data,
+            "book_part_pdf": "part.pdf",
+            "book_pages_start": 2,
+            "book_pages_end": 3,
+        },
+    )
+    assert response.status_code == 422
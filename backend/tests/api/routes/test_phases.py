@@ -1,12 +1,13 @@
 import uuid
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, col, select
 
 from app import crud
 from app.core.config import settings
-from app.models import PhaseCreate
+from app.models import PhaseBook, PhaseCreate, QuestionCreate
 from tests.utils.book import create_random_book
+from tests.utils.lesson import create_random_lesson
 from tests.utils.program import create_random_program
 
 
@@ -412,3 +413,156 @@ def test_remove_nonexistent_book_from_phase(
     )
     assert response.status_code == 404
     assert response.json()["detail"] == "Book not found in phase"
+
+
+def test_read_phase_quiz(client: TestClient, db: Session) -> None:
+    program = create_random_program(db)
+    phase = crud.create_phase(
+        session=db, phase_in=PhaseCreate(order=1, program_id=program.id)
+    )
+    question_ids = set()
+    for _ in range(2):
+        lesson = create_random_lesson(db)
+        crud.add_book_to_phase(session=db, phase_id=phase.id, book_id=lesson.book_id)
+        for i in range(3):
+            question = crud.create_question(
+                session=db,
+                question_in=QuestionCreate(
+                    question=f"Question {i}",
+                    options=["Yes", "No"],
+                    correct_options=[0],
+                    lesson_id=lesson.id,
+                ),
+            )
+            question_ids.add(str(question.id))
+    # Not in the phase
+    crud.create_question(
+        session=db,
+        question_in=QuestionCreate(
+            question="Other question",
+            options=["Yes", "No"],
+            correct_options=[0],
+            lesson_id=create_random_lesson(db).id,
+        ),
+    )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/phases/{phase.id}/quiz", params={"n": 10}
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 6
+    assert {question["id"] for question in content["data"]} == question_ids
+
+    seed = content["seed"]
+    response = client.get(
+        f"{settings.API_V1_STR}/phases/{phase.id}/quiz",
+        params={"n": 10, "seed": seed},
+    )
+    assert [question["id"] for question in response.json()["data"]] == [
+        question["id"] for question in content["data"]
+    ]
+
+
+def test_read_phase_quiz_not_found(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/phases/{uuid.uuid4()}/quiz")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Phase not found"
+
+
+def test_reorder_phases(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    program = create_random_program(db)
+    phases = [
+        crud.create_phase(
+            session=db, phase_in=PhaseCreate(order=order, program_id=program.id)
+        )
+        for order in range(3)
+    ]
+    phase_ids = [str(phase.id) for phase in reversed(phases)]
+
+    response = client.put(
+        f"{settings.API_V1_STR}/phases/program/{program.id}/order",
+        headers=superuser_token_headers,
+        json={"ids": phase_ids},
+    )
+    assert response.status_code == 200
+    assert response.json()["message"] == "Phases reordered successfully"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/phases/program/{program.id}",
+        headers=superuser_token_headers,
+    )
+    content = response.json()
+    assert [phase["id"] for phase in content["data"]] == phase_ids
+    assert [phase["position"] for phase in content["data"]] == [0, 1, 2]
+
+
+def test_reorder_phases_incomplete(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    program = create_random_program(db)
+    phases = [
+        crud.create_phase(
+            session=db, phase_in=PhaseCreate(order=order, program_id=program.id)
+        )
+        for order in range(2)
+    ]
+    other_phase = crud.create_phase(
+        session=db,
+        phase_in=PhaseCreate(order=0, program_id=create_random_program(db).id),
+    )
+
+    for ids in ([phases[1].id], [phases[1].id, other_phase.id]):
+        response = client.put(
+            f"{settings.API_V1_STR}/phases/program/{program.id}/order",
+            headers=superuser_token_headers,
+            json={"ids": [str(phase_id) for phase_id in ids]},
+        )
+        assert response.status_code == 400
+        assert (
+            response.json()["detail"]
+            == "Every phase of the program must be listed once"
+        )
+
+    db.expire_all()
+    assert [phase.order for phase in phases] == [0, 1]
+
+
+def test_reorder_phase_books(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    program = create_random_program(db)
+    phase = crud.create_phase(
+        session=db, phase_in=PhaseCreate(order=1, program_id=program.id)
+    )
+    books = [create_random_book(db) for _ in range(2)]
+    for book in books:
+        crud.add_book_to_phase(session=db, phase_id=phase.id, book_id=book.id)
+
+    response = client.put(
+        f"{settings.API_V1_STR}/phases/{phase.id}/books/order",
+        headers=superuser_token_headers,
+        json={"ids": [str(books[1].id), str(books[0].id)]},
+    )
+    assert response.status_code == 200
+    assert response.json()["message"] == "Phase books reordered successfully"
+
+    statement = (
+        select(PhaseBook.book_id)
+        .where(PhaseBook.phase_id == phase.id)
+        .order_by(col(PhaseBook.order))
+    )
+    assert db.exec(statement).all() == [books[1].id, books[0].id]
+
+
+def test_reorder_phase_books_as_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.put(
+        f"{settings.API_V1_STR}/phases/{uuid.uuid4()}/books/order",
+        headers=normal_user_token_headers,
+        json={"ids": [str(uuid.uuid4())]},
+    )
+    assert response.status_code == 403
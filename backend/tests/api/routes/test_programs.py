@@ -1,10 +1,15 @@
 import uuid
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
 
+from app import crud
 from app.core.config import settings
+from app.crud.ordering import order_key
+from app.models import Program
+from tests.utils.book import create_random_book
 from tests.utils.program import create_random_program
+from tests.utils.utils import random_lower_string
 
 
 def test_create_program(
@@ -43,6 +48,89 @@ def test_create_program_not_admin(
     assert response.status_code == 403
 
 
+def test_create_program_deep(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    existing_books = [create_random_book(db) for _ in range(6)]
+    lesson = {
+        "book_part_audio": "https://example.com/part.mp3",
+        "lesson_audio": "https://example.com/lesson.mp3",
+        "explanation_notes": "Notes",
+    }
+    # 10 phases of 6 books: an existing one, then new ones with 2 lessons
+    phases = [
+        {
+            "books": [
+                {"book_id": str(existing_books[phase % 6].id)},
+                *(
+                    {
+                        "book": {
+                            "title": f"Book {phase}.{book}",
+                            "lessons": [
+                                {**lesson, "book_pages_start": 1, "book_pages_end": 2},
+                                {
+                                    **lesson,
+                                    "book_part_pdf": "https://example.com/part.pdf",
+                                },
+                            ],
+                        }
+                    }
+                    for book in range(5)
+                ),
+            ]
+        }
+        for phase in range(10)
+    ]
+    data = {"title": "Deep program", "days_of_study": ["Sunday"], "phases": phases}
+    response = client.post(
+        f"{settings.API_V1_STR}/programs/deep",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["title"] == "Deep program"
+    assert [phase["position"] for phase in content["phases"]] == list(range(10))
+    assert all(len(phase["book_ids"]) == 6 for phase in content["phases"])
+
+    program_id = uuid.UUID(content["id"])
+    db_phases = crud.get_phases_by_program(session=db, program_id=program_id)
+    assert [str(phase.id) for phase in db_phases] == [
+        phase["id"] for phase in content["phases"]
+    ]
+    first_phase = content["phases"][0]
+    assert first_phase["book_ids"][0] == str(existing_books[0].id)
+    new_book = crud.get_book(session=db, book_id=uuid.UUID(first_phase["book_ids"][1]))
+    assert new_book is not None
+    assert new_book.title == "Book 0.0"
+    lessons = crud.get_lessons_by_book(session=db, book_id=new_book.id)
+    assert [lesson.order for lesson in lessons] == [order_key(0), order_key(1)]
+    assert lessons[0].book_pages_start == 1
+    assert len(crud.get_all_lessons(session=db, program_id=program_id)) == 10 * 5 * 2
+
+
+def test_create_program_deep_invalid(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/programs/deep"
+    title = random_lower_string()
+    data = {
+        "title": title,
+        "days_of_study": ["Sunday"],
+        "phases": [{"books": [{"book_id": str(uuid.uuid4())}]}],
+    }
+    response = client.post(url, headers=superuser_token_headers, json=data)
+    assert response.status_code == 404
+
+    book = create_random_book(db)
+    data["phases"] = [{"books": [{"book_id": str(book.id)}, {"book_id": str(book.id)}]}]
+    response = client.post(url, headers=superuser_token_headers, json=data)
+    assert response.status_code == 422
+
+    # Nothing was created
+    assert not db.exec(select(Program).where(Program.title == title)).all()
+
+
 def test_read_program(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -6,7 +6,10 @@ from sqlmodel import Session
 from app import crud
 from app.core.config import settings
 from app.models import QuestionCreate
+from app.models.question import mask_to_options, options_to_mask
 from tests.utils.lesson import create_random_lesson
+from tests.utils.user import authentication_token_from_email
+from tests.utils.utils import random_email, random_lower_string
 
 
 def test_create_question(
@@ -101,6 +104,97 @@ def test_read_questions_by_lesson(
     assert len(content["data"]) == 2
 
 
+def test_search_questions_normalizes_arabic(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    marker = random_lower_string()
+    question_in = QuestionCreate(
+        question=f"مَا حُكْمُ الصَّلَاةِ؟ {marker}",
+        options=["واجبة", "مستحبة"],
+        correct_options=[0],
+        lesson_id=lesson.id,
+    )
+    question = crud.create_question(session=db, question_in=question_in)
+
+    # No tashkeel, and ta marbuta typed as ha
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/search",
+        headers=normal_user_token_headers,
+        params={"q": f"{marker} الصلاه"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert content["data"][0]["id"] == str(question.id)
+
+
+def test_search_questions_options_and_ranking(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    marker = random_lower_string()
+    in_explanation = crud.create_question(
+        session=db,
+        question_in=QuestionCreate(
+            question=f"سؤال {marker}",
+            options=["نعم", "لا"],
+            correct_options=[0],
+            explanation="الزكاة ركن من أركان الإسلام",
+            lesson_id=lesson.id,
+        ),
+    )
+    in_question = crud.create_question(
+        session=db,
+        question_in=QuestionCreate(
+            question=f"ما حكم الزكاة؟ {marker}",
+            options=["واجبة", "مستحبة"],
+            correct_options=[0],
+            lesson_id=lesson.id,
+        ),
+    )
+    in_options = crud.create_question(
+        session=db,
+        question_in=QuestionCreate(
+            question=f"سؤال آخر {marker}",
+            options=["الزكاة", "الصيام"],
+            correct_options=[0],
+            lesson_id=lesson.id,
+        ),
+    )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/search",
+        headers=normal_user_token_headers,
+        params={"q": f"{marker} الزكاة"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 3
+    # Matches in the question text rank above options, then explanation
+    assert [q["id"] for q in content["data"]] == [
+        str(in_question.id),
+        str(in_options.id),
+        str(in_explanation.id),
+    ]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/search",
+        headers=normal_user_token_headers,
+        params={"q": f"{marker} الزكاة", "skip": 1, "limit": 1},
+    )
+    content = response.json()
+    assert content["count"] == 3
+    assert [q["id"] for q in content["data"]] == [str(in_options.id)]
+
+
+def test_search_questions_requires_login(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/search", params={"q": "الصلاة"}
+    )
+    assert response.status_code == 401
+
+
 def test_update_question(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -130,6 +224,39 @@ def test_update_question(
     assert content["options"] == ["New Answer 1", "New Answer 2", "New Answer 3"]
 
 
+def test_options_mask_round_trip() -> None:
+    assert options_to_mask([]) == 0
+    assert options_to_mask([2, 0]) == 0b101
+    assert mask_to_options(0b101) == [0, 2]
+    assert mask_to_options(options_to_mask([62])) == [62]
+
+
+def test_correct_options_mask_kept_in_sync(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    question_in = QuestionCreate(
+        question="Question",
+        options=["Answer 1", "Answer 2", "Answer 3"],
+        correct_options=[2, 0],
+        lesson_id=lesson.id,
+    )
+    question = crud.create_question(session=db, question_in=question_in)
+    assert question.correct_options_mask == 0b101
+    assert not question.is_single_answer()
+
+    response = client.patch(
+        f"{settings.API_V1_STR}/questions/{question.id}",
+        headers=superuser_token_headers,
+        json={"correct_options": [1]},
+    )
+    assert response.status_code == 200
+    assert "correct_options_mask" not in response.json()
+    db.refresh(question)
+    assert question.correct_options_mask == 0b010
+    assert question.is_single_answer()
+
+
 def test_update_question_invalid_model(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -369,3 +496,118 @@ def test_delete_question_not_found(
     )
     assert response.status_code == 404
     assert response.json()["detail"] == "Question not found"
+
+
+def test_read_questions_with_stats_by_lesson(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+    db: Session,
+) -> None:
+    lesson = create_random_lesson(db)
+    easy, hard, unanswered = (
+        crud.create_question(
+            session=db,
+            question_in=QuestionCreate(
+                question=f"Question {i}",
+                options=["A", "B", "C"],
+                correct_options=[0],
+                lesson_id=lesson.id,
+            ),
+        )
+        for i in range(3)
+    )
+    other_student_headers = authentication_token_from_email(
+        client=client, email=random_email(), db=db
+    )
+    # Both students answer the easy question right, only one the hard one
+    for headers, hard_selection in [
+        (normal_user_token_headers, [0]),
+        (other_student_headers, [1, 2]),
+    ]:
+        response = client.post(
+            f"{settings.API_V1_STR}/answers/",
+            headers=headers,
+            json={
+                "answers": [
+                    {"question_id": str(easy.id), "selected_options": [0]},
+                    {"question_id": str(hard.id), "selected_options": hard_selection},
+                ]
+            },
+        )
+        assert response.status_code == 200
+
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/lesson/{lesson.id}/stats",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 3
+    assert [question["id"] for question in content["data"]] == [
+        str(hard.id),
+        str(easy.id),
+        str(unanswered.id),
+    ]
+    hard_stats, easy_stats, unanswered_stats = (
+        question["stats"] for question in content["data"]
+    )
+    assert hard_stats["attempts"] == 2
+    assert hard_stats["correct_rate"] == 0.5
+    assert hard_stats["option_picks"] == [1, 1, 1]
+    # The student who got it right scored higher
+    assert hard_stats["discrimination"] > 0
+    assert easy_stats["correct_rate"] == 1.0
+    assert easy_stats["option_picks"] == [2, 0, 0]
+    assert easy_stats["discrimination"] is None
+    assert unanswered_stats is None
+
+    # Changing the answer key restarts the stats
+    response = client.patch(
+        f"{settings.API_V1_STR}/questions/{hard.id}",
+        headers=superuser_token_headers,
+        json={"correct_options": [1]},
+    )
+    assert response.status_code == 200
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/lesson/{lesson.id}/stats",
+        headers=superuser_token_headers,
+    )
+    stats = {question["id"]: question["stats"] for question in response.json()["data"]}
+    assert stats[str(hard.id)] is None
+    assert stats[str(easy.id)]["attempts"] == 2
+
+
+def test_read_questions_with_stats_by_book(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    question = crud.create_question(
+        session=db,
+        question_in=QuestionCreate(
+            question="Question",
+            options=["A", "B"],
+            correct_options=[0],
+            lesson_id=lesson.id,
+        ),
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/book/{lesson.book_id}/stats",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert content["data"][0]["id"] == str(question.id)
+    assert content["data"][0]["stats"] is None
+
+
+def test_read_questions_with_stats_not_admin(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    lesson = create_random_lesson(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/questions/lesson/{lesson.id}/stats",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 403
@@ -1,15 +1,28 @@
+import csv
 import uuid
 from datetime import date, timedelta
+from typing import Any
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
 
+from app import crud
 from app.core.config import settings
+from app.core.progress import flush_heartbeats
 from app.crud import create_session_event
-from app.models import SessionEventCreate
+from app.models import (
+    BookCreate,
+    LessonCompletion,
+    LessonCreate,
+    PhaseCreate,
+    SessionEventCreate,
+)
+from app.models.completion import lessons_fingerprint
+from tests.utils.lesson import create_random_lesson
 from tests.utils.program import create_random_program
 from tests.utils.session import create_random_session
-from tests.utils.user import create_random_user
+from tests.utils.user import authentication_token_from_email, create_random_user
+from tests.utils.utils import random_email
 
 
 def test_create_session(
@@ -550,3 +563,326 @@ def test_create_session_event_session_id_mismatch(
     )
     assert response.status_code == 400
     assert response.json()["detail"] == "Event session_id mismatch"
+
+
+def test_read_session_progress(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    session_obj = create_random_session(db)
+    lesson = create_random_lesson(db)
+    other_lesson = create_random_lesson(db)
+    create_session_event(
+        session=db,
+        event_in=SessionEventCreate(
+            event_date=date.today(), session_id=session_obj.id, lesson_id=lesson.id
+        ),
+    )
+    student_headers = []
+    for _ in range(2):
+        email = random_email()
+        headers = authentication_token_from_email(client=client, email=email, db=db)
+        student = crud.get_user_by_email(session=db, email=email)
+        assert student
+        crud.add_student_to_session(
+            session=db, session_id=session_obj.id, user_id=student.id
+        )
+        student_headers.append(headers)
+        for lesson_id in [lesson.id, other_lesson.id]:
+            response = client.post(
+                f"{settings.API_V1_STR}/lessons/{lesson_id}/progress",
+                headers=headers,
+                json={"position_seconds": 10, "duration_seconds": 100},
+            )
+            assert response.status_code == 202
+    flush_heartbeats()
+
+    # Only the session's lessons
+    response = client.get(
+        f"{settings.API_V1_STR}/sessions/{session_obj.id}/progress",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 2
+    assert {progress["lesson_id"] for progress in content["data"]} == {str(lesson.id)}
+    assert all(progress["completed"] is False for progress in content["data"])
+
+    # Students only see their own progress
+    response = client.get(
+        f"{settings.API_V1_STR}/sessions/{session_obj.id}/progress",
+        headers=student_headers[0],
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+
+def test_read_session_progress_not_enrolled(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    session_obj = create_random_session(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/sessions/{session_obj.id}/progress",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 403
+
+
+def test_read_session_completion(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    teacher_token_headers: dict[str, str],
+    db: Session,
+) -> None:
+    session_obj = create_random_session(db)
+    book = crud.create_book(
+        session=db, book_in=BookCreate(title="Book", pdf="book.pdf", audio="book.mp3")
+    )
+
+    def create_lesson(order: int) -> uuid.UUID:
+        lesson_in = LessonCreate(
+            book_part_pdf=f"part_{order}.pdf",
+            book_part_audio=f"part_{order}.mp3",
+            lesson_audio=f"lesson_{order}.mp3",
+            explanation_notes=f"notes_{order}",
+            book_id=book.id,
+            order=order,
+        )
+        return crud.create_lesson(session=db, lesson_in=lesson_in).id
+
+    lesson_ids = [create_lesson(order) for order in range(3)]
+    phase = crud.create_phase(
+        session=db, phase_in=PhaseCreate(order=0, program_id=session_obj.program_id)
+    )
+    crud.add_book_to_phase(session=db, phase_id=phase.id, book_id=book.id, order=0)
+
+    students = []
+    for _ in range(2):
+        email = random_email()
+        headers = authentication_token_from_email(client=client, email=email, db=db)
+        student = crud.get_user_by_email(session=db, email=email)
+        assert student
+        crud.add_student_to_session(
+            session=db, session_id=session_obj.id, user_id=student.id
+        )
+        students.append((str(student.id), headers))
+
+    def complete(headers: dict[str, str], lesson_id: uuid.UUID) -> None:
+        response = client.post(
+            f"{settings.API_V1_STR}/lessons/{lesson_id}/progress",
+            headers=headers,
+            json={"position_seconds": 95, "duration_seconds": 100},
+        )
+        assert response.status_code == 202
+
+    def read_completion() -> dict[str, Any]:
+        flush_heartbeats()
+        response = client.get(
+            f"{settings.API_V1_STR}/sessions/{session_obj.id}/completion",
+            headers=superuser_token_headers,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        content["data"] = {
+            student["student_id"]: student for student in content["data"]
+        }
+        return content
+
+    (first_id, first_headers), (second_id, second_headers) = students
+    # Another session of the first student, whose program doesn't have the
+    # lessons
+    other_session = create_random_session(db)
+    crud.add_student_to_session(
+        session=db, session_id=other_session.id, user_id=uuid.UUID(first_id)
+    )
+
+    def stored_students(session_id: uuid.UUID) -> set[str]:
+        statement = select(LessonCompletion.student_id).where(
+            LessonCompletion.session_id == session_id
+        )
+        return {str(student_id) for student_id in db.exec(statement)}
+
+    complete(first_headers, lesson_ids[0])
+    complete(first_headers, lesson_ids[2])
+    content = read_completion()
+    assert content["lesson_ids"] == [str(lesson_id) for lesson_id in lesson_ids]
+    assert content["count"] == 2
+    assert content["histogram"] == [1, 0, 1, 0]
+    first = content["data"][first_id]
+    assert first["lessons"] == "101"
+    assert first["completed_count"] == 2
+    assert first["next_lesson_id"] == str(lesson_ids[1])
+    assert content["data"][second_id]["lessons"] == "000"
+    assert content["data"][second_id]["next_lesson_id"] == str(lesson_ids[0])
+    # Stored on completion, in the sessions with the lesson only, and not when
+    # read
+    assert stored_students(session_obj.id) == {first_id}
+    assert not stored_students(other_session.id)
+
+    # Completing a lesson rebuilds the student's bitset
+    complete(second_headers, lesson_ids[1])
+    content = read_completion()
+    assert stored_students(session_obj.id) == {first_id, second_id}
+    assert content["data"][second_id]["lessons"] == "010"
+    assert content["histogram"] == [0, 1, 1, 0]
+
+    def stored_fingerprints(session_id: uuid.UUID) -> set[bytes]:
+        statement = select(LessonCompletion.lessons_fingerprint).where(
+            LessonCompletion.session_id == session_id
+        )
+        return set(db.exec(statement))
+
+    # Adding a lesson to the program rebuilds and stores every bitset
+    lesson_ids.append(create_lesson(3))
+    assert stored_fingerprints(session_obj.id) == {lessons_fingerprint(lesson_ids)}
+    content = read_completion()
+    assert content["lesson_ids"] == [str(lesson_id) for lesson_id in lesson_ids]
+    assert content["data"][first_id]["lessons"] == "1010"
+    assert content["data"][second_id]["lessons"] == "0100"
+    assert content["histogram"] == [0, 1, 1, 0, 0]
+
+    # So does moving a lesson
+    lesson = crud.get_lesson(session=db, lesson_id=lesson_ids[3])
+    assert lesson
+    assert crud.move_lesson(session=db, lesson=lesson, position=0)
+    lesson_ids.insert(0, lesson_ids.pop())
+    assert stored_fingerprints(session_obj.id) == {lessons_fingerprint(lesson_ids)}
+    content = read_completion()
+    assert content["data"][first_id]["lessons"] == "0101"
+    assert content["data"][second_id]["lessons"] == "0010"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/sessions/{session_obj.id}/completion",
+        headers=teacher_token_headers,
+    )
+    assert response.status_code == 403
+    assert response.json()["detail"] == "You are not teaching this session"
+
+
+def test_session_attendance(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    teacher_token_headers: dict[str, str],
+    db: Session,
+) -> None:
+    session_obj = create_random_session(db)
+    events = [
+        create_session_event(
+            session=db,
+            event_in=SessionEventCreate(
+                event_date=date.today() + timedelta(days=days),
+                session_id=session_obj.id,
+                is_break=is_break,
+            ),
+        )
+        for days, is_break in [(0, False), (1, False), (2, True)]
+    ]
+
+    def enroll() -> str:
+        student = create_random_user(db)
+        crud.add_student_to_session(
+            session=db, session_id=session_obj.id, user_id=student.id
+        )
+        return str(student.id)
+
+    def record(event_id: uuid.UUID, present: list[str]) -> dict[str, Any]:
+        response = client.put(
+            f"{settings.API_V1_STR}/sessions/{session_obj.id}/events/{event_id}/attendance",
+            headers=superuser_token_headers,
+            json={"present": present},
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    first, second = enroll(), enroll()
+    content = record(events[0].id, [first])
+    assert content["present"] == [first]
+    assert content["absent"] == [second]
+    assert content["roster_count"] == 2
+    assert content["attendance_rate"] == 0.5
+
+    # Students joining later don't count in earlier lessons
+    third = enroll()
+    content = record(events[1].id, [second, third])
+    assert content["absent"] == [first]
+    assert content["present_count"] == 2
+
+    response = client.get(
+        f"{settings.API_V1_STR}/sessions/{session_obj.id}/attendance",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [event["event_id"] for event in content["events"]] == [
+        str(events[0].id),
+        str(events[1].id),
+    ]
+    assert [event["present_count"] for event in content["events"]] == [1, 2]
+    students = {student["student_id"]: student for student in content["students"]}
+    assert students[first]["lesson_count"] == 2
+    assert students[first]["attendance_rate"] == 0.5
+    assert students[third]["lesson_count"] == 1
+    assert students[third]["attendance_rate"] == 1.0
+
+    response = client.get(
+        f"{settings.API_V1_STR}/sessions/{session_obj.id}/attendance/report",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *rows = csv.reader(response.text.splitlines())
+    assert header[-3:] == ["lessons", "present", "attendance_rate"]
+    # In roster order: students enrolled together are ordered by ID
+    assert [row[0] for row in rows] == [*sorted([first, second]), third]
+    marks = {row[0]: row[5:7] for row in rows}
+    assert marks[first] == ["1", "0"]
+    assert marks[third] == ["", "1"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/sessions/{session_obj.id}/attendance",
+        headers=teacher_token_headers,
+    )
+    assert response.status_code == 403
+
+
+def test_record_attendance_invalid(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    session_obj = create_random_session(db)
+    lesson_event = create_session_event(
+        session=db,
+        event_in=SessionEventCreate(event_date=date.today(), session_id=session_obj.id),
+    )
+    break_event = create_session_event(
+        session=db,
+        event_in=SessionEventCreate(
+            event_date=date.today(), session_id=session_obj.id, is_break=True
+        ),
+    )
+    url = f"{settings.API_V1_STR}/sessions/{session_obj.id}/events"
+
+    response = client.put(
+        f"{url}/{break_event.id}/attendance",
+        headers=superuser_token_headers,
+        json={"present": []},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Attendance is only recorded for lessons"
+
+    student_id = uuid.uuid4()
+    response = client.put(
+        f"{url}/{lesson_event.id}/attendance",
+        headers=superuser_token_headers,
+        json={"present": [str(student_id)]},
+    )
+    assert response.status_code == 400
+    assert (
+        response.json()["detail"]
+        == f"Student {student_id} is not enrolled in this session"
+    )
+
+    response = client.put(
+        f"{url}/{uuid.uuid4()}/attendance",
+        headers=superuser_token_headers,
+        json={"present": []},
+    )
+    assert response.status_code == 404
@@ -1,14 +1,16 @@
 import uuid
+from datetime import UTC, datetime, timedelta
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select, update
 
 from app import crud
 from app.core.config import settings
 from app.core.security import verify_password
-from app.models import User
-from tests.utils.user import create_user_with_details
+from app.models import EmailOutbox, QuestionCreate, ReviewItem, User
+from tests.utils.lesson import create_random_lesson
+from tests.utils.user import authentication_token_from_email, create_user_with_details
 from tests.utils.utils import random_email, random_gender_is_male, random_lower_string
 
 
@@ -34,13 +36,80 @@ def test_get_users_normal_user_me(
     assert current_user["email"] == settings.EMAIL_TEST_USER
 
 
+def test_read_my_review_queue(client: TestClient, db: Session) -> None:
+    email = random_email()
+    headers = authentication_token_from_email(client=client, email=email, db=db)
+    user = crud.get_user_by_email(session=db, email=email)
+    assert user
+    lesson = create_random_lesson(db)
+    known, missed = (
+        crud.create_question(
+            session=db,
+            question_in=QuestionCreate(
+                question=f"Question {i}",
+                options=["A", "B"],
+                correct_options=[0],
+                lesson_id=lesson.id,
+            ),
+        )
+        for i in range(2)
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=headers,
+        json={
+            "answers": [
+                {"question_id": str(known.id), "selected_options": [0]},
+                {"question_id": str(missed.id), "selected_options": [1]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+
+    # Nothing due until tomorrow
+    r = client.get(f"{settings.API_V1_STR}/users/me/review", headers=headers)
+    assert r.status_code == 200
+    assert r.json() == {"data": [], "count": 0}
+
+    now = datetime.now(UTC)
+    for question, days_overdue in [(known, 1), (missed, 2)]:
+        db.exec(
+            update(ReviewItem)
+            .where(
+                col(ReviewItem.student_id) == user.id,
+                col(ReviewItem.question_id) == question.id,
+            )
+            .values(due_at=now - timedelta(days=days_overdue))
+        )
+    db.commit()
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me/review", headers=headers, params={"n": 1}
+    )
+    content = r.json()
+    assert content["count"] == 2
+    assert [question["id"] for question in content["data"]] == [str(missed.id)]
+
+    # Answering it right reschedules it
+    response = client.post(
+        f"{settings.API_V1_STR}/answers/",
+        headers=headers,
+        json={"answers": [{"question_id": str(missed.id), "selected_options": [0]}]},
+    )
+    assert response.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me/review", headers=headers)
+    content = r.json()
+    assert content["count"] == 1
+    assert [question["id"] for question in content["data"]] == [str(known.id)]
+
+
 def test_create_user_new_email(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     with (
-        patch("app.utils.send_email", return_value=None),
         patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
         patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
     ):
         username = random_email()
         password = random_lower_string()
@@ -62,6 +131,9 @@ def test_create_user_new_email(
         user = crud.get_user_by_email(session=db, email=username)
         assert user
         assert user.email == created_user["email"]
+        # The welcome email is queued for the email worker
+        statement = select(EmailOutbox).where(EmailOutbox.email_to == username)
+        assert len(db.exec(statement).all()) == 1
 
 
 def test_get_existing_user(
@@ -178,6 +250,106 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_search_users_normalizes_arabic_names(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    marker = random_lower_string()[:12]
+    user = create_user_with_details(
+        db, first_name="عائِشَة", father_name="أحمد", family_name=marker
+    )
+
+    # No tashkeel, hamza and ta marbuta typed differently, extra spaces
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=superuser_token_headers,
+        params={"q": f"عايشه  احمد {marker}"},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 1
+    assert content["data"][0]["id"] == str(user.id)
+
+
+def test_search_users_prefix_first_and_fuzzy(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    marker = random_lower_string()[:12]
+    in_family_name = create_user_with_details(db, family_name=marker)
+    in_first_name = create_user_with_details(db, first_name=marker)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=superuser_token_headers,
+        params={"q": marker},
+    )
+    assert r.status_code == 200
+    assert [u["id"] for u in r.json()["data"]] == [
+        str(in_first_name.id),
+        str(in_family_name.id),
+    ]
+
+    typo = marker[:-1] + ("a" if marker[-1] != "a" else "b")
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=superuser_token_headers,
+        params={"q": typo},
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] == 2
+
+
+def test_search_users_filters_and_email(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    marker = random_lower_string()[:12]
+    teacher = create_user_with_details(
+        db, email=f"{marker}.teacher@example.com", is_teacher=True
+    )
+    student = create_user_with_details(db, email=f"{marker}.student@example.com")
+    inactive = create_user_with_details(
+        db, email=f"{marker}.inactive@example.com", is_active=False
+    )
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=superuser_token_headers,
+        params={"q": marker},
+    )
+    assert r.json()["count"] == 3
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=superuser_token_headers,
+        params={"q": marker, "is_teacher": True},
+    )
+    assert [u["id"] for u in r.json()["data"]] == [str(teacher.id)]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=superuser_token_headers,
+        params={"q": marker, "is_teacher": False, "is_active": True},
+    )
+    assert [u["id"] for u in r.json()["data"]] == [str(student.id)]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=superuser_token_headers,
+        params={"q": marker, "is_active": False},
+    )
+    assert [u["id"] for u in r.json()["data"]] == [str(inactive.id)]
+
+
+def test_search_users_by_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/search",
+        headers=normal_user_token_headers,
+        params={"q": "محمد"},
+    )
+    assert r.status_code == 403
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -0,0 +1,48 @@
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db_stats import RequestDBStats, statement_shape
+from tests.utils.book import create_random_book
+
+QueryBudget = Callable[[int], AbstractContextManager[list[str]]]
+
+
+def test_db_queries_headers(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/books/")
+    assert r.status_code == 200
+    assert int(r.headers["x-db-queries"]) > 0
+    assert r.headers["server-timing"].startswith("db;dur=")
+
+
+def test_read_books_query_budget(
+    client: TestClient, db: Session, query_budget: QueryBudget
+) -> None:
+    for _ in range(3):
+        create_random_book(db)
+    # One count and one page query, however many books there are
+    with query_budget(2):
+        r = client.get(f"{settings.API_V1_STR}/books/")
+    assert r.status_code == 200
+
+
+def test_read_book_query_budget(
+    client: TestClient, db: Session, query_budget: QueryBudget
+) -> None:
+    book = create_random_book(db)
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/books/{book.id}")
+    assert r.status_code == 200
+
+
+def test_repeated_shapes() -> None:
+    stats = RequestDBStats()
+    stats.shapes.update(
+        [statement_shape("SELECT *\n  FROM lesson WHERE id = %(id)s")] * 3
+        + ["SELECT count(*) FROM lesson"]
+    )
+    assert stats.repeated_shapes(3) == [("SELECT * FROM lesson WHERE id = %(id)s", 3)]
+    assert stats.repeated_shapes(4) == []
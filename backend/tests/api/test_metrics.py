@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+
+def test_metrics_per_route(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/books/")
+    assert r.status_code == 200
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    content = r.text
+    assert (
+        'http_requests_total{route="books-read_books",method="GET",status="200"}'
+        in content
+    )
+    assert (
+        'http_request_duration_seconds_count{route="books-read_books",method="GET"}'
+        in content
+    )
+    assert (
+        'http_request_db_duration_seconds_count{route="books-read_books",method="GET"}'
+        in content
+    )
+    assert "http_requests_in_progress" in content
+    assert "db_pool_checkedout" in content
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5.0, "a")
+    lines = histogram.render()
+    assert 'test_seconds_bucket{route="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{route="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="a"} 3' in lines
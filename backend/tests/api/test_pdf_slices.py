@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from pypdf import PdfReader, PdfWriter
+
+from app.core import pdf_slices
+from app.core.pdf_slices import PdfSliceCache
+
+
+def write_pdf(path: Path, pages: int) -> Path:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    with path.open("wb") as file:
+        writer.write(file)
+    return path
+
+
+def test_write_slice(tmp_path: Path) -> None:
+    source = write_pdf(tmp_path / "book.pdf", 5)
+    destination = tmp_path / "slice.pdf"
+    pdf_slices.write_slice(source, 2, 3, destination)
+    assert len(PdfReader(destination).pages) == 2
+    # No partial file left behind
+    assert set(tmp_path.iterdir()) == {source, destination}
+
+
+def test_slice_cache_coalesces_and_evicts(tmp_path: Path) -> None:
+    source = write_pdf(tmp_path / "book.pdf", 10)
+    generated = []
+    write_slice = pdf_slices.write_slice
+
+    def slow_write_slice(source: Path, start: int, end: int, destination: Path) -> None:
+        generated.append((start, end))
+        time.sleep(0.2)
+        write_slice(source, start, end, destination)
+
+    cache = PdfSliceCache(max_bytes=1024**2, workers=1)
+    barrier = threading.Barrier(8)
+
+    def get_slice(_: int) -> Path:
+        barrier.wait()
+        return cache.get(source, 2, 4)
+
+    with (
+        patch("app.core.config.settings.MEDIA_ROOT", tmp_path),
+        # Generate in threads, which can run the patched function
+        patch("app.core.pdf_slices.ProcessPoolExecutor", ThreadPoolExecutor),
+        patch("app.core.pdf_slices.write_slice", slow_write_slice),
+    ):
+        with ThreadPoolExecutor(8) as executor:
+            paths = set(executor.map(get_slice, range(8)))
+        assert generated == [(2, 4)]
+        (path,) = paths
+        assert len(PdfReader(path).pages) == 3
+
+        cache.get(source, 5, 5)
+        cache.shutdown()
+        assert len(list(cache.directory.iterdir())) == 2
+
+        # A hit marks the slice used without changing its mtime (its ETag)
+        mtime_ns = path.stat().st_mtime_ns
+        assert cache.get(source, 2, 4) == path
+        assert path.stat().st_mtime_ns == mtime_ns
+
+        # The least recently used slice goes first
+        cache.max_bytes = path.stat().st_size
+        cache.evict()
+        assert list(cache.directory.iterdir()) == [path]
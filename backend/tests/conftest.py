@@ -1,4 +1,5 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
@@ -6,6 +7,7 @@ from sqlmodel import Session, delete
 
 from app.core.config import settings
 from app.core.db import engine, init_db
+from app.core.db_stats import RequestDBStats, capture_queries
 from app.main import app
 from app.models import User
 from tests.utils.user import (
@@ -32,6 +34,32 @@ def client() -> Generator[TestClient, None, None]:
         yield c
 
 
+@pytest.fixture
+def query_budget() -> Callable[[int], AbstractContextManager[list[str]]]:
+    """
+    Fail the test if the enclosed block runs more than `max_queries` statements.
+
+        with query_budget(2):
+            client.get(...)
+    """
+
+    @contextmanager
+    def _query_budget(max_queries: int) -> Generator[list[str]]:
+        with capture_queries(engine) as statements:
+            yield statements
+        stats = RequestDBStats(queries=len(statements))
+        stats.shapes.update(statements)
+        repeated = "".join(
+            f"\n  {count}x {shape}" for shape, count in stats.repeated_shapes(2)
+        )
+        assert len(statements) <= max_queries, (
+            f"{len(statements)} SQL statements executed, budget is {max_queries}."
+            f"{' Repeated:' + repeated if repeated else ''}"
+        )
+
+    return _query_budget
+
+
 @pytest.fixture(scope="module")
 def superuser_token_headers(client: TestClient) -> dict[str, str]:
     return get_superuser_token_headers(client)
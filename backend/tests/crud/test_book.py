@@ -1,11 +1,32 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import event
 from sqlmodel import Session
 
 from app import crud
-from app.models import BookCreate, BookUpdate
+from app.models import BookCreate, BookUpdate, Lesson, Question
 from tests.utils.book import create_random_book
+from tests.utils.lesson import create_random_lesson
 from tests.utils.utils import random_lower_string
 
 
+@contextmanager
+def record_statements(db: Session) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
 def test_create_book(db: Session) -> None:
     title = random_lower_string()
     book_in = BookCreate(
@@ -46,6 +67,18 @@ def test_update_book(db: Session) -> None:
     assert updated_book.id == book.id
 
 
+def test_update_book_without_refresh(db: Session) -> None:
+    book = create_random_book(db)
+    title = random_lower_string()
+    with record_statements(db) as statements:
+        updated_book = crud.update_book(
+            session=db, db_book=book, book_in=BookUpdate(title=title)
+        )
+        assert updated_book.title == title
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE book")
+
+
 def test_delete_book(db: Session) -> None:
     book = create_random_book(db)
     result = crud.delete_book(session=db, book_id=book.id)
@@ -53,3 +86,25 @@ def test_delete_book(db: Session) -> None:
 
     deleted_book = crud.get_book(session=db, book_id=book.id)
     assert deleted_book is None
+
+
+def test_delete_book_cascades_in_db(db: Session) -> None:
+    lesson = create_random_lesson(db)
+    question = Question(
+        question=random_lower_string(),
+        options=["a", "b"],
+        correct_options=[0],
+        lesson_id=lesson.id,
+    )
+    db.add(question)
+    db.commit()
+    book_id, lesson_id, question_id = lesson.book_id, lesson.id, question.id
+    db.expire_all()
+
+    with record_statements(db) as statements:
+        assert crud.delete_book(session=db, book_id=book_id) is True
+    # The children are deleted by ON DELETE CASCADE, without loading them
+    assert not any("FROM lesson" in statement for statement in statements)
+    assert not any("FROM question" in statement for statement in statements)
+    assert db.get(Lesson, lesson_id) is None
+    assert db.get(Question, question_id) is None
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from sqlmodel import Session
+
+from app import crud
+from app.models.email_outbox import (
+    EMAIL_STATUS_FAILED,
+    EMAIL_STATUS_PENDING,
+    EMAIL_STATUS_SENT,
+    utc_now,
+)
+from tests.utils.utils import random_email
+
+
+def test_enqueue_email(db: Session) -> None:
+    email_to = random_email()
+    email = crud.enqueue_email(
+        session=db, email_to=email_to, subject="Subject", html_content="<p>Hi</p>"
+    )
+    assert email.id is not None
+    assert email.email_to == email_to
+    assert email.status == EMAIL_STATUS_PENDING
+    assert email.attempts == 0
+    assert email.next_attempt_at <= utc_now()
+
+
+def test_get_due_emails(db: Session) -> None:
+    email = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Due", html_content=""
+    )
+    later = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Later", html_content=""
+    )
+    later.next_attempt_at = utc_now() + timedelta(hours=1)
+    db.add(later)
+    db.commit()
+
+    due_ids = {e.id for e in crud.get_due_emails(session=db, limit=10_000)}
+    db.commit()
+    assert email.id in due_ids
+    assert later.id not in due_ids
+
+
+def test_mark_email_sent(db: Session) -> None:
+    email = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Sent", html_content=""
+    )
+    crud.mark_email_sent(session=db, db_email=email)
+    db.commit()
+    db.refresh(email)
+    assert email.status == EMAIL_STATUS_SENT
+    assert email.attempts == 1
+    assert email.sent_at is not None
+
+
+def test_mark_email_failed_backs_off(db: Session) -> None:
+    email = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Retry", html_content=""
+    )
+    with (
+        patch("app.core.config.settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS", 10),
+        patch("app.core.config.settings.EMAIL_OUTBOX_MAX_ATTEMPTS", 3),
+    ):
+        crud.mark_email_failed(session=db, db_email=email, error="boom")
+        db.commit()
+        first_delay = email.next_attempt_at - utc_now()
+        crud.mark_email_failed(session=db, db_email=email, error="boom")
+        db.commit()
+        second_delay = email.next_attempt_at - utc_now()
+        assert email.status == EMAIL_STATUS_PENDING
+        assert timedelta(seconds=5) < first_delay <= timedelta(seconds=10)
+        assert timedelta(seconds=15) < second_delay <= timedelta(seconds=20)
+
+        crud.mark_email_failed(session=db, db_email=email, error="boom")
+        db.commit()
+    db.refresh(email)
+    assert email.status == EMAIL_STATUS_FAILED
+    assert email.attempts == 3
+    assert email.last_error == "boom"
@@ -0,0 +1,144 @@
+import uuid
+from itertools import pairwise
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, col, select
+
+from app import crud
+from app.crud.ordering import (
+    LESSONS,
+    ORDER_GAP,
+    OrderKeysExhausted,
+    get_crowded_parents,
+    order_key,
+    respace,
+)
+from app.models import Book, Lesson, LessonCreate
+from tests.crud.test_book import record_statements
+from tests.utils.book import create_random_book
+
+
+def create_lesson(
+    db: Session, book: Book, *, order: int | None = None, position: int | None = None
+) -> Lesson:
+    return crud.create_lesson(
+        session=db,
+        lesson_in=LessonCreate(
+            book_part_pdf="https://example.com/part.pdf",
+            book_part_audio="https://example.com/part.mp3",
+            lesson_audio="https://example.com/lesson.mp3",
+            explanation_notes="Notes",
+            book_id=book.id,
+            order=order,
+            position=position,
+        ),
+    )
+
+
+def create_lessons(db: Session, book: Book, orders: list[int]) -> list[Lesson]:
+    return [create_lesson(db, book, order=order) for order in orders]
+
+
+def get_lesson_ids(db: Session, book: Book) -> list[uuid.UUID]:
+    statement = (
+        select(Lesson.id).where(Lesson.book_id == book.id).order_by(col(Lesson.order))
+    )
+    return list(db.exec(statement).all())
+
+
+def test_move_lesson_writes_one_row(db: Session) -> None:
+    book = create_random_book(db)
+    lessons = create_lessons(db, book, [order_key(i) for i in range(200)])
+    last = lessons[-1]
+
+    with record_statements(db) as statements:
+        assert crud.move_lesson(session=db, lesson=last, position=3)
+    writes = [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(writes) == 1
+
+    lesson_ids = get_lesson_ids(db, book)
+    assert lesson_ids[3] == last.id
+    assert lesson_ids[:3] == [lesson.id for lesson in lessons[:3]]
+    assert lesson_ids[4:] == [lesson.id for lesson in lessons[3:-1]]
+
+
+def test_move_lesson_locks_book_first(db: Session) -> None:
+    book = create_random_book(db)
+    lessons = create_lessons(db, book, [order_key(i) for i in range(3)])
+
+    with record_statements(db) as statements:
+        assert crud.move_lesson(session=db, lesson=lessons[2], position=0)
+    # Before reading the neighbours, so a concurrent respace can't move them
+    lock = next(i for i, s in enumerate(statements) if "FOR UPDATE" in s)
+    assert "FROM book" in statements[lock]
+    reads = [i for i, s in enumerate(statements) if 'lesson."order"' in s]
+    assert reads
+    assert lock < reads[0]
+
+
+def test_move_lesson_first_and_last(db: Session) -> None:
+    book = create_random_book(db)
+    lessons = create_lessons(db, book, [order_key(i) for i in range(3)])
+
+    assert crud.move_lesson(session=db, lesson=lessons[2], position=0)
+    assert crud.move_lesson(session=db, lesson=lessons[1], position=10)
+    assert get_lesson_ids(db, book) == [lessons[i].id for i in (2, 0, 1)]
+
+
+def test_move_lesson_respaces_when_crowded(db: Session) -> None:
+    book = create_random_book(db)
+    # No key left between them
+    lessons = create_lessons(db, book, [0, 1, 2])
+
+    assert crud.move_lesson(session=db, lesson=lessons[2], position=1)
+    assert get_lesson_ids(db, book) == [lessons[i].id for i in (0, 2, 1)]
+    orders = sorted(db.exec(select(Lesson.order).where(Lesson.book_id == book.id)))
+    assert all(b - a >= ORDER_GAP // 2 for a, b in pairwise(orders))
+
+
+def test_respace_crowded_book(db: Session) -> None:
+    book = create_random_book(db)
+    create_lessons(db, book, [5, 6, 7])
+    assert book.id in get_crowded_parents(session=db, ordering=LESSONS, limit=10_000)
+
+    respace(session=db, ordering=LESSONS, parent_id=book.id)
+    db.commit()
+    assert book.id not in get_crowded_parents(
+        session=db, ordering=LESSONS, limit=10_000
+    )
+    orders = db.exec(
+        select(Lesson.order)
+        .where(Lesson.book_id == book.id)
+        .order_by(col(Lesson.order))
+    ).all()
+    assert list(orders) == [order_key(i) for i in range(3)]
+
+
+def test_create_lesson_at_position(db: Session) -> None:
+    book = create_random_book(db)
+    first = create_lesson(db, book)
+    last = create_lesson(db, book)
+    assert (first.order, last.order) == (order_key(0), order_key(1))
+
+    middle = create_lesson(db, book, position=1)
+    assert get_lesson_ids(db, book) == [first.id, middle.id, last.id]
+    assert first.order < middle.order < last.order
+
+    # Respaced when there's no key left there
+    other_book = create_random_book(db)
+    crowded = create_lessons(db, other_book, [0, 1])
+    new = create_lesson(db, other_book, position=1)
+    assert get_lesson_ids(db, other_book) == [crowded[0].id, new.id, crowded[1].id]
+
+
+def test_move_lesson_keys_exhausted(db: Session) -> None:
+    book = create_random_book(db)
+    lessons = create_lessons(db, book, [order_key(0), order_key(1)])
+
+    # Not even once respaced, instead of writing no order
+    with patch("app.crud.ordering.MAX_ORDER", order_key(1)):
+        with pytest.raises(OrderKeysExhausted):
+            crud.move_lesson(session=db, lesson=lessons[0], position=2)
+    db.rollback()
+    assert get_lesson_ids(db, book) == [lesson.id for lesson in lessons]
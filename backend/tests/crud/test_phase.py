@@ -1,6 +1,7 @@
 from sqlmodel import Session, select
 
 from app import crud
+from app.crud.ordering import order_key
 from app.models import PhaseBook, PhaseCreate, PhaseUpdate
 from tests.utils.book import create_random_book
 from tests.utils.program import create_random_program
@@ -122,7 +123,7 @@ def test_add_book_to_phase_without_order_after_removal(db: Session) -> None:
         PhaseBook.phase_id == phase.id, PhaseBook.book_id == book1.id
     )
     order = db.exec(statement).one()
-    assert order == 0
+    assert order == order_key(0)
 
     # Add second book
     result = crud.add_book_to_phase(session=db, phase_id=phase.id, book_id=book2.id)
@@ -131,7 +132,7 @@ def test_add_book_to_phase_without_order_after_removal(db: Session) -> None:
         PhaseBook.phase_id == phase.id, PhaseBook.book_id == book2.id
     )
     order = db.exec(statement).one()
-    assert order == 1
+    assert order == order_key(1)
 
     # Remove first book
     result = crud.remove_book_from_phase(
@@ -146,4 +147,4 @@ def test_add_book_to_phase_without_order_after_removal(db: Session) -> None:
         PhaseBook.phase_id == phase.id, PhaseBook.book_id == book3.id
     )
     order = db.exec(statement).one()
-    assert order == 2
+    assert order == order_key(2)
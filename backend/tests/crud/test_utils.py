@@ -0,0 +1,103 @@
+from datetime import date
+from typing import Any
+
+import pytest
+from pydantic import ValidationError, field_validator, model_validator
+from sqlalchemy import event
+from sqlmodel import Field, Session, SQLModel
+
+from app import crud
+from app.crud.utils import validate_update_model
+from app.models import Program, ProgramSession, ProgramSessionCreate
+from tests.utils.program import create_random_program
+
+
+def create_program_with_session(db: Session) -> tuple[Program, ProgramSession]:
+    program = create_random_program(db)
+    session_in = ProgramSessionCreate(program_id=program.id, start_date=date.today())
+    return program, crud.create_session(session=db, session_in=session_in)
+
+
+def test_unit_of_work_commits_once(db: Session) -> None:
+    commits: list[Session] = []
+
+    def record(session: Session) -> None:
+        commits.append(session)
+
+    event.listen(db, "after_commit", record)
+    try:
+        with crud.unit_of_work(db):
+            program, db_session = create_program_with_session(db)
+            # Flushed: the writes are visible to the next calls
+            assert crud.get_sessions_by_program(session=db, program_id=program.id)
+            with crud.unit_of_work(db):
+                crud.delete_session(session=db, session_id=db_session.id)
+            assert commits == []
+    finally:
+        event.remove(db, "after_commit", record)
+    assert len(commits) == 1
+    assert crud.get_program(session=db, program_id=program.id) is not None
+    assert crud.get_session(session=db, session_id=db_session.id) is None
+
+
+def test_unit_of_work_rolls_back(db: Session) -> None:
+    with pytest.raises(RuntimeError), crud.unit_of_work(db):
+        program, db_session = create_program_with_session(db)
+        program_id, session_id = program.id, db_session.id
+        raise RuntimeError
+    assert crud.get_program(session=db, program_id=program_id) is None
+    assert crud.get_session(session=db, session_id=session_id) is None
+
+    # Commits right away again after the block
+    program, _ = create_program_with_session(db)
+    db.rollback()
+    assert crud.get_program(session=db, program_id=program.id) is not None
+
+
+class Tagged(SQLModel):
+    tag: str = Field(max_length=10)
+    count: int = 0
+
+    @field_validator("tag")
+    @classmethod
+    def validate_tag(cls, value: str) -> str:
+        if not value.isalnum():
+            raise ValueError("tag must be alphanumeric")
+        return value
+
+
+class Ranged(SQLModel):
+    first: int
+    last: int
+
+    @model_validator(mode="before")
+    @classmethod
+    def validate_range(cls, data: Any) -> Any:
+        if data["first"] > data["last"]:
+            raise ValueError("first must not be after last")
+        return data
+
+
+def test_validate_update_model_field_validators() -> None:
+    tagged = Tagged(tag="tag")
+    validate_update_model(Tagged, tagged, {"tag": "other", "count": 2})
+
+    with pytest.raises(ValidationError) as exc_info:
+        validate_update_model(Tagged, tagged, {"tag": "not a tag"})
+    error = exc_info.value.errors()[0]
+    assert error["loc"] == ("tag",)
+    assert error["msg"] == "Value error, tag must be alphanumeric"
+
+    # Constraints still apply
+    with pytest.raises(ValidationError):
+        validate_update_model(Tagged, tagged, {"tag": "a" * 11})
+
+
+def test_validate_update_model_before_validators() -> None:
+    ranged = Ranged(first=1, last=3)
+    validate_update_model(Ranged, ranged, {"first": 3})
+
+    # Run against the whole object as it would be after the update
+    with pytest.raises(ValidationError) as exc_info:
+        validate_update_model(Ranged, ranged, {"first": 4})
+    assert "first must not be after last" in exc_info.value.errors()[0]["msg"]
@@ -0,0 +1,41 @@
+import uuid
+
+from app.models import LessonCompletion
+from app.models.completion import lessons_fingerprint
+
+
+def new_completion(*positions: int, lesson_count: int) -> LessonCompletion:
+    mask = sum(1 << position for position in positions)
+    return LessonCompletion(
+        session_id=uuid.uuid4(),
+        student_id=uuid.uuid4(),
+        bits=mask.to_bytes((lesson_count + 7) // 8, "little"),
+        completed_count=len(positions),
+        lessons_fingerprint=b"",
+    )
+
+
+def test_completion_bits() -> None:
+    """Test reading completion back from the little-endian bitset"""
+    completion = new_completion(0, 1, 9, lesson_count=10)
+    assert len(completion.bits) == 2
+    assert completion.mask.bit_count() == completion.completed_count
+    assert completion.bit_string(10) == "1100000001"
+    assert completion.next_unfinished(10) == 2
+
+
+def test_completion_next_unfinished() -> None:
+    """Test the next unfinished lesson at the edges"""
+    assert new_completion(lesson_count=3).next_unfinished(3) == 0
+    assert new_completion(0, 1, 2, lesson_count=3).next_unfinished(3) is None
+    assert new_completion(lesson_count=0).next_unfinished(0) is None
+    assert new_completion(lesson_count=0).bit_string(0) == ""
+
+
+def test_lessons_fingerprint_order() -> None:
+    """Test the fingerprint changes when lessons are reordered or added"""
+    lesson_ids = [uuid.uuid4() for _ in range(3)]
+    fingerprint = lessons_fingerprint(lesson_ids)
+    assert lessons_fingerprint(list(lesson_ids)) == fingerprint
+    assert lessons_fingerprint(lesson_ids[::-1]) != fingerprint
+    assert lessons_fingerprint([*lesson_ids, uuid.uuid4()]) != fingerprint
@@ -0,0 +1,47 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from app.models import ReviewItem
+from app.models.review import (
+    REVIEW_INITIAL_EASE,
+    REVIEW_MIN_EASE,
+    REVIEW_QUALITY_CORRECT,
+    REVIEW_QUALITY_INCORRECT,
+)
+
+
+def new_review_item() -> ReviewItem:
+    return ReviewItem(student_id=uuid.uuid4(), question_id=uuid.uuid4())
+
+
+def test_review_intervals_grow() -> None:
+    """Test the SM-2 intervals of consecutive correct reviews"""
+    item = new_review_item()
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    intervals = []
+    for _ in range(4):
+        item.review(REVIEW_QUALITY_CORRECT, now)
+        intervals.append(item.interval_days)
+        now = item.due_at
+    # Quality 4 leaves the ease unchanged
+    assert item.ease == REVIEW_INITIAL_EASE
+    assert intervals == [1, 6, 15, 38]
+    assert item.repetitions == 4
+    assert item.last_reviewed_at == now - timedelta(days=38)
+
+
+def test_review_lapse_starts_over() -> None:
+    """Test a wrong answer brings the question back the next day, easier"""
+    item = new_review_item()
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    item.review(REVIEW_QUALITY_CORRECT, now)
+    item.review(REVIEW_QUALITY_CORRECT, now)
+    item.review(REVIEW_QUALITY_INCORRECT, now)
+    assert item.repetitions == 0
+    assert item.interval_days == 1
+    assert item.due_at == now + timedelta(days=1)
+    assert item.ease < REVIEW_INITIAL_EASE
+
+    for _ in range(10):
+        item.review(REVIEW_QUALITY_INCORRECT, now)
+    assert item.ease == REVIEW_MIN_EASE
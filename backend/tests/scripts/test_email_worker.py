@@ -0,0 +1,99 @@
+from smtplib import SMTPServerDisconnected
+from unittest.mock import patch
+
+import pytest
+from emails.backend.smtp.backend import SMTPBackend
+from sqlmodel import Session, col, delete
+
+from app import crud
+from app.email_worker import drain_outbox
+from app.models.email_outbox import (
+    EMAIL_STATUS_PENDING,
+    EMAIL_STATUS_SENT,
+    EmailOutbox,
+)
+from tests.utils.smtp import smtp_stub_server
+from tests.utils.utils import random_email
+
+
+@pytest.fixture(autouse=True)
+def empty_outbox(db: Session) -> None:
+    """Drop the pending emails left by other tests, drain_outbox would send them"""
+    db.execute(
+        delete(EmailOutbox).where(col(EmailOutbox.status) == EMAIL_STATUS_PENDING)
+    )
+    db.commit()
+
+
+def test_drain_outbox_reuses_connection(db: Session) -> None:
+    recipients = [random_email() for _ in range(5)]
+    emails = [
+        crud.enqueue_email(
+            session=db, email_to=email_to, subject="Hello", html_content="<p>Hi</p>"
+        )
+        for email_to in recipients
+    ]
+    with (
+        smtp_stub_server() as (port, state),
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+        patch("app.core.config.settings.EMAIL_OUTBOX_BATCH_SIZE", 2),
+    ):
+        smtp = SMTPBackend(fail_silently=False, host="127.0.0.1", port=port)
+        drain_outbox(session=db, smtp=smtp)
+        smtp.close()
+
+    received = [to for email in state.emails for to in email.rcpt_to]
+    assert set(recipients) <= set(received)
+    assert state.connections == 1
+    for email in emails:
+        db.refresh(email)
+        assert email.status == EMAIL_STATUS_SENT
+
+
+def test_drain_outbox_retries_failed_email(db: Session) -> None:
+    rejected = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Nope", html_content="<p>No</p>"
+    )
+    accepted = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Yes", html_content="<p>Yes</p>"
+    )
+    with (
+        smtp_stub_server() as (port, state),
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        state.reject.add(rejected.email_to)
+        smtp = SMTPBackend(fail_silently=False, host="127.0.0.1", port=port)
+        drain_outbox(session=db, smtp=smtp)
+        smtp.close()
+
+    db.refresh(rejected)
+    db.refresh(accepted)
+    assert rejected.status == EMAIL_STATUS_PENDING
+    assert rejected.attempts == 1
+    assert rejected.last_error
+    assert accepted.status == EMAIL_STATUS_SENT
+    # The failed email drops the connection, the next one reconnects
+    assert state.connections == 2
+
+
+def test_drain_outbox_survives_failed_close(db: Session) -> None:
+    rejected = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Nope", html_content="<p>No</p>"
+    )
+    with (
+        smtp_stub_server() as (port, state),
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        state.reject.add(rejected.email_to)
+        smtp = SMTPBackend(fail_silently=False, host="127.0.0.1", port=port)
+        with patch.object(
+            smtp, "close", side_effect=SMTPServerDisconnected("Connection lost")
+        ):
+            assert drain_outbox(session=db, smtp=smtp) == 1
+
+    db.refresh(rejected)
+    assert rejected.status == EMAIL_STATUS_PENDING
+    assert rejected.attempts == 1
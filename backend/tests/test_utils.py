@@ -0,0 +1,27 @@
+from unittest.mock import patch
+
+from app.utils import (
+    email_templates,
+    generate_test_email,
+    precompile_email_templates,
+    render_email_template,
+)
+
+
+def test_render_email_template() -> None:
+    html_content = render_email_template(
+        template_name="test_email.html",
+        context={"project_name": "Test Project", "email": "student@example.com"},
+    )
+    assert "Test Project" in html_content
+    assert "student@example.com" in html_content
+
+
+def test_email_template_compiled_once() -> None:
+    precompile_email_templates()
+    with patch.object(
+        email_templates, "_parse", wraps=email_templates._parse
+    ) as parse_mock:
+        generate_test_email(email_to="student@example.com")
+        generate_test_email(email_to="student@example.com")
+    parse_mock.assert_not_called()
@@ -0,0 +1,91 @@
+import socketserver
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ReceivedEmail:
+    mail_from: str
+    rcpt_to: list[str]
+    data: bytes
+
+
+@dataclass
+class SMTPStubState:
+    emails: list[ReceivedEmail] = field(default_factory=list)
+    connections: int = 0
+    # Reply to DATA with a permanent failure for these recipients
+    reject: set[str] = field(default_factory=set)
+
+
+class _SMTPStubServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _SMTPStubHandler)
+        self.state = SMTPStubState()
+
+
+class _SMTPStubHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server side: enough for smtplib, without auth or TLS."""
+
+    server: _SMTPStubServer
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        state = self.server.state
+        state.connections += 1
+        self._reply("220 stub ESMTP")
+        mail_from = ""
+        rcpt_to: list[str] = []
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self._reply("250-stub")
+                self._reply("250 PIPELINING")
+            elif verb == "HELO" or verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "MAIL":
+                mail_from = command.split(":", 1)[1].split()[0].strip("<>")
+                rcpt_to = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_to.append(command.split(":", 1)[1].split()[0].strip("<>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data += chunk
+                if state.reject.intersection(rcpt_to):
+                    self._reply("554 Rejected")
+                else:
+                    state.emails.append(ReceivedEmail(mail_from, rcpt_to, data))
+                    self._reply("250 OK")
+            elif verb == "RSET":
+                mail_from, rcpt_to = "", []
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+@contextmanager
+def smtp_stub_server() -> Generator[tuple[int, SMTPStubState]]:
+    """Run a local SMTP server in a thread, yielding its port and received emails."""
+    server = _SMTPStubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1], server.state
+    finally:
+        server.shutdown()
+        server.server_close()